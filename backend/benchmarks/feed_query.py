@@ -0,0 +1,107 @@
+"""
+Benchmark the request feed query: ISO-string date_time filter vs the
+date_time_utc BSON date companion and its indexes.
+
+Seeds a throwaway database on MONGO_URL with past and future requests, then
+times the list_requests visibility query both ways and prints docs/keys
+examined from explain().
+
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/feed_query.py --requests 50000
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+BENCH_DB = "findafourth_feed_benchmark"
+CLUBS = ["Weston Golf Club", "Brae Burn Country Club", "Myopia Hunt Club", "Longwood", "The Country Club"]
+
+
+async def seed(db, count: int):
+    await db.requests.drop()
+    now = datetime.now(timezone.utc)
+    rng = random.Random(7)
+    docs = []
+    for _ in range(count):
+        # Most rows are in the past, as in a collection that is never swept
+        when = now + timedelta(hours=rng.randint(-24 * 365, 24 * 14))
+        docs.append({
+            "id": str(uuid.uuid4()),
+            "organizer_id": f"player-{rng.randint(0, 2000)}",
+            "date_time": when.isoformat(),
+            "date_time_utc": when,
+            "club": rng.choice(CLUBS),
+            "audience": rng.choice(["crews", "club", "regional"]),
+            "target_crew_ids": [f"crew-{rng.randint(0, 300)}"],
+            "status": "open" if when > now else rng.choice(["filled", "cancelled", "open"]),
+        })
+    for i in range(0, len(docs), 5000):
+        await db.requests.insert_many(docs[i:i + 5000])
+
+
+def feed_query(date_filter: dict) -> dict:
+    return {
+        **date_filter,
+        "$or": [
+            {"organizer_id": "player-1"},
+            {"$and": [{"audience": "regional"}, {"status": "open"}]},
+            {"$and": [{"audience": "club"}, {"club": {"$in": CLUBS[:2]}}, {"status": "open"}]},
+            {"$and": [{"audience": "crews"}, {"target_crew_ids": {"$in": ["crew-1", "crew-2"]}}, {"status": "open"}]},
+        ]
+    }
+
+
+async def measure(db, query: dict, runs: int) -> dict:
+    started = time.perf_counter()
+    for _ in range(runs):
+        await db.requests.find(query, {"_id": 0}).to_list(1000)
+    elapsed_ms = (time.perf_counter() - started) * 1000 / runs
+
+    explain = await db.command("explain", {"find": "requests", "filter": query}, verbosity="executionStats")
+    stats = explain["executionStats"]
+    return {
+        "avg_ms": round(elapsed_ms, 2),
+        "returned": stats["nReturned"],
+        "docs_examined": stats["totalDocsExamined"],
+        "keys_examined": stats["totalKeysExamined"],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    db = client[BENCH_DB]
+    await seed(db, args.requests)
+    now = datetime.now(timezone.utc)
+
+    # Before: ISO string comparison, no date index
+    before = await measure(db, feed_query({"date_time": {"$gt": now.isoformat()}}), args.runs)
+
+    # After: BSON date companion with the indexes ensure_indexes() creates
+    await db.requests.create_index([("date_time_utc", 1), ("club", 1), ("status", 1)])
+    await db.requests.create_index(
+        [("audience", 1), ("date_time_utc", 1)],
+        partialFilterExpression={"status": "open"},
+        name="open_requests_by_audience"
+    )
+    await db.requests.create_index("organizer_id")
+    after = await measure(db, feed_query({"date_time_utc": {"$gt": now}}), args.runs)
+
+    print(f"requests: {args.requests}, runs: {args.runs}")
+    print(f"before (date_time string): {before}")
+    print(f"after  (date_time_utc):    {after}")
+
+    await client.drop_database(BENCH_DB)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,148 @@
+"""
+Benchmark the Home feed two ways: the pull query (VisibilityContext.feed_filters
+$or over requests) against the fan-out-on-write request_inbox range read.
+
+Seeds a throwaway database on MONGO_URL with players, crews, favorites and open
+requests, fans every request out with the server's sync_request_inbox, then
+times both feed reads for a sample of players.
+
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/feed_strategies.py --players 10000 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+BENCH_DB = "findafourth_feed_strategies_benchmark"
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ["DB_NAME"] = BENCH_DB
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import server  # noqa: E402
+
+CLUBS = [entry["name"] for entry in server.CLUB_DIRECTORY]
+
+
+async def seed(db, players: int, requests: int, regional_share: float):
+    rng = random.Random(7)
+    await server.client.drop_database(BENCH_DB)
+    await server.ensure_indexes()
+
+    player_docs = [{
+        "id": f"player-{i}",
+        "name": f"Player {i}",
+        "profile_complete": True,
+        "home_club": rng.choice(CLUBS),
+        "other_clubs": rng.sample(CLUBS, rng.choice([0, 0, 1])),
+        "visibility": rng.choices(["everyone", "crews_only", "hidden"], weights=[90, 6, 4])[0],
+        "pti": round(rng.uniform(15, 60), 1),
+    } for i in range(players)]
+    await db.players.insert_many(player_docs)
+
+    crew_ids = [f"crew-{i}" for i in range(players // 30)]
+    await db.crew_members.insert_many([
+        {"crew_id": crew_id, "player_id": pid}
+        for crew_id in crew_ids
+        for pid in {f"player-{rng.randrange(players)}" for _ in range(8)}
+    ])
+    favorites = {
+        (f"player-{i}", f"player-{rng.randrange(players)}")
+        for i in range(players) for _ in range(3)
+    }
+    await db.favorites.insert_many([
+        {"player_id": a, "favorite_player_id": b} for a, b in favorites if a != b
+    ])
+
+    now = datetime.now(timezone.utc)
+    request_docs = []
+    for _ in range(requests):
+        when = now + timedelta(hours=rng.randint(1, 24 * 14))
+        audience = "regional" if rng.random() < regional_share else rng.choice(["club", "club", "crews"])
+        skill_min = rng.choice([None, None, 25, 35])
+        request_docs.append({
+            "id": str(uuid.uuid4()),
+            "organizer_id": f"player-{rng.randrange(players)}",
+            "date_time": when.isoformat(),
+            "date_time_utc": when,
+            "club": rng.choice(CLUBS),
+            "audience": audience,
+            "target_crew_ids": rng.sample(crew_ids, 2) if audience == "crews" else [],
+            "skill_min": skill_min,
+            "skill_max": skill_min + 15 if skill_min else None,
+            "status": "open",
+        })
+    await db.requests.insert_many(request_docs)
+    return player_docs, request_docs
+
+
+async def pull_feed(player: dict) -> list:
+    context = await server.get_visibility_context(player)
+    requests = await server.db.requests.find(
+        {"date_time_utc": {"$gt": datetime.now(timezone.utc)}, "$or": context.feed_filters()},
+        server.REQUEST_PROJECTION
+    ).to_list(1000)
+    return [r for r in requests if r['organizer_id'] == player['id'] or context.skill_ok(r)]
+
+
+async def inbox_feed(player: dict) -> list:
+    inbox = await server.db.request_inbox.find(
+        {"player_id": player['id'], "date_time_utc": {"$gt": datetime.now(timezone.utc)}},
+        {"_id": 0, "request_id": 1}
+    ).sort("date_time_utc", 1).to_list(1000)
+    request_ids = [row['request_id'] for row in inbox]
+    return await server.db.requests.find({"id": {"$in": request_ids}}, server.REQUEST_PROJECTION).to_list(len(request_ids) or 1)
+
+
+async def measure(feed, players: list) -> dict:
+    timings, sizes = [], []
+    for player in players:
+        started = time.perf_counter()
+        sizes.append(len(await feed(player)))
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "avg_ms": round(statistics.mean(timings), 2),
+        "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 2),
+        "avg_items": round(statistics.mean(sizes), 1),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--regional-share", type=float, default=0.05, help="fraction of requests with regional audience")
+    parser.add_argument("--sample", type=int, default=200, help="players whose feed is timed")
+    args = parser.parse_args()
+
+    db = server.db
+    player_docs, request_docs = await seed(db, args.players, args.requests, args.regional_share)
+
+    started = time.perf_counter()
+    for request in request_docs:
+        await server.sync_request_inbox(request)
+    fan_out_s = time.perf_counter() - started
+    rows = await db.request_inbox.count_documents({})
+
+    sample = random.Random(11).sample(player_docs, min(args.sample, len(player_docs)))
+    # Same sample, warm visibility contexts for the pull query (its best case)
+    await measure(pull_feed, sample)
+    pull = await measure(pull_feed, sample)
+    inbox = await measure(inbox_feed, sample)
+
+    print(f"players: {args.players}, open requests: {args.requests}, sampled feeds: {len(sample)}")
+    print(f"fan-out: {rows} inbox rows in {fan_out_s:.1f}s ({fan_out_s * 1000 / len(request_docs):.1f} ms/request)")
+    print(f"pull  ($or feed query):     {pull}")
+    print(f"inbox (request_inbox range): {inbox}")
+
+    await server.client.drop_database(BENCH_DB)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
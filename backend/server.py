@@ -1,6 +1,7 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Request, Response, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 import shutil
@@ -9,17 +10,29 @@ from contextlib import asynccontextmanager
 import os
 import logging
 import asyncio
+import time
+import hashlib
+import base64
+import json
+import random
+from collections import OrderedDict, Counter
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr
 from typing import List, Optional, Any
 import uuid
 from datetime import datetime, timezone, timedelta
+from zoneinfo import ZoneInfo
 import bcrypt
 import jwt
 import httpx
 from bs4 import BeautifulSoup
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from pymongo import ReturnDocument, UpdateOne, UpdateMany
+from pymongo.errors import DuplicateKeyError, BulkWriteError, OperationFailure, PyMongoError
+from bson import Binary
+import numpy as np
 from notificationapi_python_server_sdk import notificationapi
 
 ROOT_DIR = Path(__file__).parent
@@ -34,6 +47,9 @@ db = client[os.environ.get('DB_NAME', 'findafourth')]
 JWT_SECRET = os.environ.get('JWT_SECRET', 'findafourth-secret-key-change-in-production')
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24 * 7  # 7 days
+# Stream tickets go in a URL (EventSource cannot set headers), so they are short-lived and only open /events
+STREAM_TICKET_SECONDS = 60
+STREAM_TICKET_SCOPE = "events"
 
 # Configure logging
 logging.basicConfig(
@@ -92,6 +108,85 @@ CLUB_DIRECTORY = [
 ]
 
 
+async def ensure_indexes():
+    """Create the indexes the app relies on. Safe to run on every startup."""
+    await db.sync_jobs.create_index("id", unique=True)
+    await db.sync_jobs.create_index([("type", 1), ("created_at", -1)])
+    await db.sync_job_items.create_index([("job_id", 1), ("key", 1)], unique=True)
+    await db.sync_leases.create_index("name", unique=True)
+    await db.tenniscores_players.create_index("normalized_name")
+    await db.clubs.create_index([("name", 1), ("league", 1)])
+    await db.clubs.create_index("club_name")
+    await db.club_summaries.create_index("name", unique=True)
+    await db.club_summaries.create_index("teams.league")
+    await db.club_summaries.create_index("teams.id")
+    await db.club_summaries.create_index("teams.name")
+    await db.club_vocabulary.create_index("name", unique=True)
+    await db.pti_roster.create_index("clubs")
+    await db.players.create_index("home_club")
+    await db.players.create_index("other_clubs")
+    await db.player_identities.create_index("key", unique=True)
+    await db.player_identities.create_index("player_id")
+    await db.player_identities.create_index("roster_id")
+    await db.player_identities.create_index("tenniscores_uid")
+    await db.players.create_index("id", unique=True)
+    await db.players.create_index("normalized_name")
+    await db.pti_roster.create_index("normalized_name")
+    await db.pti_history.create_index([("player_name", 1), ("recorded_at_utc", 1)])
+    await db.generations.create_index("name", unique=True)
+    await db.match_history.create_index("normalized_name")
+    await db.partner_stats.create_index("normalized_name")
+    await db.partner_stat_rows.create_index([("normalized_name", 1), ("partner_key", 1)], unique=True)
+    await db.partner_stat_rows.create_index([("normalized_name", 1), ("matches_played", -1)])
+    await db.ingested_matches.create_index("match_key", unique=True)
+    await db.match_pairs.create_index([("player_a", 1), ("player_b", 1), ("relation", 1)], unique=True)
+    await db.match_pairs.create_index([("player_b", 1), ("relation", 1)])
+    await db.pti_roster_raw.create_index([("job_id", 1), ("club_id", 1)])
+    await db.mixers.create_index("id", unique=True)
+    await db.requests.create_index("mixer_id", sparse=True)
+    await db.requests.create_index([("date_time_utc", 1), ("club", 1), ("status", 1)])
+    await db.availability_posts.create_index([("available_date", 1), ("clubs", 1)])
+    # TTL: MongoDB deletes posts once expires_at_utc has passed
+    await db.availability_posts.create_index("expires_at_utc", expireAfterSeconds=0)
+    await db.requests.create_index("id", unique=True)
+    # Feed index over open requests only; expired/filled/cancelled rows stay out of it
+    await db.requests.create_index(
+        [("audience", 1), ("date_time_utc", 1)],
+        partialFilterExpression={"status": "open"},
+        name="open_requests_by_audience"
+    )
+    await db.responses.create_index("request_id")
+    await db.crews.create_index("id", unique=True)
+    await db.crews.create_index("created_by")
+    # Older data may hold duplicate memberships from racing adds; the unique index needs them gone
+    await remove_duplicate_crew_members()
+    await db.crew_members.create_index([("crew_id", 1), ("player_id", 1)], unique=True)
+    await db.crew_members.create_index("player_id")
+    await db.favorites.create_index("player_id")
+    await db.request_inbox.create_index([("player_id", 1), ("request_id", 1)], unique=True)
+    await db.request_inbox.create_index([("player_id", 1), ("date_time_utc", 1), ("request_id", 1)])
+    await db.request_inbox.create_index("request_id")
+    # TTL: inbox rows go once the game time has passed
+    await db.request_inbox.create_index("date_time_utc", expireAfterSeconds=0)
+    await db.favorites.create_index("favorite_player_id")
+    await db.responses.create_index("player_id")
+    await db.requests_archive.create_index("id", unique=True)
+    await db.requests_archive.create_index([("organizer_id", 1), ("date_time_utc", -1)])
+    await db.requests_archive.create_index("responses.player_id")
+    await db.requests_archive.create_index("date_time_utc")
+    await db.invites.create_index([("inviter_id", 1), ("sent_at_utc", 1)])
+    await db.requests.create_index("updated_at")
+    await db.responses.create_index([("request_id", 1), ("updated_at", 1)])
+    await db.availability_posts.create_index("updated_at")
+    await db.sync_tombstones.create_index([("player_id", 1), ("deleted_at_utc", 1)])
+    await db.sync_tombstones.create_index([("kind", 1), ("deleted_at_utc", 1)])
+    # TTL: tombstones outlive any token /sync still accepts as a delta
+    await db.sync_tombstones.create_index("deleted_at_utc", expireAfterSeconds=int(SYNC_TOMBSTONE_TTL.total_seconds()))
+    # TTL: invites only matter for the rate-limit window
+    await db.invites.create_index("sent_at_utc", expireAfterSeconds=int(INVITE_RATE_LIMIT_WINDOW.total_seconds()))
+    logger.info("Database indexes ensured")
+
+
 async def seed_club_directory():
     """Seed the club_directory collection from CLUB_DIRECTORY on startup."""
     for entry in CLUB_DIRECTORY:
@@ -103,27 +198,148 @@ async def seed_club_directory():
     logger.info(f"Club directory seeded: {len(CLUB_DIRECTORY)} clubs")
 
 
+# Typo-tolerant matching compares name "cores": lowercased, abbreviations expanded and
+# filler words dropped, so "Wellsley CC" has the core "wellsley country". Type words stay
+# in the core: they are what tells "Weston Racquet Club" from "Weston Golf Club". A
+# misspelling must carry the same type words as the club it resolves to, and is scored
+# on its remaining distinctive words only ("wellsley" against "wellesley"), since shared
+# type words would otherwise carry "Manchester CC" over the threshold to Winchester.
+CLUB_ABBREVIATIONS = {"cc": "country club", "gc": "golf club", "ptc": "platform tennis club", "yc": "yacht club", "rc": "racquet club"}
+CLUB_GENERIC_WORDS = {"the", "and", "club"}
+CLUB_TYPE_WORDS = {"country", "golf", "platform", "tennis", "paddle", "yacht", "racquet", "hunt", "cricket", "polo"}
+CLUB_MATCH_THRESHOLD = 0.85  # minimum edit similarity between cores to auto-resolve a misspelling
+CLUB_CANDIDATE_DICE = 0.5  # minimum trigram overlap for a core to be scored at all
+
+
+def club_name_core(name: str) -> str:
+    words = re.sub(r"[^a-z0-9]+", " ", (name or "").lower()).split()
+    expanded = " ".join(CLUB_ABBREVIATIONS.get(w, w) for w in words).split()
+    return " ".join(w for w in expanded if w not in CLUB_GENERIC_WORDS)
+
+
+def club_type_words(core: str) -> frozenset:
+    return frozenset(w for w in core.split() if w in CLUB_TYPE_WORDS)
+
+
+def club_distinctive_words(core: str) -> str:
+    return " ".join(w for w in core.split() if w not in CLUB_TYPE_WORDS)
+
+
+def _trigrams(text: str) -> set:
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_similarity(a: str, b: str) -> float:
+    """1 - Levenshtein distance / longer length."""
+    if a == b:
+        return 1.0
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return 1 - previous[-1] / max(len(a), len(b))
+
+
+class ClubNameIndex:
+    """
+    Trigram index over the cores of official club names and aliases. Candidates sharing
+    enough trigrams with the input and the same type words are scored by edit similarity
+    of their distinctive words; only the closest is kept.
+    """
+
+    def __init__(self, entries: List[dict]):
+        self.exact = {}  # core -> official name
+        self.cores = []  # (distinctive words, trigram count, type words, official name)
+        self.postings = {}  # trigram -> indexes into self.cores
+        for entry in entries:
+            for variant in [entry["name"], *entry.get("aliases", [])]:
+                core = club_name_core(variant)
+                if not core or core in self.exact:
+                    continue
+                self.exact[core] = entry["name"]
+                grams = _trigrams(core)
+                for gram in grams:
+                    self.postings.setdefault(gram, []).append(len(self.cores))
+                self.cores.append((club_distinctive_words(core), len(grams), club_type_words(core), entry["name"]))
+
+    def suggest(self, name: str) -> Optional[tuple]:
+        """(official name, confidence) of the closest official club, or None if nothing is close."""
+        core = club_name_core(name)
+        if not core:
+            return None
+        if core in self.exact:
+            return self.exact[core], 1.0
+
+        distinctive = club_distinctive_words(core)
+        if not distinctive:
+            return None
+        grams = _trigrams(core)
+        types = club_type_words(core)
+        shared = Counter(i for gram in grams for i in self.postings.get(gram, ()))
+        best = None
+        for i, overlap in shared.items():
+            candidate, candidate_grams, candidate_types, official = self.cores[i]
+            if 2 * overlap / (len(grams) + candidate_grams) < CLUB_CANDIDATE_DICE:
+                continue
+            # "Essex Tennis Club" is not a misspelling of "Essex County Club"
+            if types != candidate_types:
+                continue
+            score = _edit_similarity(distinctive, candidate)
+            if best is None or score > best[1]:
+                best = (official, round(score, 3))
+        return best
+
+    def resolve(self, name: str) -> Optional[str]:
+        match = self.suggest(name)
+        return match[0] if match and match[1] >= CLUB_MATCH_THRESHOLD else None
+
+
+_club_name_indexes = {}  # club directory fingerprint -> ClubNameIndex
+
+
+async def load_club_lookup() -> tuple:
+    """
+    (official name, alias) lowercase -> official name maps from club_directory, plus the
+    ClubNameIndex for misspellings (built once per directory content).
+    """
+    entries = await db.club_directory.find({}, {"_id": 0}).to_list(100)
+    official_names_lower = {e["name"].lower(): e["name"] for e in entries}
+    alias_to_official = {}
+    for e in entries:
+        for alias in e.get("aliases", []):
+            alias_to_official[alias.lower()] = e["name"]
+
+    fingerprint = tuple((e["name"], tuple(e.get("aliases", []))) for e in entries)
+    index = _club_name_indexes.get(fingerprint)
+    if index is None:
+        _club_name_indexes.clear()
+        index = _club_name_indexes[fingerprint] = ClubNameIndex(entries)
+    return official_names_lower, alias_to_official, index
+
+
 async def resolve_club_name(input_name: str) -> str:
+    """Resolve a club name (scraped team name or user input) to its official name."""
+    return resolve_club_name_with(input_name, await load_club_lookup())
+
+
+def resolve_club_name_with(input_name: str, lookup: tuple) -> str:
     """
-    Resolve a club name (scraped team name or user input) to its official name.
+    Resolve a club name against a load_club_lookup() result, so batches share one read.
     1. Strip trailing numbers (e.g. "Cape Ann 1" -> "Cape Ann")
     2. Strip trailing team suffixes (e.g. "Myopia Gold" -> "Myopia", "Cape Ann Cage Fighters" -> "Cape Ann")
     3. Check if input matches an official name (case-insensitive)
     4. Check if input matches any alias in club_directory (case-insensitive)
-    5. Return original input unchanged for non-GBPTA clubs
+    5. Match misspellings ("Wellsley CC") above CLUB_MATCH_THRESHOLD via the ClubNameIndex
+    6. Return original input unchanged for non-GBPTA clubs
     """
     if not input_name or not input_name.strip():
         return input_name
 
     name = input_name.strip()
-
-    # Build lookup from DB
-    entries = await db.club_directory.find({}, {"_id": 0}).to_list(100)
-    official_names_lower = {e["name"].lower(): e["name"] for e in entries}
-    alias_to_official = {}
-    for e in entries:
-        for alias in e.get("aliases", []):
-            alias_to_official[alias.lower()] = e["name"]
+    official_names_lower, alias_to_official, name_index = lookup
 
     # Try exact official match first (case-insensitive)
     if name.lower() in official_names_lower:
@@ -141,15 +357,23 @@ async def resolve_club_name(input_name: str) -> str:
         if stripped.lower() in alias_to_official:
             return alias_to_official[stripped.lower()]
 
-    # Strip trailing word suffixes like team names ("Myopia Gold", "Cape Ann Cage Fighters")
-    # Try progressively shorter prefixes
+    # Strip trailing word suffixes like team names ("Myopia Gold", "Cape Ann Cage Fighters").
+    # Try progressively shorter prefixes, but never drop a type word the club lacks
+    # ("Weston Racquet Club" is not "Weston" Golf Club)
     words = stripped.split()
     for i in range(len(words) - 1, 0, -1):
         prefix = " ".join(words[:i])
-        if prefix.lower() in official_names_lower:
-            return official_names_lower[prefix.lower()]
-        if prefix.lower() in alias_to_official:
-            return alias_to_official[prefix.lower()]
+        official = official_names_lower.get(prefix.lower()) or alias_to_official.get(prefix.lower())
+        if not official:
+            continue
+        dropped_types = club_type_words(club_name_core(" ".join(words[i:])))
+        if dropped_types <= club_type_words(club_name_core(official)):
+            return official
+
+    # Typo-tolerant match on the number-stripped name
+    fuzzy = name_index.resolve(stripped)
+    if fuzzy:
+        return fuzzy
 
     # No match — return original input (non-GBPTA club)
     return name
@@ -159,183 +383,11 @@ async def run_gbpta_full_sync():
     """
     Execute the full GBPTA sync pipeline.
     Called by the scheduler on Tuesdays.
-    This is a wrapper that directly interacts with the database.
+    Runs the same checkpointed background job as /admin/gbpta/full-sync, inline.
+    If another worker or replica already started it, waits on that run instead.
     """
     logger.info("Starting scheduled GBPTA sync...")
-    try:
-        now = datetime.now(timezone.utc).isoformat()
-
-        # Step 1: Scrape clubs from standings page
-        logger.info("Scheduled sync - Step 1: Scraping clubs")
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        }
-        target_leagues = ["Metrowest", "North Shore", "Metrowest Women's Day League"]
-        base_url = "https://gbpta.paddlescores.com"
-
-        async with httpx.AsyncClient(timeout=30.0, headers=headers, follow_redirects=True) as http_client:
-            # Fetch standings page
-            response = await http_client.get(f"{base_url}/print_all_standings.php")
-            response.raise_for_status()
-            html = response.text
-
-        # Parse standings
-        from bs4 import BeautifulSoup
-        soup = BeautifulSoup(html, 'html.parser')
-        club_data = []
-        current_league = None
-        current_division = None
-
-        for element in soup.find_all(['h1', 'h2', 'a']):
-            if element.name == 'h1':
-                league_name = element.get_text(strip=True)
-                current_league = league_name if league_name in target_leagues else None
-                current_division = None
-            elif element.name == 'h2' and current_league:
-                current_division = element.get_text(strip=True)
-            elif element.name == 'a' and current_league and current_division:
-                href = element.get('href', '')
-                if 'tid=' in href:
-                    team_name = element.get_text(strip=True)
-                    if team_name:
-                        roster_url = f"{base_url}{href}" if href.startswith('/') else href
-                        club_data.append({
-                            'name': team_name,
-                            'league': current_league,
-                            'division': current_division,
-                            'roster_url': roster_url
-                        })
-
-        # Upsert clubs
-        for club in club_data:
-            existing = await db.clubs.find_one({"name": club['name'], "league": club['league']})
-            if existing:
-                await db.clubs.update_one(
-                    {"id": existing['id']},
-                    {"$set": {"division": club['division'], "roster_url": club['roster_url'], "last_scraped": now}}
-                )
-            else:
-                await db.clubs.insert_one({
-                    "id": str(uuid.uuid4()),
-                    **club,
-                    "last_scraped": now,
-                    "created_at": now
-                })
-
-        logger.info(f"Scheduled sync - Found {len(club_data)} clubs")
-
-        # Step 2: Scrape rosters
-        logger.info("Scheduled sync - Step 2: Scraping rosters")
-        clubs = await db.clubs.find({}, {"_id": 0}).to_list(1000)
-        all_players = []
-
-        async with httpx.AsyncClient(timeout=30.0, headers=headers, follow_redirects=True) as http_client:
-            for club in clubs:
-                try:
-                    resolved_club = await resolve_club_name(club['name'])
-                    response = await http_client.get(club['roster_url'])
-                    response.raise_for_status()
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    roster_table = soup.find('table', class_='team_roster_table')
-                    if roster_table:
-                        for row in roster_table.find_all('tr'):
-                            cells = row.find_all('td')
-                            if len(cells) >= 2:
-                                player_link = cells[0].find('a', href=lambda h: h and 'player.php' in h)
-                                if player_link:
-                                    player_name = player_link.get_text(strip=True)
-                                    for suffix in ['(C)', '(c)', '(CC)', '(cc)']:
-                                        player_name = player_name.replace(suffix, '')
-                                    player_name = player_name.strip()
-                                    pti_value = None
-                                    if len(cells) > 1:
-                                        try:
-                                            pti_value = float(cells[1].get_text(strip=True))
-                                        except ValueError:
-                                            pass
-                                    profile_url = player_link.get('href', '')
-                                    if profile_url.startswith('/'):
-                                        profile_url = f"{base_url}{profile_url}"
-                                    if player_name:
-                                        all_players.append({
-                                            'player_name': player_name,
-                                            'pti_value': pti_value,
-                                            'profile_source_url': profile_url,
-                                            'club': resolved_club
-                                        })
-                except Exception as e:
-                    logger.error(f"Error scraping {club['name']}: {e}")
-
-        for player in all_players:
-            player['id'] = str(uuid.uuid4())
-            player['scraped_at'] = now
-
-        if all_players:
-            await db.pti_roster_raw.delete_many({})
-            await db.pti_roster_raw.insert_many(all_players)
-
-        logger.info(f"Scheduled sync - Found {len(all_players)} player entries")
-
-        # Step 3: Deduplicate
-        logger.info("Scheduled sync - Step 3: Deduplicating")
-        raw_entries = await db.pti_roster_raw.find({}, {"_id": 0}).to_list(10000)
-        player_map = {}
-
-        for entry in raw_entries:
-            name = entry.get('player_name', '').lower().strip()
-            if not name:
-                continue
-            if name not in player_map:
-                player_map[name] = {
-                    'player_name': entry['player_name'],
-                    'pti_value': entry.get('pti_value'),
-                    'clubs': [],
-                    'profile_source_url': entry.get('profile_source_url'),
-                }
-            club = entry.get('club')
-            if club and club not in player_map[name]['clubs']:
-                player_map[name]['clubs'].append(club)
-            if entry.get('pti_value') is not None:
-                player_map[name]['pti_value'] = entry['pti_value']
-
-        deduped_entries = []
-        for normalized_name, data in player_map.items():
-            deduped_entries.append({
-                'id': str(uuid.uuid4()),
-                'player_name': data['player_name'],
-                'pti_value': data['pti_value'],
-                'clubs': data['clubs'],
-                'profile_image_url': None,
-                'profile_source_url': data['profile_source_url'],
-                'scraped_at': now
-            })
-
-        await db.pti_roster.delete_many({})
-        if deduped_entries:
-            await db.pti_roster.insert_many(deduped_entries)
-
-        logger.info(f"Scheduled sync - {len(deduped_entries)} unique players")
-
-        # Step 4: Record PTI history
-        logger.info("Scheduled sync - Step 4: Recording PTI history")
-        history_entries = []
-        for entry in deduped_entries:
-            if entry.get('pti_value') is not None:
-                history_entries.append({
-                    'id': str(uuid.uuid4()),
-                    'player_name': entry['player_name'].lower().strip(),
-                    'pti_value': entry['pti_value'],
-                    'recorded_at': now
-                })
-
-        if history_entries:
-            await db.pti_history.insert_many(history_entries)
-
-        logger.info(f"Scheduled GBPTA sync complete: {len(club_data)} clubs, {len(deduped_entries)} players, {len(history_entries)} history records")
-
-    except Exception as e:
-        logger.error(f"Scheduled GBPTA sync failed: {e}")
+    return await run_sync_job_inline('gbpta_full_sync')
 
 
 async def run_tenniscores_sync():
@@ -347,61 +399,18 @@ async def run_tenniscores_sync():
     """
     logger.info("Starting scheduled Tenniscores sync...")
     try:
-        now = datetime.now(timezone.utc).isoformat()
-
         # Step 1: Scrape rankings
         logger.info("Tenniscores sync - Step 1: Scraping rankings")
-        html = await fetch_html(TENNISCORES_RANKINGS_URL)
-        players = parse_tenniscores_rankings(html)
-        logger.info(f"Tenniscores sync - Found {len(players)} players in rankings")
-
-        inserted = 0
-        updated = 0
-        for player in players:
-            player['last_scraped'] = now
-            player['normalized_name'] = normalize_name(player['name'])
-            existing = await db.tenniscores_players.find_one({'normalized_name': player['normalized_name']})
-            if existing:
-                await db.tenniscores_players.update_one({'_id': existing['_id']}, {'$set': player})
-                updated += 1
-            else:
-                player['id'] = str(uuid.uuid4())
-                player['created_at'] = now
-                await db.tenniscores_players.insert_one(player)
-                inserted += 1
-
-        # Also update PTI values in pti_roster
-        for player in players:
-            if player['pti_current'] is not None:
-                await db.pti_roster.update_many(
-                    {'normalized_name': player['normalized_name']},
-                    {'$set': {'pti_value': player['pti_current'], 'pti_updated': now}}
-                )
-
-        logger.info(f"Tenniscores sync - Rankings: {inserted} inserted, {updated} updated")
+        job = await run_sync_job_inline('tenniscores_rankings')
+        rankings = (job or {}).get('result') or {}
+        logger.info(f"Tenniscores sync - Rankings: {rankings.get('inserted', 0)} inserted, {rankings.get('updated', 0)} updated")
 
-        # Step 2: Bulk scrape all player pages with concurrent workers
+        # Step 2: Bulk scrape all player pages as a checkpointed job
         logger.info(f"Tenniscores sync - Step 2: Bulk scraping player pages with {TENNISCORES_SCRAPE_WORKERS} workers")
-        all_players = await db.tenniscores_players.find(
-            {'profile_url': {'$exists': True, '$ne': None}},
-            {'_id': 0}
-        ).to_list(10000)
-
-        semaphore = asyncio.Semaphore(TENNISCORES_SCRAPE_WORKERS)
-        tasks = [_scrape_single_tenniscores_player(p, now, semaphore) for p in all_players]
+        job = await run_sync_job_inline('tenniscores_players')
+        progress = job.get('progress', {}) if job else {}
 
-        scraped = 0
-        errors = 0
-        for i, coro in enumerate(asyncio.as_completed(tasks)):
-            success = await coro
-            if success:
-                scraped += 1
-            else:
-                errors += 1
-            if (i + 1) % 50 == 0:
-                logger.info(f"Tenniscores sync progress: {i + 1}/{len(all_players)} ({scraped} scraped, {errors} errors)")
-
-        logger.info(f"Scheduled Tenniscores sync complete: {len(players)} rankings, {scraped}/{len(all_players)} player pages scraped, {errors} errors")
+        logger.info(f"Scheduled Tenniscores sync complete: {rankings.get('total_found', 0)} rankings, {progress.get('completed', 0)}/{progress.get('total', 0)} player pages scraped, {progress.get('errors', 0)} errors")
 
     except Exception as e:
         logger.error(f"Scheduled Tenniscores sync failed: {e}")
@@ -424,10 +433,44 @@ async def lifespan(app: FastAPI):
         id='tenniscores_sync',
         replace_existing=True
     )
+    # Pick up sync jobs whose runner died (restart, crash) and resume them from their checkpoint
+    scheduler.add_job(
+        recover_stale_sync_jobs,
+        IntervalTrigger(minutes=5),
+        id='sync_job_recovery',
+        replace_existing=True
+    )
+    # Expire past requests and archive old ones
+    scheduler.add_job(
+        sweep_expired_data,
+        IntervalTrigger(minutes=15),
+        id='expiry_sweep',
+        replace_existing=True
+    )
     scheduler.start()
     logger.info("Scheduler started - GBPTA sync at 6:00 AM EST, Tenniscores sync at 7:00 AM EST (Tuesdays)")
+    await ensure_indexes()
     await seed_club_directory()
+    # One-time backfills for documents that predate stored date companions / identity keys
+    await backfill_date_companions()
+    if await db.responses.find_one({"updated_at": {"$exists": False}}):
+        await backfill_sync_timestamps()
+    # Re-resolve team -> club against the (possibly re-seeded) club directory
+    # (also rebuilt once for summaries that predate profile_count)
+    if (await refresh_team_club_names() or not await db.club_vocabulary.find_one({})
+            or await db.club_summaries.find_one({"profile_count": {"$exists": False}})):
+        await rebuild_club_summaries()
+    if await db.players.find_one({"profile_complete": True, "normalized_name": {"$exists": False}}):
+        await rebuild_player_identities()
+    if await db.crews.find_one({"member_count": {"$exists": False}}):
+        await repair_crew_member_counts()
+    if not await db.request_inbox.find_one({}):
+        await rebuild_request_inbox()
+    # Legacy partners arrays are retired by the first partner stats rebuild
+    if await db.partner_stats.find_one({"partners": {"$exists": True}}):
+        await trigger_sync_job('partner_stats_rebuild')
     yield
+    await event_hub.stop()
     scheduler.shutdown()
     logger.info("Scheduler stopped")
 
@@ -448,6 +491,7 @@ api_router = APIRouter(prefix="/api")
 
 # Security
 security = HTTPBearer()
+stream_security = HTTPBearer(auto_error=False)
 
 # ==================== MODELS ====================
 
@@ -533,6 +577,9 @@ class CrewUpdate(BaseModel):
     name: Optional[str] = None
     type: Optional[str] = None
 
+class CrewMembersAdd(BaseModel):
+    player_ids: List[str]
+
 class Crew(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
@@ -593,6 +640,16 @@ class GameRequest(BaseModel):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+# Mixer Models
+class MixerCreate(BaseModel):
+    player_ids: List[str] = Field(min_length=4, max_length=48)
+    rounds: int = Field(ge=1, le=12)
+    date_time: datetime
+    club: str
+    round_minutes: int = Field(default=30, ge=10, le=180)
+    court_names: List[str] = []
+    notes: Optional[str] = None
+
 # Response Models
 class ResponseCreate(BaseModel):
     status: str = "interested"  # interested, confirmed, passed
@@ -699,9 +756,20 @@ def create_token(player_id: str) -> str:
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
-def decode_token(token: str) -> Optional[str]:
+def create_stream_ticket(player_id: str) -> str:
+    payload = {
+        "sub": player_id,
+        "scope": STREAM_TICKET_SCOPE,
+        "exp": datetime.now(timezone.utc) + timedelta(seconds=STREAM_TICKET_SECONDS)
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+def decode_token(token: str, scope: Optional[str] = None) -> Optional[str]:
+    """Player id from a token. Session tokens carry no scope; scoped tokens only pass for their scope."""
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        if payload.get("scope") != scope:
+            return None
         return payload.get("sub")
     except jwt.ExpiredSignatureError:
         return None
@@ -709,8 +777,25 @@ def decode_token(token: str) -> Optional[str]:
         return None
 
 async def get_current_player(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
-    token = credentials.credentials
-    player_id = decode_token(token)
+    return await player_for_token(credentials.credentials)
+
+async def get_stream_player(
+    ticket: Optional[str] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(stream_security)
+) -> dict:
+    """
+    get_current_player for EventSource clients, which cannot set headers: a stream ticket
+    from POST /events/ticket may be passed as ?ticket=. Session tokens are refused there,
+    so they never end up in access logs or browser history.
+    """
+    if credentials:
+        return await player_for_token(credentials.credentials)
+    if not ticket:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return await player_for_token(ticket, scope=STREAM_TICKET_SCOPE)
+
+async def player_for_token(token: str, scope: Optional[str] = None) -> dict:
+    player_id = decode_token(token, scope)
     if not player_id:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
@@ -739,6 +824,136 @@ def deserialize_datetime(value):
             return value
     return value
 
+# Timestamps that are queried by range are stored twice: the ISO string API clients
+# read (date_time, expires_at, sent_at, recorded_at) and a native BSON date companion
+# (<field>_utc) that indexes, range filters, sorts and TTL indexes use.
+
+def utc_datetime(value) -> Optional[datetime]:
+    """Aware UTC datetime for a datetime or ISO string; naive values are taken as UTC."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+# Calendar days (availability dates, "games on this day") are the clubs' local days
+APP_TIMEZONE = ZoneInfo("America/New_York")
+
+
+def local_date(value) -> str:
+    """YYYY-MM-DD of a datetime or ISO string in APP_TIMEZONE."""
+    return utc_datetime(value).astimezone(APP_TIMEZONE).date().isoformat()
+
+
+def local_day_bounds(date: str) -> tuple:
+    """UTC (start, end) of one YYYY-MM-DD day in APP_TIMEZONE."""
+    day = datetime.strptime(date, "%Y-%m-%d")
+    start = day.replace(tzinfo=APP_TIMEZONE)
+    end = (day + timedelta(days=1)).replace(tzinfo=APP_TIMEZONE)
+    return start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+
+# Projections that keep the BSON date companions out of API responses
+REQUEST_PROJECTION = {"_id": 0, "date_time_utc": 0}
+AVAILABILITY_PROJECTION = {"_id": 0, "expires_at_utc": 0}
+
+class VersionedCache:
+    """
+    Small in-process LRU cache. Each entry is stored with the data version it was
+    built from and is only returned for that same version, so callers invalidate
+    by bumping a version (see bump_generation) rather than by deleting entries.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key, version):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key, version, value):
+        self._entries[key] = (version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """True when the request's If-None-Match header lists etag (weak comparison, per RFC 9110)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = lambda tag: tag.strip().removeprefix("W/")
+    return opaque(etag) in {opaque(tag) for tag in header.split(",")}
+
+
+def encode_cursor(values: dict) -> str:
+    """Opaque pagination cursor for a keyset position."""
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if not isinstance(values, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+async def get_generation(name: str) -> int:
+    """Current generation counter for a named data set (shared by all workers via Mongo)."""
+    doc = await db.generations.find_one({"name": name}, {"_id": 0, "generation": 1})
+    return doc['generation'] if doc else 0
+
+
+async def bump_generation(name: str) -> int:
+    """Advance a data set's generation, invalidating every cache entry built from it."""
+    doc = await db.generations.find_one_and_update(
+        {"name": name},
+        {"$inc": {"generation": 1}, "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}},
+        projection={"_id": 0, "generation": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return doc['generation']
+
+
+BULK_WRITE_BATCH_SIZE = 1000
+
+async def bulk_write_batched(collection, operations: list, label: str = "") -> dict:
+    """
+    Apply write operations as unordered bulk_write batches.
+    Returns matched/modified/upserted counts plus rows per second for the step.
+    """
+    totals = {"rows": len(operations), "matched": 0, "modified": 0, "upserted": 0, "rows_per_second": None}
+    if not operations:
+        return totals
+
+    started = time.perf_counter()
+    for i in range(0, len(operations), BULK_WRITE_BATCH_SIZE):
+        result = await collection.bulk_write(operations[i:i + BULK_WRITE_BATCH_SIZE], ordered=False)
+        totals["matched"] += result.matched_count
+        totals["modified"] += result.modified_count
+        totals["upserted"] += result.upserted_count
+    elapsed = time.perf_counter() - started
+
+    totals["rows_per_second"] = round(len(operations) / elapsed, 1) if elapsed > 0 else None
+    logger.info(f"Bulk write {label or collection.name}: {len(operations)} rows in {elapsed:.2f}s ({totals['rows_per_second']} rows/s)")
+    return totals
+
 # ==================== NOTIFICATION SYSTEM (Pingram.io / NotificationAPI) ====================
 
 async def send_notification(
@@ -815,6 +1030,24 @@ async def notify_player(player: dict, title: str, body: str, notification_id: st
         }
     )
 
+
+# Background notification sends, referenced until done so they aren't garbage collected
+_notification_tasks: set = set()
+
+
+def enqueue_notifications(sends: List[tuple]):
+    """Send (player, title, body, notification_id) tuples in the background, off the request path."""
+    if not sends:
+        return
+
+    async def run():
+        for player, title, body, notification_id in sends:
+            await notify_player(player, title, body, notification_id=notification_id)
+
+    task = asyncio.create_task(run())
+    _notification_tasks.add(task)
+    task.add_done_callback(_notification_tasks.discard)
+
 # ==================== AUTH ROUTES ====================
 
 @api_router.post("/auth/register", response_model=TokenResponse)
@@ -885,6 +1118,7 @@ async def complete_profile(profile: PlayerProfile, current_player: dict = Depend
 
     update_data = {
         "name": profile.name,
+        "normalized_name": normalize_name(profile.name),
         "home_club": normalized_home_club,
         "other_clubs": normalized_other_clubs,
         "pti": profile.pti,
@@ -899,10 +1133,14 @@ async def complete_profile(profile: PlayerProfile, current_player: dict = Depend
     
     await db.players.update_one(
         {"id": current_player['id']},
-        {"$set": update_data}
+        {"$set": update_data, "$inc": {"visibility_version": 1}}
     )
+    await link_player_identity(current_player['id'], profile.name)
+    await bump_generation("player_directory")
+    await adjust_club_summaries(current_player, {**current_player, **update_data})
     
     updated_player = await db.players.find_one({"id": current_player['id']}, {"_id": 0, "password_hash": 0})
+    await refresh_player_inbox(updated_player)
     return updated_player
 
 # ==================== PLAYER ROUTES ====================
@@ -950,11 +1188,19 @@ async def update_player(player_id: str, data: PlayerUpdate, current_player: dict
     if 'other_clubs' in update_data and update_data['other_clubs']:
         update_data['other_clubs'] = [await resolve_club_name(c) for c in update_data['other_clubs']]
 
+    if 'name' in update_data:
+        update_data['normalized_name'] = normalize_name(update_data['name'])
+
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
     
-    await db.players.update_one({"id": player_id}, {"$set": update_data})
+    await db.players.update_one({"id": player_id}, {"$set": update_data, "$inc": {"visibility_version": 1}})
+    if 'name' in update_data and existing_player and existing_player.get('profile_complete'):
+        await link_player_identity(player_id, update_data['name'])
+    await bump_generation("player_directory")
+    await adjust_club_summaries(existing_player, {**(existing_player or {}), **update_data})
     
     updated_player = await db.players.find_one({"id": player_id}, {"_id": 0, "password_hash": 0})
+    await refresh_player_inbox(updated_player)
     return updated_player
 
 @api_router.post("/players/{player_id}/profile-image")
@@ -1006,6 +1252,8 @@ async def upload_profile_image(
         {"id": player_id},
         {"$set": {"profile_image_url": image_url, "updated_at": datetime.now(timezone.utc).isoformat()}}
     )
+    await bump_generation("player_directory")
+    await adjust_club_summaries(current_player, current_player)
 
     updated_player = await db.players.find_one({"id": player_id}, {"_id": 0, "password_hash": 0})
     return {"profile_image_url": image_url, "player": updated_player}
@@ -1029,6 +1277,8 @@ async def delete_profile_image(player_id: str, current_player: dict = Depends(ge
         {"id": player_id},
         {"$set": {"profile_image_url": None, "updated_at": datetime.now(timezone.utc).isoformat()}}
     )
+    await bump_generation("player_directory")
+    await adjust_club_summaries(current_player, current_player)
 
     updated_player = await db.players.find_one({"id": player_id}, {"_id": 0, "password_hash": 0})
     return {"message": "Profile image deleted", "player": updated_player}
@@ -1040,12 +1290,32 @@ async def delete_player(player_id: str, current_player: dict = Depends(get_curre
     
     # Delete player and related data
     await db.players.delete_one({"id": player_id})
+    await link_player_identity(player_id, None)
+    await bump_generation("player_directory")
+    await adjust_club_summaries(current_player, None)
+    crew_ids = await db.crew_members.distinct("crew_id", {"player_id": player_id})
     await db.crew_members.delete_many({"player_id": player_id})
+    if crew_ids:
+        await db.crews.update_many({"id": {"$in": crew_ids}}, {"$inc": {"member_count": -1}})
+    favorite_links = await db.favorites.find(
+        {"$or": [{"player_id": player_id}, {"favorite_player_id": player_id}]},
+        {"_id": 0, "player_id": 1, "favorite_player_id": 1}
+    ).to_list(None)
     await db.favorites.delete_many({"$or": [{"player_id": player_id}, {"favorite_player_id": player_id}]})
+    await touch_visibility(pid for link in favorite_links for pid in (link['player_id'], link['favorite_player_id']))
+    own_responses = await db.responses.find({"player_id": player_id}, {"_id": 0, "id": 1, "request_id": 1}).to_list(None)
     await db.responses.delete_many({"player_id": player_id})
+    own_post_ids = await db.availability_posts.distinct("id", {"player_id": player_id})
     await db.availability_posts.delete_many({"player_id": player_id})
+    await record_tombstones(
+        [{"kind": "response", "id": r['id'], "request_id": r['request_id']} for r in own_responses]
+        + [{"kind": "availability", "id": post_id} for post_id in own_post_ids]
+    )
     # Also delete requests created by this player
+    own_request_ids = await db.requests.distinct("id", {"organizer_id": player_id})
     await db.requests.delete_many({"organizer_id": player_id})
+    await db.request_inbox.delete_many({"player_id": player_id})
+    await prune_inbox_rows({"request_id": {"$in": own_request_ids}})
     
     return {"message": "Account deleted successfully"}
 
@@ -1053,19 +1323,13 @@ async def delete_player(player_id: str, current_player: dict = Depends(get_curre
 
 @api_router.get("/crews")
 async def list_crews(current_player: dict = Depends(get_current_player)):
-    # Crews are private - only return crews created by this player
-    my_crews = await db.crews.find(
+    # Crews are private - only return crews created by this player.
+    # member_count is maintained on the crew document by the membership routes.
+    return await db.crews.find(
         {"created_by": current_player['id']},
         {"_id": 0}
     ).to_list(1000)
 
-    # Add member count to each crew
-    for crew in my_crews:
-        members = await db.crew_members.find({"crew_id": crew['id']}).to_list(1000)
-        crew['member_count'] = len(members)
-
-    return my_crews
-
 @api_router.post("/crews")
 async def create_crew(data: CrewCreate, current_player: dict = Depends(get_current_player)):
     crew_id = str(uuid.uuid4())
@@ -1073,14 +1337,14 @@ async def create_crew(data: CrewCreate, current_player: dict = Depends(get_curre
         "id": crew_id,
         "name": data.name,
         "created_by": current_player['id'],
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "member_count": 0
     }
 
     await db.crews.insert_one(crew_doc)
 
     # Remove _id from response
     crew_doc.pop('_id', None)
-    crew_doc['member_count'] = 0
 
     return crew_doc
 
@@ -1133,8 +1397,10 @@ async def delete_crew(crew_id: str, current_player: dict = Depends(get_current_p
     if crew['created_by'] != current_player['id']:
         raise HTTPException(status_code=403, detail="Not authorized")
     
+    member_ids = await db.crew_members.distinct("player_id", {"crew_id": crew_id})
     await db.crews.delete_one({"id": crew_id})
     await db.crew_members.delete_many({"crew_id": crew_id})
+    await touch_visibility(member_ids)
     
     return {"message": "Crew deleted successfully"}
 
@@ -1147,30 +1413,82 @@ async def add_crew_member(crew_id: str, player_id: str, current_player: dict = D
     if crew['created_by'] != current_player['id']:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Check if already a member
-    existing = await db.crew_members.find_one({"crew_id": crew_id, "player_id": player_id})
-    if existing:
-        raise HTTPException(status_code=400, detail="Already a member")
-    
     member_doc = {
         "crew_id": crew_id,
         "player_id": player_id,
         "joined_at": datetime.now(timezone.utc).isoformat()
     }
-    await db.crew_members.insert_one(member_doc)
+    # The unique (crew_id, player_id) index rejects duplicates, so the count only moves on a real insert
+    try:
+        await db.crew_members.insert_one(member_doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Already a member")
+    await db.crews.update_one({"id": crew_id}, {"$inc": {"member_count": 1}})
+    await touch_visibility([player_id])
     
     # Notify the added player
-    player = await db.players.find_one({"id": player_id})
+    player = await db.players.find_one({"id": player_id}, {"_id": 0, "password_hash": 0})
     if player:
-        await notify_player(
-            player,
-            "Added to Crew",
-            f"You've been added to {crew['name']}",
-            notification_id="added_to_crew"
-        )
+        enqueue_notifications([(player, "Added to Crew", f"You've been added to {crew['name']}", "added_to_crew")])
     
     return {"message": "Member added successfully"}
 
+CREW_BULK_ADD_LIMIT = 100
+
+@api_router.post("/crews/{crew_id}/members/bulk")
+async def add_crew_members(crew_id: str, data: CrewMembersAdd, current_player: dict = Depends(get_current_player)):
+    """
+    Add many players to a crew in one call: one $in lookup validates the ids, one unordered
+    insert_many adds them (the unique index skips existing members) and the added players
+    are notified by a single background job.
+    """
+    crew = await db.crews.find_one({"id": crew_id}, {"_id": 0})
+    if not crew:
+        raise HTTPException(status_code=404, detail="Crew not found")
+
+    if crew['created_by'] != current_player['id']:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    player_ids = list(dict.fromkeys(data.player_ids))
+    if len(player_ids) > CREW_BULK_ADD_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {CREW_BULK_ADD_LIMIT} players per request")
+
+    players = await db.players.find(
+        {"id": {"$in": player_ids}},
+        {"_id": 0, "password_hash": 0}
+    ).to_list(len(player_ids) or 1)
+    players_by_id = {p['id']: p for p in players}
+    valid_ids = [pid for pid in player_ids if pid in players_by_id]
+
+    now = datetime.now(timezone.utc).isoformat()
+    docs = [{"crew_id": crew_id, "player_id": pid, "joined_at": now} for pid in valid_ids]
+    duplicates = set()
+    if docs:
+        try:
+            await db.crew_members.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors', [])
+            if any(err.get('code') != 11000 for err in errors):
+                raise
+            duplicates = {err['index'] for err in errors}
+
+    added = [pid for i, pid in enumerate(valid_ids) if i not in duplicates]
+    if added:
+        await db.crews.update_one({"id": crew_id}, {"$inc": {"member_count": len(added)}})
+        await touch_visibility(added)
+        enqueue_notifications([
+            (players_by_id[pid], "Added to Crew", f"You've been added to {crew['name']}", "added_to_crew")
+            for pid in added
+        ])
+
+    return {
+        "message": f"Added {len(added)} members",
+        "added": added,
+        "already_members": [valid_ids[i] for i in sorted(duplicates)],
+        "not_found": [pid for pid in player_ids if pid not in players_by_id],
+        "member_count": crew.get('member_count', 0) + len(added)
+    }
+
 @api_router.delete("/crews/{crew_id}/members/{player_id}")
 async def remove_crew_member(crew_id: str, player_id: str, current_player: dict = Depends(get_current_player)):
     crew = await db.crews.find_one({"id": crew_id})
@@ -1185,10 +1503,48 @@ async def remove_crew_member(crew_id: str, player_id: str, current_player: dict
     if player_id == crew['created_by']:
         raise HTTPException(status_code=400, detail="Cannot remove crew creator")
     
-    await db.crew_members.delete_one({"crew_id": crew_id, "player_id": player_id})
+    result = await db.crew_members.delete_one({"crew_id": crew_id, "player_id": player_id})
+    if result.deleted_count:
+        await db.crews.update_one({"id": crew_id}, {"$inc": {"member_count": -1}})
+        await touch_visibility([player_id])
     
     return {"message": "Member removed successfully"}
 
+
+async def remove_duplicate_crew_members() -> int:
+    """Delete all but the first membership row per (crew_id, player_id)."""
+    duplicates = db.crew_members.aggregate([
+        {"$group": {"_id": {"crew_id": "$crew_id", "player_id": "$player_id"}, "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ])
+    extra_ids = [oid for group in await duplicates.to_list(None) for oid in group["ids"][1:]]
+    if extra_ids:
+        await db.crew_members.delete_many({"_id": {"$in": extra_ids}})
+        logger.warning(f"Removed {len(extra_ids)} duplicate crew memberships")
+    return len(extra_ids)
+
+
+async def repair_crew_member_counts() -> dict:
+    """Recount crews.member_count from crew_members with one $group aggregation."""
+    counts = {
+        row["_id"]: row["count"]
+        async for row in db.crew_members.aggregate([{"$group": {"_id": "$crew_id", "count": {"$sum": 1}}}])
+    }
+    crews = await db.crews.find({}, {"_id": 0, "id": 1, "member_count": 1}).to_list(None)
+    ops = [
+        UpdateOne({"id": crew['id']}, {"$set": {"member_count": counts.get(crew['id'], 0)}})
+        for crew in crews
+        if crew.get('member_count') != counts.get(crew['id'], 0)
+    ]
+    write = await bulk_write_batched(db.crews, ops, "crews.member_count")
+    return {"crews": len(crews), "repaired": write['modified']}
+
+
+@api_router.post("/admin/crews/repair-member-counts")
+async def repair_crew_member_counts_endpoint(current_player: dict = Depends(get_current_player)):
+    """Recompute denormalized crew member counts from crew_members."""
+    return await repair_crew_member_counts()
+
 # ==================== FAVORITES ROUTES ====================
 
 @api_router.get("/favorites")
@@ -1227,114 +1583,369 @@ async def add_favorite(favorite_player_id: str, current_player: dict = Depends(g
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     await db.favorites.insert_one(favorite_doc)
+    await touch_visibility([current_player['id'], favorite_player_id])
     
     return {"message": "Added to favorites"}
 
 @api_router.delete("/favorites/{favorite_player_id}")
 async def remove_favorite(favorite_player_id: str, current_player: dict = Depends(get_current_player)):
-    await db.favorites.delete_one({
+    result = await db.favorites.delete_one({
         "player_id": current_player['id'],
         "favorite_player_id": favorite_player_id
     })
+    if result.deleted_count:
+        await touch_visibility([current_player['id'], favorite_player_id])
     
     return {"message": "Removed from favorites"}
 
-# ==================== REQUEST ROUTES ====================
-
-@api_router.get("/requests")
-async def list_requests(current_player: dict = Depends(get_current_player)):
-    now = datetime.now(timezone.utc)
-    
-    # Get player's crews
-    memberships = await db.crew_members.find({"player_id": current_player['id']}).to_list(1000)
-    player_crew_ids = [m['crew_id'] for m in memberships]
-    
-    # Get player's favorites (players who have favorited the current player)
-    favorited_by = await db.favorites.find({"favorite_player_id": current_player['id']}).to_list(1000)
-    favorited_by_ids = [f['player_id'] for f in favorited_by]
-    
-    # Get all requests the user has responded to (for "My Games" section)
-    user_responses = await db.responses.find({"player_id": current_player['id']}).to_list(1000)
-    responded_request_ids = [r['request_id'] for r in user_responses]
-    
-    # Build query for visible requests - open requests OR requests user has responded to
-    base_query = {"date_time": {"$gt": now.isoformat()}}
-    
-    # Filter based on visibility settings for open games
-    if current_player.get('visibility') == 'hidden':
-        # Hidden players only see their own requests
-        visibility_filter = [{"organizer_id": current_player['id']}]
-    elif current_player.get('visibility') == 'crews_only':
-        # Only see requests targeting their crews
-        visibility_filter = [
-            {"organizer_id": current_player['id']},
-            {"$and": [{"audience": "crews"}, {"target_crew_ids": {"$in": player_crew_ids}}, {"status": "open"}]}
-        ]
-    else:
+# ==================== VISIBILITY CONTEXT ====================
+#
+# Whether a player sees (or is notified about) a request depends on their crews, who has
+# favorited them, their clubs, visibility setting and PTI. VisibilityContext holds those
+# as compact sets and is cached per player, versioned by players.visibility_version,
+# which crew, favorite and profile writes bump via touch_visibility().
+
+class VisibilityContext:
+    """A player's feed/notification visibility inputs."""
+
+    __slots__ = ("player_id", "crew_ids", "favorited_by_ids", "favorite_ids", "clubs", "visibility", "pti")
+
+    def __init__(self, player: dict, crew_ids, favorited_by_ids, favorite_ids):
+        self.player_id = player['id']
+        self.crew_ids = frozenset(crew_ids)
+        self.favorited_by_ids = frozenset(favorited_by_ids)  # players who favorited this player
+        self.favorite_ids = frozenset(favorite_ids)  # players this player favorited
+        self.clubs = frozenset(c for c in [player.get('home_club'), *(player.get('other_clubs') or [])] if c)
+        self.visibility = player.get('visibility')
+        self.pti = player.get('pti')
+
+    def feed_filters(self) -> List[dict]:
+        """$or clauses selecting the requests this player's feed can show."""
+        own = {"organizer_id": self.player_id}
+        crews = {"$and": [{"audience": "crews"}, {"target_crew_ids": {"$in": list(self.crew_ids)}}, {"status": "open"}]}
+        if self.visibility == 'hidden':
+            # Hidden players only see their own requests
+            return [own]
+        if self.visibility == 'crews_only':
+            # Only see requests targeting their crews
+            return [own, crews]
         # Everyone visibility - see all applicable open requests
-        visibility_filter = [
-            {"organizer_id": current_player['id']},
+        return [
+            own,
             {"$and": [{"audience": "regional"}, {"status": "open"}]},
-            {"$and": [{"audience": "club"}, {"club": {"$in": [current_player.get('home_club')] + current_player.get('other_clubs', [])}}, {"status": "open"}]},
-            {"$and": [{"audience": "crews"}, {"target_crew_ids": {"$in": player_crew_ids}}, {"status": "open"}]},
-            {"$and": [{"organizer_id": {"$in": favorited_by_ids}}, {"status": "open"}]}
+            {"$and": [{"audience": "club"}, {"club": {"$in": list(self.clubs)}}, {"status": "open"}]},
+            crews,
+            {"$and": [{"organizer_id": {"$in": list(self.favorited_by_ids)}}, {"status": "open"}]}
         ]
-    
-    # Also include requests user has responded to (regardless of status, for My Games)
-    if responded_request_ids:
-        visibility_filter.append({"id": {"$in": responded_request_ids}})
-    
-    query = {
-        **base_query,
-        "$or": visibility_filter
-    }
-    
-    requests = await db.requests.find(query, {"_id": 0}).to_list(1000)
-    
-    # Filter by skill level if player has PTI
-    player_pti = current_player.get('pti')
-    filtered_requests = []
-    for req in requests:
-        # Always include own requests
-        if req['organizer_id'] == current_player['id']:
-            filtered_requests.append(req)
-            continue
-        
-        # Check skill filter
-        skill_min = req.get('skill_min')
-        skill_max = req.get('skill_max')
-        
-        if skill_min is None and skill_max is None:
-            # No skill filter, include
-            filtered_requests.append(req)
-        elif player_pti is None:
-            # Player has no PTI, include them (don't exclude unrated players)
-            filtered_requests.append(req)
-        else:
-            # Check if player's PTI is in range
-            in_range = True
-            if skill_min is not None and player_pti < skill_min:
-                in_range = False
-            if skill_max is not None and player_pti > skill_max:
-                in_range = False
-            if in_range:
-                filtered_requests.append(req)
-    
-    # Add organizer info and response status to each request
-    for req in filtered_requests:
-        organizer = await db.players.find_one({"id": req['organizer_id']}, {"_id": 0, "password_hash": 0})
-        req['organizer'] = organizer
-        
-        # Check if current player has responded
-        response = await db.responses.find_one({
-            "request_id": req['id'],
-            "player_id": current_player['id']
-        }, {"_id": 0})
-        req['my_response'] = response
-    
-    # Sort by date_time
-    filtered_requests.sort(key=lambda x: x['date_time'])
-    
+
+    def in_target_crews(self, request: dict) -> bool:
+        return request.get('audience') == 'crews' and not self.crew_ids.isdisjoint(request.get('target_crew_ids') or [])
+
+    def skill_ok(self, request: dict) -> bool:
+        """Unrated players pass every skill filter."""
+        if self.pti is None:
+            return True
+        if request.get('skill_min') is not None and self.pti < request['skill_min']:
+            return False
+        if request.get('skill_max') is not None and self.pti > request['skill_max']:
+            return False
+        return True
+
+    def can_see(self, request: dict) -> bool:
+        """Whether a request shows up in this player's feed (the feed_filters rules plus skill)."""
+        if request['organizer_id'] == self.player_id:
+            return True
+        if request.get('status') != 'open' or self.visibility == 'hidden':
+            return False
+        if self.visibility == 'crews_only':
+            visible = self.in_target_crews(request)
+        else:
+            visible = (
+                request.get('audience') == 'regional'
+                or (request.get('audience') == 'club' and request['club'] in self.clubs)
+                or self.in_target_crews(request)
+                or request['organizer_id'] in self.favorited_by_ids
+            )
+        return visible and self.skill_ok(request)
+
+    def wants_notification(self, request: dict) -> bool:
+        """Whether an audience member should be notified about a request."""
+        if self.visibility == 'hidden':
+            return False
+        if self.visibility == 'crews_only' and self.crew_ids.isdisjoint(request.get('target_crew_ids') or []):
+            return False
+        return self.skill_ok(request)
+
+
+_visibility_cache = VersionedCache(max_entries=5000)
+
+
+async def get_visibility_contexts(players: List[dict]) -> dict:
+    """player id -> VisibilityContext; cache misses are loaded with one $in query per collection."""
+    contexts = {}
+    missing = []
+    for player in players:
+        context = _visibility_cache.get(player['id'], player.get('visibility_version', 0))
+        if context is None:
+            missing.append(player)
+        else:
+            contexts[player['id']] = context
+    if not missing:
+        return contexts
+
+    ids = [p['id'] for p in missing]
+    crew_ids, favorited_by, favorites = {}, {}, {}
+    async for m in db.crew_members.find({"player_id": {"$in": ids}}, {"_id": 0, "player_id": 1, "crew_id": 1}):
+        crew_ids.setdefault(m['player_id'], []).append(m['crew_id'])
+    async for f in db.favorites.find(
+        {"$or": [{"favorite_player_id": {"$in": ids}}, {"player_id": {"$in": ids}}]},
+        {"_id": 0, "player_id": 1, "favorite_player_id": 1}
+    ):
+        favorited_by.setdefault(f['favorite_player_id'], []).append(f['player_id'])
+        favorites.setdefault(f['player_id'], []).append(f['favorite_player_id'])
+
+    for player in missing:
+        context = VisibilityContext(
+            player,
+            crew_ids.get(player['id'], ()),
+            favorited_by.get(player['id'], ()),
+            favorites.get(player['id'], ())
+        )
+        _visibility_cache.set(player['id'], player.get('visibility_version', 0), context)
+        contexts[player['id']] = context
+    return contexts
+
+
+async def get_visibility_context(player: dict) -> VisibilityContext:
+    return (await get_visibility_contexts([player]))[player['id']]
+
+
+async def touch_visibility(player_ids):
+    """Invalidate the cached visibility context of these players (in every process) and queue an inbox re-pull."""
+    player_ids = [pid for pid in set(player_ids) if pid]
+    if not player_ids:
+        return
+    await db.players.update_many({"id": {"$in": player_ids}}, {"$inc": {"visibility_version": 1}})
+    enqueue_inbox_refresh(player_ids)
+
+
+# Background inbox re-pulls, referenced until done (see _notification_tasks)
+_inbox_refresh_tasks: set = set()
+
+
+def enqueue_inbox_refresh(player_ids):
+    """Re-pull these players' inboxes in the background, off the request path (a bulk crew add touches 100)."""
+    player_ids = [pid for pid in set(player_ids) if pid]
+    if not player_ids:
+        return
+
+    async def run():
+        players = await db.players.find({"id": {"$in": player_ids}}, {"_id": 0, "password_hash": 0}).to_list(None)
+        for player in players:
+            try:
+                await refresh_player_inbox(player)
+            except Exception as e:
+                logger.error(f"Inbox refresh failed for {player['id']}: {e}")
+
+    task = asyncio.create_task(run())
+    _inbox_refresh_tasks.add(task)
+    task.add_done_callback(_inbox_refresh_tasks.discard)
+
+# ==================== REQUEST INBOX ====================
+#
+# Fan-out on write: each player's Home feed is materialized as request_inbox rows
+#   {player_id, request_id, date_time_utc}
+# written when a request is created or its audience/status changes (sync_request_inbox),
+# when a player responds, and re-pulled for one player when their own visibility inputs
+# change (refresh_player_inbox). The feed is then one range read on
+# (player_id, date_time_utc). Rows for past games are removed by a TTL index.
+
+async def resolve_feed_audience(request: dict) -> set:
+    """Ids of players whose feed shows an open request (VisibilityContext.can_see, inverted)."""
+    everyone_visibility = {"visibility": {"$nin": ["hidden", "crews_only"]}}
+    clauses = []
+    if request.get('audience') == 'regional':
+        clauses.append(everyone_visibility)
+    elif request.get('audience') == 'club':
+        clauses.append({**everyone_visibility, "$or": [{"home_club": request['club']}, {"other_clubs": request['club']}]})
+    elif request.get('audience') == 'crews' and request.get('target_crew_ids'):
+        member_ids = await db.crew_members.distinct("player_id", {"crew_id": {"$in": request['target_crew_ids']}})
+        clauses.append({"id": {"$in": member_ids}, "visibility": {"$ne": "hidden"}})
+
+    # Players the organizer favorited see all of the organizer's open requests
+    favorite_ids = await db.favorites.distinct("favorite_player_id", {"player_id": request['organizer_id']})
+    if favorite_ids:
+        clauses.append({**everyone_visibility, "id": {"$in": favorite_ids}})
+    if not clauses:
+        return set()
+
+    skill_min, skill_max = request.get('skill_min'), request.get('skill_max')
+    audience = set()
+    async for player in db.players.find({"$or": clauses}, {"_id": 0, "id": 1, "pti": 1}):
+        pti = player.get('pti')
+        if pti is not None and ((skill_min is not None and pti < skill_min) or (skill_max is not None and pti > skill_max)):
+            continue
+        audience.add(player['id'])
+    return audience
+
+
+async def write_inbox_rows(request: dict, player_ids) -> dict:
+    """Upsert inbox rows putting one request in these players' feeds."""
+    date_time_utc = request.get('date_time_utc') or utc_datetime(request['date_time'])
+    now = datetime.now(timezone.utc).isoformat()
+    ops = [
+        UpdateOne(
+            {"player_id": pid, "request_id": request['id']},
+            {"$set": {"date_time_utc": date_time_utc}, "$setOnInsert": {"added_at": now}},
+            upsert=True
+        )
+        for pid in player_ids
+    ]
+    return await bulk_write_batched(db.request_inbox, ops, "request_inbox")
+
+
+async def sync_request_inbox(request: dict):
+    """
+    Make one request's inbox rows match who can see it now: the organizer and responders
+    always, plus the resolved audience while it is open. Cancelling or filling a request
+    prunes everyone else.
+    """
+    player_ids = {request['organizer_id'], *await db.responses.distinct("player_id", {"request_id": request['id']})}
+    if request.get('status') == 'open':
+        player_ids |= await resolve_feed_audience(request)
+    await prune_inbox_rows({"request_id": request['id'], "player_id": {"$nin": list(player_ids)}})
+    await write_inbox_rows(request, player_ids)
+
+
+async def refresh_player_inbox(player: dict):
+    """Re-pull one player's inbox with the feed query, after their visibility inputs changed."""
+    now = datetime.now(timezone.utc)
+    context = await get_visibility_context(player)
+    responded_ids = await db.responses.distinct("request_id", {"player_id": player['id']})
+    filters = context.feed_filters()
+    if responded_ids:
+        filters.append({"id": {"$in": responded_ids}})
+
+    requests = await db.requests.find(
+        {"date_time_utc": {"$gt": now}, "$or": filters},
+        {"_id": 0, "id": 1, "organizer_id": 1, "date_time_utc": 1, "skill_min": 1, "skill_max": 1}
+    ).to_list(None)
+    visible = [
+        r for r in requests
+        if r['organizer_id'] == player['id'] or r['id'] in responded_ids or context.skill_ok(r)
+    ]
+
+    await prune_inbox_rows({"player_id": player['id'], "request_id": {"$nin": [r['id'] for r in visible]}})
+    added_at = datetime.now(timezone.utc).isoformat()
+    await bulk_write_batched(db.request_inbox, [
+        UpdateOne(
+            {"player_id": player['id'], "request_id": r['id']},
+            {"$set": {"date_time_utc": r['date_time_utc']}, "$setOnInsert": {"added_at": added_at}},
+            upsert=True
+        ) for r in visible
+    ], "request_inbox")
+
+
+async def rebuild_request_inbox() -> dict:
+    """Fan out every upcoming request again (backfill / repair)."""
+    requests = await db.requests.find(
+        {"date_time_utc": {"$gt": datetime.now(timezone.utc)}}, {"_id": 0}
+    ).to_list(None)
+    for request in requests:
+        await sync_request_inbox(request)
+    return {"requests": len(requests), "rows": await db.request_inbox.count_documents({})}
+
+
+@api_router.post("/admin/request-inbox/rebuild")
+async def rebuild_request_inbox_endpoint(current_player: dict = Depends(get_current_player)):
+    """Recompute every upcoming request's inbox rows"""
+    return await rebuild_request_inbox()
+
+# ==================== REQUEST ROUTES ====================
+
+REQUEST_FEED_MAX_LIMIT = 1000
+
+@api_router.get("/requests")
+async def list_requests(
+    request: Request,
+    response: Response,
+    limit: int = Query(REQUEST_FEED_MAX_LIMIT, ge=1, le=REQUEST_FEED_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    current_player: dict = Depends(get_current_player)
+):
+    """
+    The player's upcoming games, ordered by (date_time, id). Pages of `limit` are walked
+    with the opaque cursor from the X-Next-Cursor header. A weak ETag over the page's
+    requests, their organizers' profiles and the caller's responses lets an unchanged
+    page return 304 without loading full organizer profiles.
+    """
+    now = datetime.now(timezone.utc)
+    
+    # The inbox already holds exactly the requests this player can see (visibility and
+    # skill applied at fan-out), plus their own and the ones they responded to
+    query = {"player_id": current_player['id'], "date_time_utc": {"$gt": now}}
+    if cursor:
+        position = decode_cursor(cursor)
+        try:
+            after, after_id = utc_datetime(position['t']), str(position['id'])
+        except (KeyError, TypeError, ValueError, AttributeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query["$or"] = [
+            {"date_time_utc": {"$gt": after}},
+            {"date_time_utc": after, "request_id": {"$gt": after_id}}
+        ]
+    inbox = await db.request_inbox.find(query, {"_id": 0, "request_id": 1, "date_time_utc": 1}).sort(
+        [("date_time_utc", 1), ("request_id", 1)]
+    ).limit(limit + 1).to_list(limit + 1)
+    
+    headers = {"Cache-Control": "private, no-cache"}
+    if len(inbox) > limit:
+        inbox = inbox[:limit]
+        last = inbox[-1]
+        headers["X-Next-Cursor"] = encode_cursor({"t": utc_datetime(last['date_time_utc']).isoformat(), "id": last['request_id']})
+    request_ids = [row['request_id'] for row in inbox]
+    
+    requests_by_id = {
+        r['id']: r for r in await db.requests.find(
+            {"id": {"$in": request_ids}}, REQUEST_PROJECTION
+        ).to_list(len(request_ids) or 1)
+    }
+    filtered_requests = [requests_by_id[rid] for rid in request_ids if rid in requests_by_id]
+    
+    # The body also embeds each organizer's profile and the caller's own response
+    organizer_ids = list({r['organizer_id'] for r in filtered_requests})
+    organizer_versions = await db.players.find(
+        {"id": {"$in": organizer_ids}}, {"_id": 0, "id": 1, "updated_at": 1}
+    ).to_list(None)
+    my_responses = await db.responses.find(
+        {"player_id": current_player['id'], "request_id": {"$in": request_ids}},
+        {"_id": 0}
+    ).to_list(len(request_ids) or 1)
+    my_responses_by_request = {r['request_id']: r for r in my_responses}
+    
+    latest = max((r.get('updated_at') or r.get('created_at') or "" for r in filtered_requests), default="")
+    fingerprint = "|".join([
+        current_player['id'], str(cursor), str(limit), latest,
+        ",".join(r['id'] for r in filtered_requests),
+        ",".join(sorted(f"{p['id']}:{p.get('updated_at')}" for p in organizer_versions)),
+        ",".join(sorted(f"{r['id']}:{r['status']}:{r.get('updated_at')}" for r in my_responses)),
+    ])
+    headers["ETag"] = 'W/"' + hashlib.sha1(fingerprint.encode()).hexdigest() + '"'
+    if if_none_match(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    
+    # Add organizer info and response status to each request
+    organizers = await db.players.find(
+        {"id": {"$in": organizer_ids}},
+        {"_id": 0, "password_hash": 0}
+    ).to_list(None)
+    organizers_by_id = {p['id']: p for p in organizers}
+    
+    for req in filtered_requests:
+        req['organizer'] = organizers_by_id.get(req['organizer_id'])
+        req['my_response'] = my_responses_by_request.get(req['id'])
+    
     return filtered_requests
 
 @api_router.post("/requests")
@@ -1344,6 +1955,7 @@ async def create_request(data: RequestCreate, current_player: dict = Depends(get
         "id": request_id,
         "organizer_id": current_player['id'],
         "date_time": data.date_time.isoformat(),
+        "date_time_utc": utc_datetime(data.date_time),
         "club": data.club,
         "court": data.court,
         "spots_needed": data.spots_needed,
@@ -1364,103 +1976,99 @@ async def create_request(data: RequestCreate, current_player: dict = Depends(get
     
     # Remove _id from response
     request_doc.pop('_id', None)
+    request_doc.pop('date_time_utc', None)
+    
+    await sync_request_inbox(request_doc)
     
+    # Rank likely players inline; the best candidates are notified first
+    ranking = await rank_request_candidates(request_doc, current_player, limit=None)
+
+    # Players who posted availability for this day and club get a targeted notice instead
+    matched_ids = await match_request_to_availability(request_doc, current_player, ranking)
+
     # Send notifications to target audience
-    await notify_request_audience(request_doc, current_player)
+    await notify_request_audience(request_doc, current_player, ranking=ranking, exclude_ids=matched_ids)
     
+    request_doc['top_candidates'] = ranking[:5]
     return request_doc
 
-async def notify_request_audience(request: dict, organizer: dict):
-    """Notify players based on request audience"""
-    player_ids_to_notify = set()
-    
+async def notify_request_audience(
+    request: dict,
+    organizer: dict,
+    ranking: Optional[List[dict]] = None,
+    exclude_ids: Optional[set] = None
+):
+    """Notify players based on request audience, best-ranked candidates first"""
+    player_query = {"profile_complete": True}
+
     if request['audience'] == 'crews':
-        # Get members of target crews
-        for crew_id in request.get('target_crew_ids', []):
-            members = await db.crew_members.find({"crew_id": crew_id}).to_list(1000)
-            for m in members:
-                player_ids_to_notify.add(m['player_id'])
-        
-        # Also notify favorites
-        favorites = await db.favorites.find({"player_id": organizer['id']}).to_list(1000)
-        for f in favorites:
-            player_ids_to_notify.add(f['favorite_player_id'])
-    
+        # Members of target crews, plus the organizer's favorites
+        members = await db.crew_members.find(
+            {"crew_id": {"$in": request.get('target_crew_ids', [])}},
+            {"_id": 0, "player_id": 1}
+        ).to_list(None)
+        organizer_context = await get_visibility_context(organizer)
+        player_query = {"id": {"$in": list({m['player_id'] for m in members} | organizer_context.favorite_ids)}}
+
     elif request['audience'] == 'club':
         # Get players at the target clubs
         target_clubs = request.get('target_club_names', [])
         # Fallback to request's club if no target clubs specified
         if not target_clubs:
             target_clubs = [request['club']]
+        player_query["$or"] = [
+            {"home_club": {"$in": target_clubs}},
+            {"other_clubs": {"$in": target_clubs}}
+        ]
+
+    elif request['audience'] != 'regional':
+        return
+
+    players = await db.players.find(player_query, {"_id": 0, "password_hash": 0}).to_list(None)
+
+    # Remove organizer (and anyone already notified another way) from notifications
+    excluded = (exclude_ids or set()) | {organizer['id']}
+    players = [p for p in players if p['id'] not in excluded]
+
+    if ranking is None:
+        ranking = await rank_request_candidates(request, organizer, limit=None)
+    rank = {c['player_id']: i for i, c in enumerate(ranking)}
+    players.sort(key=lambda p: rank.get(p['id'], len(rank)))
 
-        players = await db.players.find({
-            "$or": [
-                {"home_club": {"$in": target_clubs}},
-                {"other_clubs": {"$in": target_clubs}}
-            ],
-            "profile_complete": True
-        }).to_list(1000)
-        for p in players:
-            player_ids_to_notify.add(p['id'])
-    
-    elif request['audience'] == 'regional':
-        # Notify everyone (with profile complete)
-        players = await db.players.find({"profile_complete": True}).to_list(1000)
-        for p in players:
-            player_ids_to_notify.add(p['id'])
-    
-    # Remove organizer from notifications
-    player_ids_to_notify.discard(organizer['id'])
-    
     # Filter by visibility and skill
-    for player_id in player_ids_to_notify:
-        player = await db.players.find_one({"id": player_id})
-        if not player:
-            continue
-        
-        # Check visibility
-        if player.get('visibility') == 'hidden':
-            continue
-        if player.get('visibility') == 'crews_only':
-            # Check if player is in one of the target crews
-            memberships = await db.crew_members.find({"player_id": player_id}).to_list(1000)
-            player_crew_ids = [m['crew_id'] for m in memberships]
-            if not any(cid in request.get('target_crew_ids', []) for cid in player_crew_ids):
-                continue
-        
-        # Check skill filter
-        skill_min = request.get('skill_min')
-        skill_max = request.get('skill_max')
-        player_pti = player.get('pti')
-        
-        if skill_min is not None or skill_max is not None:
-            if player_pti is not None:
-                if skill_min is not None and player_pti < skill_min:
-                    continue
-                if skill_max is not None and player_pti > skill_max:
-                    continue
-        
-        # Send notification
-        time_str = request['date_time'].split('T')[1][:5] if 'T' in request['date_time'] else request['date_time']
-        await notify_player(
+    contexts = await get_visibility_contexts(players)
+    time_str = request['date_time'].split('T')[1][:5] if 'T' in request['date_time'] else request['date_time']
+    enqueue_notifications([
+        (
             player,
             f"{organizer.get('name', 'Someone')} needs players",
             f"Need {request['spots_needed']} for {request['club']} at {time_str}",
-            notification_id="new_game_request"
+            "new_game_request"
         )
+        for player in players
+        if contexts[player['id']].wants_notification(request)
+    ])
 
 @api_router.get("/requests/{request_id}")
 async def get_request(request_id: str, current_player: dict = Depends(get_current_player)):
-    request = await db.requests.find_one({"id": request_id}, {"_id": 0})
+    request = await db.requests.find_one({"id": request_id}, REQUEST_PROJECTION)
+    archived_responses = None
     if not request:
-        raise HTTPException(status_code=404, detail="Request not found")
+        # Past games are moved to the archive by the expiry sweeper
+        request = await db.requests_archive.find_one({"id": request_id}, REQUEST_PROJECTION)
+        if not request:
+            raise HTTPException(status_code=404, detail="Request not found")
+        archived_responses = request.pop('responses', [])
     
     # Get organizer info
     organizer = await db.players.find_one({"id": request['organizer_id']}, {"_id": 0, "password_hash": 0})
     request['organizer'] = organizer
     
     # Get responses with player info
-    responses = await db.responses.find({"request_id": request_id}, {"_id": 0}).to_list(1000)
+    if archived_responses is not None:
+        responses = archived_responses
+    else:
+        responses = await db.responses.find({"request_id": request_id}, {"_id": 0}).to_list(1000)
     for resp in responses:
         player = await db.players.find_one({"id": resp['player_id']}, {"_id": 0, "password_hash": 0})
         resp['player'] = player
@@ -1468,11 +2076,8 @@ async def get_request(request_id: str, current_player: dict = Depends(get_curren
     request['responses'] = responses
     
     # Check if current player has responded
-    my_response = await db.responses.find_one({
-        "request_id": request_id,
-        "player_id": current_player['id']
-    }, {"_id": 0})
-    request['my_response'] = my_response
+    my_response = next((r for r in responses if r['player_id'] == current_player['id']), None)
+    request['my_response'] = {k: v for k, v in my_response.items() if k != 'player'} if my_response else None
     request['is_organizer'] = request['organizer_id'] == current_player['id']
     
     return request
@@ -1495,7 +2100,8 @@ async def update_request(request_id: str, data: RequestUpdate, current_player: d
     
     await db.requests.update_one({"id": request_id}, {"$set": update_data})
     
-    updated_request = await db.requests.find_one({"id": request_id}, {"_id": 0})
+    updated_request = await db.requests.find_one({"id": request_id}, REQUEST_PROJECTION)
+    await sync_request_inbox(updated_request)
     
     # If audience expanded, notify new audience
     if new_audience and new_audience != old_audience:
@@ -1517,6 +2123,8 @@ async def cancel_request(request_id: str, current_player: dict = Depends(get_cur
         {"id": request_id},
         {"$set": {"status": "cancelled", "updated_at": datetime.now(timezone.utc).isoformat()}}
     )
+    # Only the organizer and responders keep a cancelled game in their feed
+    await sync_request_inbox({**request, "status": "cancelled"})
     
     # Notify confirmed players
     confirmed_responses = await db.responses.find({
@@ -1536,6 +2144,237 @@ async def cancel_request(request_id: str, current_player: dict = Depends(get_cur
     
     return {"message": "Request cancelled"}
 
+# ==================== CANDIDATE RANKING ====================
+#
+# Scores every eligible player for a request so organizers (and the audience
+# notifier) can reach the most likely fourths first. League-wide player
+# features live in compact NumPy arrays rebuilt when the player directory
+# changes (or every CANDIDATE_INDEX_TTL for responsiveness); per-request
+# features (crews, chemistry with the organizer, availability that day) are a
+# handful of indexed reads, and the scoring itself is a few vector operations.
+
+CANDIDATE_WEIGHTS = {
+    "pti": 3.0,
+    "club": 2.0,
+    "chemistry": 2.0,
+    "responsiveness": 1.5,
+    "available": 3.0,
+}
+CANDIDATE_PTI_SCALE = 5.0  # PTI points at which the fit score has dropped to 1/e
+CANDIDATE_RESPONSE_WINDOW = timedelta(days=60)
+CANDIDATE_INDEX_TTL = 300  # seconds
+
+VISIBILITY_CODES = {"everyone": 0, "crews_only": 1, "hidden": 2}
+
+
+class CandidateIndex:
+    """League-wide player features as parallel arrays, one row per complete profile."""
+
+    def __init__(self, players: List[dict], response_counts: dict):
+        n = len(players)
+        self.ids = [p['id'] for p in players]
+        self.id_index = {pid: i for i, pid in enumerate(self.ids)}
+        self.key_index = {}
+        for i, p in enumerate(players):
+            key = p.get('normalized_name') or normalize_name(p.get('name') or '')
+            if key:
+                self.key_index.setdefault(key, i)
+
+        self.pti = np.array([p['pti'] if p.get('pti') is not None else np.nan for p in players], dtype=np.float32)
+        self.visibility = np.array([VISIBILITY_CODES.get(p.get('visibility'), 0) for p in players], dtype=np.int8)
+
+        # Club membership as a players x clubs boolean matrix
+        self.club_index = {}
+        rows, cols = [], []
+        for i, p in enumerate(players):
+            for club in {p.get('home_club'), *(p.get('other_clubs') or [])}:
+                if club:
+                    rows.append(i)
+                    cols.append(self.club_index.setdefault(club, len(self.club_index)))
+        self.clubs = np.zeros((n, max(len(self.club_index), 1)), dtype=bool)
+        self.clubs[rows, cols] = True
+
+        # Saturating score: a few recent responses already count as responsive
+        counts = np.array([response_counts.get(pid, 0) for pid in self.ids], dtype=np.float32)
+        self.responsiveness = 1.0 - np.exp(-counts / 3.0)
+
+    def mask_for_ids(self, player_ids) -> np.ndarray:
+        mask = np.zeros(len(self.ids), dtype=bool)
+        mask[[self.id_index[pid] for pid in player_ids if pid in self.id_index]] = True
+        return mask
+
+    def club_mask(self, clubs: List[str]) -> np.ndarray:
+        columns = [self.club_index[c] for c in clubs if c in self.club_index]
+        if not columns:
+            return np.zeros(len(self.ids), dtype=bool)
+        return self.clubs[:, columns].any(axis=1)
+
+
+_candidate_index_cache = VersionedCache(max_entries=1)
+
+
+async def get_candidate_index() -> CandidateIndex:
+    version = (await get_generation("player_directory"), int(time.time() // CANDIDATE_INDEX_TTL))
+    index = _candidate_index_cache.get("current", version)
+    if index is not None:
+        return index
+
+    players = await db.players.find(
+        {"profile_complete": True},
+        {"_id": 0, "id": 1, "name": 1, "normalized_name": 1, "pti": 1, "visibility": 1, "home_club": 1, "other_clubs": 1}
+    ).to_list(None)
+    since = datetime.now(timezone.utc) - CANDIDATE_RESPONSE_WINDOW
+    counts = Counter()
+    async for row in db.responses.aggregate([
+        {"$match": {"responded_at": {"$gte": since.isoformat()}}},
+        {"$group": {"_id": "$player_id", "count": {"$sum": 1}}}
+    ]):
+        counts[row['_id']] += row['count']
+    # Responses to games already played live on in the archive, embedded in their request;
+    # a response inside the window is to a game played inside it
+    async for row in db.requests_archive.aggregate([
+        {"$match": {"date_time_utc": {"$gte": since}}},
+        {"$unwind": "$responses"},
+        {"$match": {"responses.responded_at": {"$gte": since.isoformat()}}},
+        {"$group": {"_id": "$responses.player_id", "count": {"$sum": 1}}}
+    ]):
+        counts[row['_id']] += row['count']
+
+    index = CandidateIndex(players, counts)
+    _candidate_index_cache.set("current", version, index)
+    return index
+
+
+async def rank_request_candidates(request: dict, organizer: dict, limit: Optional[int] = 10) -> List[dict]:
+    """
+    Score every player eligible for a request (its audience, their visibility and the
+    skill window) and return the best `limit` as {player_id, score, features}, best first.
+    limit=None returns every eligible player.
+    """
+    index = await get_candidate_index()
+    n = len(index.ids)
+    if n == 0:
+        return []
+
+    target_crew_ids = request.get('target_crew_ids', [])
+    crew_members = await db.crew_members.find(
+        {"crew_id": {"$in": target_crew_ids}},
+        {"_id": 0, "player_id": 1}
+    ).to_list(None) if target_crew_ids else []
+    in_target_crews = index.mask_for_ids(m['player_id'] for m in crew_members)
+
+    # Audience
+    if request['audience'] == 'crews':
+        favorites = await db.favorites.find({"player_id": organizer['id']}, {"_id": 0, "favorite_player_id": 1}).to_list(None)
+        eligible = in_target_crews | index.mask_for_ids(f['favorite_player_id'] for f in favorites)
+    elif request['audience'] == 'club':
+        eligible = index.club_mask(request.get('target_club_names') or [request['club']])
+    else:
+        eligible = np.ones(n, dtype=bool)
+
+    # Visibility
+    eligible &= index.visibility != VISIBILITY_CODES['hidden']
+    eligible &= (index.visibility != VISIBILITY_CODES['crews_only']) | in_target_crews
+
+    # Skill window (unrated players stay eligible)
+    skill_min, skill_max = request.get('skill_min'), request.get('skill_max')
+    rated = ~np.isnan(index.pti)
+    if skill_min is not None:
+        eligible &= ~rated | (index.pti >= skill_min)
+    if skill_max is not None:
+        eligible &= ~rated | (index.pti <= skill_max)
+
+    # Not the organizer, not anyone who already responded
+    responses = await db.responses.find({"request_id": request['id']}, {"_id": 0, "player_id": 1}).to_list(None)
+    eligible &= ~index.mask_for_ids([organizer['id']] + [r['player_id'] for r in responses])
+
+    # PTI fit around the window's midpoint, else the organizer's own PTI
+    if skill_min is not None and skill_max is not None:
+        target = (skill_min + skill_max) / 2
+    else:
+        target = skill_min if skill_min is not None else skill_max
+        if target is None:
+            target = organizer.get('pti')
+    if target is None:
+        pti_fit = np.full(n, 0.5, dtype=np.float32)
+    else:
+        pti_fit = np.exp(-np.square((index.pti - target) / CANDIDATE_PTI_SCALE))
+        pti_fit = np.where(rated, pti_fit, 0.5)
+
+    club = index.club_mask([request['club']]).astype(np.float32)
+
+    # Chemistry with the organizer: match volume together, weighted by win rate
+    chemistry = np.zeros(n, dtype=np.float32)
+    organizer_key = await get_player_identity_key(organizer)
+    rows = await db.partner_stat_rows.find(
+        {"normalized_name": organizer_key},
+        {"_id": 0, "partner_key": 1, "matches_played": 1, "wins": 1}
+    ).to_list(None)
+    rows = [r for r in rows if r['partner_key'] in index.key_index]
+    if rows:
+        positions = np.array([index.key_index[r['partner_key']] for r in rows])
+        played = np.array([r['matches_played'] for r in rows], dtype=np.float32)
+        win_rate = np.array([r.get('wins', 0) for r in rows], dtype=np.float32) / np.maximum(played, 1)
+        chemistry[positions] = np.minimum(np.log1p(played) / np.log1p(10), 1.0) * (0.5 + 0.5 * win_rate)
+
+    # Posted availability for the request's local date (at this club or any club)
+    posts = await db.availability_posts.find(
+        {
+            "available_date": local_date(request['date_time']),
+            "expires_at_utc": {"$gt": datetime.now(timezone.utc)},
+            **availability_club_clause(request['club'])
+        },
+        {"_id": 0, "player_id": 1}
+    ).to_list(None)
+    available = index.mask_for_ids(p['player_id'] for p in posts).astype(np.float32)
+
+    features = {
+        "pti": pti_fit,
+        "club": club,
+        "chemistry": chemistry,
+        "responsiveness": index.responsiveness,
+        "available": available,
+    }
+    scores = sum(CANDIDATE_WEIGHTS[name] * values for name, values in features.items())
+    scores = np.where(eligible, scores, -np.inf)
+
+    candidates = np.flatnonzero(eligible)
+    if limit is not None and len(candidates) > limit:
+        candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+    candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+    return [{
+        "player_id": index.ids[i],
+        "score": round(float(scores[i]), 3),
+        "features": {name: round(float(values[i]), 3) for name, values in features.items()}
+    } for i in candidates.tolist()]
+
+
+@api_router.get("/requests/{request_id}/candidates")
+async def get_request_candidates(
+    request_id: str,
+    limit: int = 10,
+    current_player: dict = Depends(get_current_player)
+):
+    """Best players to invite for an open request, for its organizer."""
+    request = await db.requests.find_one({"id": request_id}, REQUEST_PROJECTION)
+    if not request:
+        raise HTTPException(status_code=404, detail="Request not found")
+
+    if request['organizer_id'] != current_player['id']:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    ranked = await rank_request_candidates(request, current_player, limit=max(1, min(limit, 50)))
+    players = await db.players.find(
+        {"id": {"$in": [c['player_id'] for c in ranked]}},
+        {"_id": 0, "id": 1, "name": 1, "pti": 1, "home_club": 1, "profile_image_url": 1}
+    ).to_list(len(ranked) or 1)
+    players_by_id = {p['id']: p for p in players}
+    for candidate in ranked:
+        candidate['player'] = players_by_id.get(candidate['player_id'])
+
+    return {"request_id": request_id, "candidates": ranked}
+
 # ==================== RESPONSE ROUTES ====================
 
 @api_router.post("/requests/{request_id}/respond")
@@ -1604,9 +2443,17 @@ async def respond_to_request(request_id: str, current_player: dict = Depends(get
         "request_id": request_id,
         "player_id": current_player['id'],
         "status": response_status,
-        "responded_at": datetime.now(timezone.utc).isoformat()
+        "responded_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": datetime.now(timezone.utc).isoformat()
     }
     await db.responses.insert_one(response_doc)
+    # Only now move the request's updated_at (feed ETags): a feed read between the
+    # two writes must not pin an ETag that misses this response
+    await db.requests.update_one({"id": request_id}, {"$set": {"updated_at": datetime.now(timezone.utc).isoformat()}})
+    if response_status == "confirmed" and new_spots_filled >= request['spots_needed']:
+        await sync_request_inbox({**request, "status": "filled"})
+    else:
+        await write_inbox_rows(request, [current_player['id']])
     
     # Remove _id from response
     response_doc.pop('_id', None)
@@ -1666,12 +2513,291 @@ async def update_response(
             {"$set": {"spots_filled": new_spots_filled, "status": "open", "updated_at": datetime.now(timezone.utc).isoformat()}}
         )
     
-    # Update response status
-    await db.responses.update_one({"id": response_id}, {"$set": {"status": new_status}})
+    # Update response status (the request's updated_at moves with it, for feed ETags)
+    now = datetime.now(timezone.utc).isoformat()
+    await db.responses.update_one({"id": response_id}, {"$set": {"status": new_status, "updated_at": now}})
+    await db.requests.update_one({"id": request_id}, {"$set": {"updated_at": now}})
+    
+    # Filling or reopening the game changes who sees it
+    updated_request = await db.requests.find_one({"id": request_id}, {"_id": 0})
+    if updated_request['status'] != request['status']:
+        await sync_request_inbox(updated_request)
     
     updated_response = await db.responses.find_one({"id": response_id}, {"_id": 0})
     return updated_response
 
+# ==================== MIXER ROUTES ====================
+#
+# Social mixers / round robins: a player list and a round count become court
+# assignments for every round. Each round is planned by local search (pairwise
+# seat swaps from a few random starts) against the partner/opponent counts of
+# the rounds before it, trading off repeat partners, repeat opponents and the
+# PTI gap between the two teams on a court. Players sit out in turn when the
+# count isn't a multiple of four. Saved mixers become one filled game request
+# per court per round, linked by mixer_id, with every player confirmed.
+
+MIXER_REPEAT_PARTNER_COST = 10.0
+MIXER_REPEAT_OPPONENT_COST = 3.0
+MIXER_PTI_GAP_COST = 1.0  # per PTI point between the two team sums
+MIXER_RESTARTS = 4
+
+
+def _mixer_court_cost(court: list, partners: list, opponents: list, pti: list) -> float:
+    a, b, c, d = court
+    return (
+        MIXER_REPEAT_PARTNER_COST * (partners[a][b] + partners[c][d])
+        + MIXER_REPEAT_OPPONENT_COST * (opponents[a][c] + opponents[a][d] + opponents[b][c] + opponents[b][d])
+        + MIXER_PTI_GAP_COST * abs(pti[a] + pti[b] - pti[c] - pti[d])
+    )
+
+
+def _plan_mixer_round(playing: list, partners: list, opponents: list, pti: list, rng) -> list:
+    """
+    Seat `playing` (a multiple of four) on courts as [a, b, c, d] = (a, b) vs (c, d).
+    Hill-climbs over seat swaps from MIXER_RESTARTS random starts; returns the best seating.
+    """
+    court_count = len(playing) // 4
+    best_slots, best_cost = None, float('inf')
+
+    for _ in range(MIXER_RESTARTS):
+        slots = playing[:]
+        rng.shuffle(slots)
+        costs = [_mixer_court_cost(slots[k * 4:k * 4 + 4], partners, opponents, pti) for k in range(court_count)]
+
+        improved = True
+        while improved:
+            improved = False
+            for i in range(len(slots)):
+                for j in range(i + 1, len(slots)):
+                    ci, cj = i // 4, j // 4
+                    if ci == cj and (i % 4 < 2) == (j % 4 < 2):
+                        continue  # Teammates trading seats changes nothing
+                    slots[i], slots[j] = slots[j], slots[i]
+                    new_i = _mixer_court_cost(slots[ci * 4:ci * 4 + 4], partners, opponents, pti)
+                    if ci == cj:
+                        delta = new_i - costs[ci]
+                    else:
+                        new_j = _mixer_court_cost(slots[cj * 4:cj * 4 + 4], partners, opponents, pti)
+                        delta = new_i + new_j - costs[ci] - costs[cj]
+                    if delta < -1e-9:
+                        costs[ci] = new_i
+                        if ci != cj:
+                            costs[cj] = new_j
+                        improved = True
+                    else:
+                        slots[i], slots[j] = slots[j], slots[i]
+
+        if sum(costs) < best_cost:
+            best_slots, best_cost = slots[:], sum(costs)
+
+    return best_slots
+
+
+def plan_mixer(player_ids: List[str], pti_values: List[Optional[float]], rounds: int, seed: Optional[int] = None) -> dict:
+    """
+    Plan a mixer. Unrated players count as the group's average PTI for balancing.
+    Returns {"rounds": [{round, courts: [{court, team_a, team_b}], sitting_out}], "stats": {...}}.
+    """
+    n = len(player_ids)
+    rng = random.Random(seed)
+    rated = [p for p in pti_values if p is not None]
+    average = sum(rated) / len(rated) if rated else 0.0
+    pti = [p if p is not None else average for p in pti_values]
+
+    partners = [[0] * n for _ in range(n)]
+    opponents = [[0] * n for _ in range(n)]
+    sat_out = [0] * n
+    court_count = n // 4
+    sitting = n - court_count * 4
+
+    planned = []
+    gaps = []
+    for round_number in range(1, rounds + 1):
+        # Whoever has sat out least sits next, ties broken at random
+        order = sorted(range(n), key=lambda i: (sat_out[i], rng.random()))
+        resting = set(order[:sitting])
+        for i in resting:
+            sat_out[i] += 1
+
+        slots = _plan_mixer_round([i for i in range(n) if i not in resting], partners, opponents, pti, rng)
+        courts = []
+        for k in range(court_count):
+            a, b, c, d = slots[k * 4:k * 4 + 4]
+            partners[a][b] += 1
+            partners[b][a] += 1
+            partners[c][d] += 1
+            partners[d][c] += 1
+            for x in (a, b):
+                for y in (c, d):
+                    opponents[x][y] += 1
+                    opponents[y][x] += 1
+            gaps.append(abs(pti[a] + pti[b] - pti[c] - pti[d]))
+            courts.append({
+                "court": k + 1,
+                "team_a": [player_ids[a], player_ids[b]],
+                "team_b": [player_ids[c], player_ids[d]]
+            })
+        planned.append({
+            "round": round_number,
+            "courts": courts,
+            "sitting_out": [player_ids[i] for i in sorted(resting)]
+        })
+
+    def repeats(counts):
+        return sum(max(0, counts[i][j] - 1) for i in range(n) for j in range(i + 1, n))
+
+    return {
+        "rounds": planned,
+        "stats": {
+            "repeat_partners": repeats(partners),
+            "repeat_opponents": repeats(opponents),
+            "max_pti_gap": round(max(gaps), 1) if gaps else 0,
+            "avg_pti_gap": round(sum(gaps) / len(gaps), 1) if gaps else 0
+        }
+    }
+
+
+async def _plan_mixer_for(data: MixerCreate) -> tuple:
+    """Validate a mixer's players and plan it. Returns (plan, players_by_id)."""
+    player_ids = list(dict.fromkeys(data.player_ids))
+    if len(player_ids) < 4:
+        raise HTTPException(status_code=400, detail="A mixer needs at least 4 different players")
+
+    players = await db.players.find(
+        {"id": {"$in": player_ids}},
+        {"_id": 0, "id": 1, "name": 1, "pti": 1, "email": 1, "phone": 1, "notify_push": 1, "notify_email": 1, "notify_sms": 1}
+    ).to_list(len(player_ids))
+    players_by_id = {p['id']: p for p in players}
+    missing = [pid for pid in player_ids if pid not in players_by_id]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Players not found: {', '.join(missing)}")
+
+    plan = plan_mixer(player_ids, [players_by_id[pid].get('pti') for pid in player_ids], data.rounds)
+    return plan, players_by_id
+
+
+@api_router.post("/mixers/plan")
+async def preview_mixer(data: MixerCreate, current_player: dict = Depends(get_current_player)):
+    """Plan a mixer's court assignments without saving anything"""
+    plan, _ = await _plan_mixer_for(data)
+    return plan
+
+
+@api_router.post("/mixers")
+async def create_mixer(data: MixerCreate, current_player: dict = Depends(get_current_player)):
+    """Plan a mixer and save each court of each round as a linked, filled game request"""
+    plan, players_by_id = await _plan_mixer_for(data)
+
+    now = datetime.now(timezone.utc).isoformat()
+    mixer_id = str(uuid.uuid4())
+    request_docs = []
+    response_docs = []
+    for planned_round in plan['rounds']:
+        starts_at = data.date_time + timedelta(minutes=data.round_minutes * (planned_round['round'] - 1))
+        for court in planned_round['courts']:
+            seated = court['team_a'] + court['team_b']
+            invited = [pid for pid in seated if pid != current_player['id']]
+            request_id = str(uuid.uuid4())
+            request_docs.append({
+                "id": request_id,
+                "organizer_id": current_player['id'],
+                "date_time": starts_at.isoformat(),
+                "date_time_utc": utc_datetime(starts_at),
+                "club": data.club,
+                "court": data.court_names[court['court'] - 1] if court['court'] <= len(data.court_names) else f"Court {court['court']}",
+                "spots_needed": len(invited),
+                "spots_filled": len(invited),
+                "skill_min": None,
+                "skill_max": None,
+                "mode": "organizer_picks",
+                "audience": "crews",
+                "target_crew_ids": [],
+                "target_club_names": [],
+                "status": "filled",
+                "notes": data.notes,
+                "mixer_id": mixer_id,
+                "mixer_round": planned_round['round'],
+                "mixer_court": court['court'],
+                "teams": [court['team_a'], court['team_b']],
+                "created_at": now,
+                "updated_at": now
+            })
+            response_docs.extend({
+                "id": str(uuid.uuid4()),
+                "request_id": request_id,
+                "player_id": pid,
+                "status": "confirmed",
+                "responded_at": now,
+                "updated_at": now
+            } for pid in invited)
+
+    mixer_doc = {
+        "id": mixer_id,
+        "organizer_id": current_player['id'],
+        "club": data.club,
+        "date_time": data.date_time.isoformat(),
+        "round_minutes": data.round_minutes,
+        "player_ids": list(players_by_id),
+        "rounds": plan['rounds'],
+        "stats": plan['stats'],
+        "request_ids": [r['id'] for r in request_docs],
+        "notes": data.notes,
+        "created_at": now
+    }
+    await db.mixers.insert_one(mixer_doc)
+    await db.requests.insert_many(request_docs)
+    if response_docs:
+        await db.responses.insert_many(response_docs)
+    # Mixer games are filled: only the organizer and the court's players see them
+    for request_doc in request_docs:
+        await write_inbox_rows(request_doc, {
+            request_doc['organizer_id'],
+            *(r['player_id'] for r in response_docs if r['request_id'] == request_doc['id'])
+        })
+    mixer_doc.pop('_id', None)
+
+    date_str = data.date_time.strftime('%b %d')
+    enqueue_notifications([
+        (
+            player,
+            f"You're in the {data.club} mixer",
+            f"{current_player.get('name', 'Someone')} added you to a {data.rounds}-round mixer on {date_str}",
+            "you_confirmed"
+        )
+        for player_id, player in players_by_id.items()
+        if player_id != current_player['id']
+    ])
+
+    return mixer_doc
+
+
+@api_router.get("/mixers/{mixer_id}")
+async def get_mixer(mixer_id: str, current_player: dict = Depends(get_current_player)):
+    """Get a mixer with its player names and linked game requests"""
+    mixer = await db.mixers.find_one({"id": mixer_id}, {"_id": 0})
+    if not mixer:
+        raise HTTPException(status_code=404, detail="Mixer not found")
+
+    if current_player['id'] != mixer['organizer_id'] and current_player['id'] not in mixer['player_ids']:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    players = await db.players.find(
+        {"id": {"$in": mixer['player_ids']}},
+        {"_id": 0, "id": 1, "name": 1, "pti": 1, "profile_image_url": 1}
+    ).to_list(len(mixer['player_ids']))
+    mixer['players'] = players
+    requests = await db.requests.find({"mixer_id": mixer_id}, REQUEST_PROJECTION).to_list(len(mixer['request_ids']) or 1)
+    # Games already played are moved to the archive by the expiry sweeper
+    archived_ids = list(set(mixer['request_ids']) - {r['id'] for r in requests})
+    if archived_ids:
+        requests += await db.requests_archive.find(
+            {"id": {"$in": archived_ids}},
+            {**REQUEST_PROJECTION, "responses": 0, "archived_at": 0}
+        ).to_list(len(archived_ids))
+    requests.sort(key=lambda r: (r.get('mixer_round', 0), r.get('mixer_court', 0)))
+    mixer['requests'] = requests
+    return mixer
+
 # ==================== AVAILABILITY ROUTES ====================
 
 @api_router.get("/availability")
@@ -1680,8 +2806,8 @@ async def list_availability(current_player: dict = Depends(get_current_player)):
     
     # Get non-expired posts
     posts = await db.availability_posts.find(
-        {"expires_at": {"$gt": now.isoformat()}},
-        {"_id": 0}
+        {"expires_at_utc": {"$gt": now}},
+        AVAILABILITY_PROJECTION
     ).to_list(1000)
     
     # Add player info
@@ -1700,23 +2826,30 @@ async def create_availability(data: AvailabilityCreate, current_player: dict = D
     if data.expires_at:
         expires_at = data.expires_at.isoformat()
     else:
-        # Set to end of the day
-        expires_at = f"{data.available_date}T23:59:59+00:00"
+        # Set to the end of the (local) day
+        expires_at = (local_day_bounds(data.available_date)[1] - timedelta(seconds=1)).isoformat()
     
     post_doc = {
         "id": str(uuid.uuid4()),
         "player_id": current_player['id'],
         "message": data.message,
         "available_date": data.available_date,
-        "clubs": data.clubs if data.clubs else [current_player.get('home_club')] + current_player.get('other_clubs', []),
+        # No clubs at all (no profile clubs either) means available at any club
+        "clubs": [c for c in (data.clubs or [current_player.get('home_club'), *current_player.get('other_clubs', [])]) if c],
         "expires_at": expires_at,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "expires_at_utc": utc_datetime(expires_at),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": datetime.now(timezone.utc).isoformat()
     }
     
     await db.availability_posts.insert_one(post_doc)
     
     # Remove _id from response
     post_doc.pop('_id', None)
+    post_doc.pop('expires_at_utc', None)
+
+    matches = await match_availability_to_requests(post_doc, current_player)
+    post_doc['matching_request_ids'] = [r['id'] for r in matches]
     
     return post_doc
 
@@ -1730,69 +2863,562 @@ async def delete_availability(post_id: str, current_player: dict = Depends(get_c
         raise HTTPException(status_code=403, detail="Not authorized")
     
     await db.availability_posts.delete_one({"id": post_id})
+    await record_tombstones([{"kind": "availability", "id": post_id}])
 
     return {"message": "Post deleted"}
 
-# ==================== INVITE ROUTES ====================
+# ==================== AVAILABILITY MATCHING ====================
+#
+# Availability posts and open requests are matched when either side is created,
+# by probing the (available_date, clubs) and (date_time, club, status) indexes
+# for the one day involved. Days are local (APP_TIMEZONE) days, so a 7pm game
+# matches that evening's availability. A post with no clubs is available at
+# any club. Matched players get a targeted notification.
 
-@api_router.post("/invites/send")
-async def send_invite(invite_data: InviteRequest, current_player: dict = Depends(get_current_player)):
-    """
-    Send an invite to a non-registered player to join FindaFourth.
-    Rate limited to 10 invites per hour per user.
-    """
-    # Validate that either email or phone is provided
-    if not invite_data.email and not invite_data.phone:
-        raise HTTPException(
-            status_code=400,
-            detail="Either email or phone number is required"
-        )
+def _day_range(date: str) -> dict:
+    """date_time_utc range covering one YYYY-MM-DD local day, never reaching into the past."""
+    day_start, day_end = local_day_bounds(date)
+    return {"$gte": max(day_start, datetime.now(timezone.utc)), "$lt": day_end}
 
-    # Check if recipient is already registered
-    if invite_data.email:
-        existing = await db.players.find_one({"email": invite_data.email})
-        if existing:
-            raise HTTPException(
-                status_code=400,
-                detail="This person is already registered on FindaFourth"
-            )
 
-    # Rate limiting: max 10 invites per hour per user
-    one_hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
-    recent_invites = await db.invites.count_documents({
-        "inviter_id": current_player['id'],
-        "sent_at": {"$gte": one_hour_ago.isoformat()}
-    })
+def availability_club_clause(club: str) -> dict:
+    """availability_posts filter for posts covering a club: listing it, or listing none (any club)."""
+    return {"$or": [{"clubs": club}, {"clubs": {"$size": 0}}]}
 
-    if recent_invites >= 10:
-        raise HTTPException(
-            status_code=429,
-            detail="Rate limit exceeded. Maximum 10 invites per hour."
-        )
 
-    # Create invite record
-    invite = Invite(
-        inviter_id=current_player['id'],
-        inviter_name=current_player.get('name', 'A FindaFourth user'),
-        player_name=invite_data.player_name,
-        club_name=invite_data.club_name,
-        email=invite_data.email,
-        phone=invite_data.phone
-    )
+async def find_requests_for_availability(post: dict, player: dict) -> List[dict]:
+    """Open requests on a post's day at one of its clubs (any club if none) that the poster can see and hasn't answered."""
+    query = {"date_time_utc": _day_range(post['available_date']), "status": "open"}
+    clubs = [c for c in post.get('clubs', []) if c]
+    if clubs:
+        query["club"] = {"$in": clubs}
 
-    invite_doc = serialize_doc(invite.model_dump())
-    await db.invites.insert_one(invite_doc)
-    invite_doc.pop('_id', None)
+    requests = await db.requests.find(query, REQUEST_PROJECTION).to_list(200)
+    if not requests:
+        return []
 
-    # Send notification via Pingram
-    # Create a pseudo-player object for the notification
-    recipient = {
-        "id": f"invite_{invite.id}",
-        "email": invite_data.email,
-        "phone": invite_data.phone,
-        "notify_email": bool(invite_data.email),
-        "notify_sms": bool(invite_data.phone)
-    }
+    context = await get_visibility_context(player)
+    responded = await db.responses.find(
+        {"player_id": player['id'], "request_id": {"$in": [r['id'] for r in requests]}},
+        {"_id": 0, "request_id": 1}
+    ).to_list(len(requests))
+    responded_ids = {r['request_id'] for r in responded}
+
+    return [
+        r for r in requests
+        if r['organizer_id'] != player['id']
+        and r['id'] not in responded_ids
+        and context.can_see(r)
+    ]
+
+
+async def match_availability_to_requests(post: dict, player: dict) -> List[dict]:
+    """On a new availability post, tell the poster about open games they could fill."""
+    matches = await find_requests_for_availability(post, player)
+    if matches:
+        first = min(matches, key=lambda r: r['date_time'])
+        more = f" (+{len(matches) - 1} more)" if len(matches) > 1 else ""
+        enqueue_notifications([(
+            player,
+            "Games match your availability",
+            f"{first['club']} needs {first['spots_needed'] - first['spots_filled']} on {post['available_date']}{more}",
+            "availability_match"
+        )])
+    return matches
+
+
+async def match_request_to_availability(request: dict, organizer: dict, ranking: List[dict]) -> set:
+    """
+    On a new request, notify players who posted availability for its day and club.
+    Only players eligible for the request (present in its candidate ranking) are matched.
+    Returns the ids of players notified.
+    """
+    posts = await db.availability_posts.find(
+        {
+            "available_date": local_date(request['date_time']),
+            "expires_at_utc": {"$gt": datetime.now(timezone.utc)},
+            **availability_club_clause(request['club'])
+        },
+        {"_id": 0, "player_id": 1}
+    ).to_list(1000)
+    eligible = {c['player_id'] for c in ranking}
+    matched_ids = {p['player_id'] for p in posts if p['player_id'] in eligible}
+    if not matched_ids:
+        return set()
+
+    players = await db.players.find({"id": {"$in": list(matched_ids)}}, {"_id": 0, "password_hash": 0}).to_list(len(matched_ids))
+    time_str = request['date_time'].split('T')[1][:5] if 'T' in request['date_time'] else request['date_time']
+    enqueue_notifications([(
+        player,
+        f"{organizer.get('name', 'Someone')} needs players when you're free",
+        f"Need {request['spots_needed']} for {request['club']} at {time_str}",
+        "availability_match"
+    ) for player in players])
+    return matched_ids
+
+
+@api_router.get("/availability/matches")
+async def list_availability_matches(current_player: dict = Depends(get_current_player)):
+    """Open games that match the current player's active availability posts"""
+    posts = await db.availability_posts.find(
+        {"player_id": current_player['id'], "expires_at_utc": {"$gt": datetime.now(timezone.utc)}},
+        AVAILABILITY_PROJECTION
+    ).to_list(100)
+
+    matches = {}
+    for post in posts:
+        for request in await find_requests_for_availability(post, current_player):
+            request.setdefault('matched_post_id', post['id'])
+            matches.setdefault(request['id'], request)
+
+    results = sorted(matches.values(), key=lambda r: r['date_time'])
+    organizer_ids = list({r['organizer_id'] for r in results})
+    organizers = await db.players.find(
+        {"id": {"$in": organizer_ids}},
+        {"_id": 0, "password_hash": 0}
+    ).to_list(len(organizer_ids) or 1)
+    organizers_by_id = {o['id']: o for o in organizers}
+    for request in results:
+        request['organizer'] = organizers_by_id.get(request['organizer_id'])
+
+    return results
+
+# ==================== CLIENT SYNC ====================
+#
+# GET /sync?since=<token> returns what changed in the caller's view since their last
+# token: requests in their inbox, the responses on those requests, and availability
+# posts. Changes are found through indexed updated_at fields; deletions (and requests
+# leaving a player's feed) are recorded in sync_tombstones:
+#   {kind, id, player_id?, request_id?, deleted_at, deleted_at_utc}
+# Past games and expired posts are not tombstoned; clients drop those by date.
+
+SYNC_TOMBSTONE_TTL = timedelta(days=7)
+# Tokens trail the clock a little so writes landing while a sync is running are sent
+# again on the next poll rather than missed; clients upsert by id
+SYNC_TOKEN_SKEW = timedelta(seconds=5)
+# Tombstone kind -> key in the response's "deleted" map
+SYNC_DELETED_KEYS = {"request": "requests", "response": "responses", "availability": "availability"}
+# updated_at backfill source for documents written before they carried one
+SYNC_TIMESTAMP_SOURCES = [
+    ("requests", "created_at"),
+    ("responses", "responded_at"),
+    ("availability_posts", "created_at"),
+]
+
+
+async def record_tombstones(tombstones: list):
+    """Record deletions for /sync. Each entry has kind and id, optionally player_id / request_id."""
+    if not tombstones:
+        return
+    now = datetime.now(timezone.utc)
+    await db.sync_tombstones.insert_many([
+        {"player_id": None, **t, "deleted_at": now.isoformat(), "deleted_at_utc": now}
+        for t in tombstones
+    ])
+
+
+async def prune_inbox_rows(query: dict):
+    """Delete inbox rows, leaving a request tombstone for each affected player."""
+    rows = await db.request_inbox.find(query, {"_id": 1, "player_id": 1, "request_id": 1}).to_list(None)
+    if not rows:
+        return
+    await db.request_inbox.delete_many({"_id": {"$in": [row['_id'] for row in rows]}})
+    await record_tombstones([
+        {"kind": "request", "id": row['request_id'], "player_id": row['player_id']} for row in rows
+    ])
+
+
+async def backfill_sync_timestamps() -> dict:
+    """Give older requests, responses and posts an updated_at. Safe to re-run."""
+    counts = {}
+    for collection_name, source in SYNC_TIMESTAMP_SOURCES:
+        result = await db[collection_name].update_many(
+            {"updated_at": {"$exists": False}},
+            [{"$set": {"updated_at": f"${source}"}}]
+        )
+        counts[collection_name] = result.modified_count
+    return counts
+
+
+@api_router.get("/sync")
+async def sync_changes(since: Optional[str] = None, current_player: dict = Depends(get_current_player)):
+    """
+    Changes to the caller's requests, responses and availability since `since`.
+    Without a token, or with one older than tombstone retention, the full current
+    state is returned with reset=true and the client should replace its store.
+
+    Deletions come as tombstones, except for data that ages out: past requests
+    (archived by the expiry sweep, with their responses, and dropped from the inbox
+    by TTL) and availability posts past expires_at (removed by TTL) are never
+    reported as deleted. Clients drop requests past date_time, their responses,
+    and posts past expires_at themselves.
+    """
+    now = datetime.now(timezone.utc)
+    after = None
+    if since:
+        try:
+            after = utc_datetime(decode_cursor(since)['t'])
+        except (KeyError, TypeError, ValueError, AttributeError):
+            raise HTTPException(status_code=400, detail="Invalid sync token")
+        if after < now - SYNC_TOMBSTONE_TTL:
+            after = None
+    changed = {"updated_at": {"$gt": after.isoformat()}} if after else {}
+
+    # The player's feed is their inbox; newly added rows bring in requests they lack
+    inbox = await db.request_inbox.find(
+        {"player_id": current_player['id'], "date_time_utc": {"$gt": now}},
+        {"_id": 0, "request_id": 1, "added_at": 1}
+    ).to_list(None)
+    inbox_ids = [row['request_id'] for row in inbox]
+    new_ids = [row['request_id'] for row in inbox if after is None or (row.get('added_at') or "") > after.isoformat()]
+
+    requests = await db.requests.find(
+        {"id": {"$in": inbox_ids}, "$or": [changed, {"id": {"$in": new_ids}}]},
+        REQUEST_PROJECTION
+    ).to_list(None)
+    responses = await db.responses.find(
+        {"$or": [
+            {"request_id": {"$in": inbox_ids}, **changed},
+            {"request_id": {"$in": new_ids}}
+        ]},
+        {"_id": 0}
+    ).to_list(None)
+    availability = await db.availability_posts.find(
+        {"expires_at_utc": {"$gt": now}, **changed},
+        AVAILABILITY_PROJECTION
+    ).to_list(None)
+
+    deleted = {key: [] for key in SYNC_DELETED_KEYS.values()}
+    if after:
+        tombstones = await db.sync_tombstones.find(
+            {
+                "deleted_at_utc": {"$gt": after},
+                "$or": [
+                    {"kind": "request", "player_id": current_player['id']},
+                    {"kind": "response", "request_id": {"$in": inbox_ids}},
+                    {"kind": "availability"}
+                ]
+            },
+            {"_id": 0, "kind": 1, "id": 1}
+        ).to_list(None)
+        visible = set(inbox_ids)
+        for t in tombstones:
+            # A request can leave the feed and come back within one sync window
+            if t['kind'] == 'request' and t['id'] in visible:
+                continue
+            deleted[SYNC_DELETED_KEYS[t['kind']]].append(t['id'])
+
+    player_ids = {r['organizer_id'] for r in requests} | {r['player_id'] for r in responses} | {p['player_id'] for p in availability}
+    players = await db.players.find(
+        {"id": {"$in": list(player_ids)}}, {"_id": 0, "password_hash": 0}
+    ).to_list(None) if player_ids else []
+
+    return {
+        "token": encode_cursor({"t": (now - SYNC_TOKEN_SKEW).isoformat()}),
+        "reset": after is None,
+        "requests": requests,
+        "responses": responses,
+        "availability": availability,
+        "players": {p['id']: p for p in players},
+        "deleted": deleted,
+    }
+
+# ==================== LIVE UPDATES ====================
+#
+# GET /events is a Server-Sent Events stream of request, response and feed changes.
+# Each process runs one MongoDB change stream (requests, responses, request_inbox
+# inserts and sync_tombstones inserts) and fans its events out to in-memory subscribers.
+# Change streams need a replica set; a single-node one is enough (see docker-compose.yml).
+# Without one the endpoint answers 503 and clients keep polling /sync.
+#
+# Events: ready {token}, request {request}, response {response},
+# response_deleted {id, request_id}, feed_added {request_id}, feed_removed {request_id},
+# resync {} (the client fell behind or the stream restarted: call /sync and reconnect).
+
+EVENT_STREAM_PIPELINE = [{"$match": {"$or": [
+    {"ns.coll": {"$in": ["requests", "responses"]}, "operationType": {"$in": ["insert", "update", "replace"]}},
+    {"ns.coll": {"$in": ["request_inbox", "sync_tombstones"]}, "operationType": "insert"},
+]}}]
+EVENT_QUEUE_SIZE = 256
+EVENT_HEARTBEAT_SECONDS = 15
+EVENT_RETRY_SECONDS = 5
+EVENT_MAX_REQUESTS = 50
+# Server error code for "$changeStream stage is only supported on replica sets"
+CHANGE_STREAM_UNSUPPORTED = 40573
+
+
+class EventSubscriber:
+    """One open /events connection: the requests it follows and, optionally, its feed."""
+    __slots__ = ("player_id", "request_ids", "feed_ids", "queue", "overflowed")
+
+    def __init__(self, player_id: str, request_ids, feed: bool):
+        self.player_id = player_id
+        self.request_ids = set(request_ids)
+        self.feed_ids = set() if feed else None
+        self.queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self.overflowed = False
+
+    def follows(self, request_id: str) -> bool:
+        return request_id in self.request_ids or (self.feed_ids is not None and request_id in self.feed_ids)
+
+
+class RequestEventHub:
+    """The process's shared change stream and its subscribers, indexed by player and request."""
+
+    def __init__(self):
+        self.available = None
+        self._by_player = {}
+        self._by_request = {}
+        self._task = None
+        self._ready = None
+        self._resume_token = None
+
+    async def ensure_started(self) -> bool:
+        """Open the change stream on first use; False when the deployment cannot provide one."""
+        if self.available is False:
+            return False
+        if self._task is None:
+            self._ready = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        return self.available
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for subscriber in list(self.subscribers()):
+            self.unsubscribe(subscriber)
+
+    def subscribers(self):
+        return (s for subs in self._by_player.values() for s in subs)
+
+    def subscribe(self, subscriber: EventSubscriber):
+        self._by_player.setdefault(subscriber.player_id, set()).add(subscriber)
+        for request_id in subscriber.request_ids | (subscriber.feed_ids or set()):
+            self._by_request.setdefault(request_id, set()).add(subscriber)
+
+    def follow(self, subscriber: EventSubscriber, feed_ids):
+        """Add request ids to a subscriber's feed."""
+        for request_id in feed_ids:
+            subscriber.feed_ids.add(request_id)
+            self._by_request.setdefault(request_id, set()).add(subscriber)
+
+    def unfollow(self, subscriber: EventSubscriber, request_id: str):
+        subscriber.feed_ids.discard(request_id)
+        if request_id not in subscriber.request_ids:
+            self._discard(self._by_request, request_id, subscriber)
+
+    def unsubscribe(self, subscriber: EventSubscriber):
+        self._discard(self._by_player, subscriber.player_id, subscriber)
+        for request_id in subscriber.request_ids | (subscriber.feed_ids or set()):
+            self._discard(self._by_request, request_id, subscriber)
+
+    @staticmethod
+    def _discard(index: dict, key: str, subscriber: EventSubscriber):
+        subs = index.get(key)
+        if subs is not None:
+            subs.discard(subscriber)
+            if not subs:
+                del index[key]
+
+    def publish(self, subscribers, event: str, data: dict):
+        for subscriber in list(subscribers):
+            try:
+                subscriber.queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                # A stalled client: drop it and let it catch up through /sync
+                subscriber.overflowed = True
+                self.unsubscribe(subscriber)
+
+    def dispatch(self, change: dict):
+        """Route one change stream event to the subscribers that follow it."""
+        collection = change["ns"]["coll"]
+        doc = change.get("fullDocument")
+        if doc is None:
+            # Deleted before the update lookup ran
+            return
+        doc = {k: v for k, v in doc.items() if k not in ("_id", "date_time_utc")}
+        if collection == "requests":
+            self.publish(self._by_request.get(doc['id'], ()), "request", {"request": doc})
+        elif collection == "responses":
+            self.publish(self._by_request.get(doc['request_id'], ()), "response", {"response": doc})
+        elif collection == "request_inbox":
+            feeds = [s for s in self._by_player.get(doc['player_id'], ()) if s.feed_ids is not None]
+            for subscriber in feeds:
+                self.follow(subscriber, [doc['request_id']])
+            self.publish(feeds, "feed_added", {"request_id": doc['request_id']})
+        elif doc['kind'] == "request" and doc.get('player_id'):
+            feeds = [s for s in self._by_player.get(doc['player_id'], ()) if s.feed_ids is not None]
+            for subscriber in feeds:
+                self.unfollow(subscriber, doc['id'])
+            self.publish(feeds, "feed_removed", {"request_id": doc['id']})
+        elif doc['kind'] == "response":
+            self.publish(self._by_request.get(doc['request_id'], ()), "response_deleted", {"id": doc['id'], "request_id": doc['request_id']})
+
+    async def _run(self):
+        """Watch the database, resuming after errors; subscribers are told to resync after a gap."""
+        while True:
+            try:
+                async with db.watch(
+                    EVENT_STREAM_PIPELINE, full_document="updateLookup", resume_after=self._resume_token
+                ) as stream:
+                    if self.available is not None:
+                        self.publish(list(self.subscribers()), "resync", {})
+                    self.available = True
+                    self._ready.set()
+                    logger.info("Live updates: change stream open")
+                    async for change in stream:
+                        self._resume_token = stream.resume_token
+                        try:
+                            self.dispatch(change)
+                        except Exception as e:
+                            logger.error(f"Live updates: error dispatching {change['ns']['coll']} change: {e}")
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAM_UNSUPPORTED:
+                    logger.warning("Live updates disabled: change streams need a MongoDB replica set")
+                    self.available = False
+                    self._ready.set()
+                    self._task = None
+                    return
+                logger.error(f"Live updates: change stream failed: {e}")
+                # The resume point may be gone from the oplog; start fresh
+                self._resume_token = None
+            except PyMongoError as e:
+                logger.error(f"Live updates: change stream interrupted: {e}")
+            # Requests waiting on the first open get a 503 instead of hanging
+            self._ready.set()
+            await asyncio.sleep(EVENT_RETRY_SECONDS)
+
+
+event_hub = RequestEventHub()
+
+
+def format_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@api_router.post("/events/ticket")
+async def create_events_ticket(current_player: dict = Depends(get_current_player)):
+    """Short-lived ticket for opening /events with EventSource (?ticket=)."""
+    return {"ticket": create_stream_ticket(current_player['id']), "expires_in": STREAM_TICKET_SECONDS}
+
+
+@api_router.get("/events")
+async def stream_events(
+    request_ids: Optional[str] = None,
+    feed: bool = False,
+    current_player: dict = Depends(get_stream_player)
+):
+    """
+    Server-Sent Events for the given comma-separated request_ids and, with feed=true,
+    every request in the caller's feed. Authenticate with the usual bearer header or
+    ?ticket= from POST /events/ticket (EventSource cannot send headers).
+    """
+    followed = [rid for rid in (request_ids or "").split(",") if rid][:EVENT_MAX_REQUESTS]
+    if not followed and not feed:
+        raise HTTPException(status_code=400, detail="Pass request_ids and/or feed=true")
+    if not await event_hub.ensure_started():
+        raise HTTPException(status_code=503, detail="Live updates unavailable; poll /sync instead")
+
+    subscriber = EventSubscriber(current_player['id'], followed, feed)
+    # Subscribe before reading the inbox so rows added meanwhile are not missed
+    event_hub.subscribe(subscriber)
+    if feed:
+        event_hub.follow(subscriber, await db.request_inbox.distinct(
+            "request_id", {"player_id": current_player['id'], "date_time_utc": {"$gt": datetime.now(timezone.utc)}}
+        ))
+    token = encode_cursor({"t": (datetime.now(timezone.utc) - SYNC_TOKEN_SKEW).isoformat()})
+
+    async def events():
+        try:
+            yield f"retry: {EVENT_RETRY_SECONDS * 1000}\n" + format_event("ready", {"token": token})
+            while not subscriber.overflowed:
+                try:
+                    event, data = await asyncio.wait_for(subscriber.queue.get(), EVENT_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield format_event(event, data)
+                if event == "resync":
+                    return
+            yield format_event("resync", {})
+        finally:
+            event_hub.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# ==================== INVITE ROUTES ====================
+
+INVITE_RATE_LIMIT = 10
+INVITE_RATE_LIMIT_WINDOW = timedelta(hours=1)
+
+@api_router.post("/invites/send")
+async def send_invite(invite_data: InviteRequest, current_player: dict = Depends(get_current_player)):
+    """
+    Send an invite to a non-registered player to join FindaFourth.
+    Rate limited to 10 invites per hour per user.
+    """
+    # Validate that either email or phone is provided
+    if not invite_data.email and not invite_data.phone:
+        raise HTTPException(
+            status_code=400,
+            detail="Either email or phone number is required"
+        )
+
+    # Check if recipient is already registered
+    if invite_data.email:
+        existing = await db.players.find_one({"email": invite_data.email})
+        if existing:
+            raise HTTPException(
+                status_code=400,
+                detail="This person is already registered on FindaFourth"
+            )
+
+    # Rate limiting: max 10 invites per hour per user
+    one_hour_ago = datetime.now(timezone.utc) - INVITE_RATE_LIMIT_WINDOW
+    recent_invites = await db.invites.count_documents({
+        "inviter_id": current_player['id'],
+        "sent_at_utc": {"$gte": one_hour_ago}
+    })
+
+    if recent_invites >= INVITE_RATE_LIMIT:
+        raise HTTPException(
+            status_code=429,
+            detail="Rate limit exceeded. Maximum 10 invites per hour."
+        )
+
+    # Create invite record
+    invite = Invite(
+        inviter_id=current_player['id'],
+        inviter_name=current_player.get('name', 'A FindaFourth user'),
+        player_name=invite_data.player_name,
+        club_name=invite_data.club_name,
+        email=invite_data.email,
+        phone=invite_data.phone
+    )
+
+    invite_doc = serialize_doc(invite.model_dump())
+    invite_doc['sent_at_utc'] = utc_datetime(invite.sent_at)
+    await db.invites.insert_one(invite_doc)
+    invite_doc.pop('_id', None)
+    invite_doc.pop('sent_at_utc', None)
+
+    # Send notification via Pingram
+    # Create a pseudo-player object for the notification
+    recipient = {
+        "id": f"invite_{invite.id}",
+        "email": invite_data.email,
+        "phone": invite_data.phone,
+        "notify_email": bool(invite_data.email),
+        "notify_sms": bool(invite_data.phone)
+    }
 
     await send_notification(
         notification_id="player_invite",
@@ -1812,6 +3438,85 @@ async def send_invite(invite_data: InviteRequest, current_player: dict = Depends
         "invite": invite_doc
     }
 
+# ==================== EXPIRY SWEEPER ====================
+#
+# Keeps the hot collections small. On a scheduler interval:
+#   - open requests whose date_time has passed are marked expired
+#   - requests more than REQUEST_ARCHIVE_AFTER past their date_time move to
+#     `requests_archive`, each with its responses embedded, and leave `requests`
+#     and `responses`
+# Expired availability posts and invites older than the rate-limit window are
+# removed by TTL indexes on their BSON date companions (see ensure_indexes).
+# None of these removals leave sync tombstones; /sync clients age such items out
+# themselves (see sync_changes).
+# One worker sweeps at a time (the "expiry_sweep" lease).
+
+REQUEST_ARCHIVE_AFTER = timedelta(days=1)
+SWEEP_BATCH_SIZE = 500
+
+
+async def _archive_requests(cutoff: datetime, now: str) -> int:
+    """Move requests dated before cutoff, with their responses, into requests_archive."""
+    archived = 0
+    while True:
+        batch = await db.requests.find({"date_time_utc": {"$lt": cutoff}}, {"_id": 0}).to_list(SWEEP_BATCH_SIZE)
+        if not batch:
+            return archived
+
+        request_ids = [r['id'] for r in batch]
+        responses = await db.responses.find({"request_id": {"$in": request_ids}}, {"_id": 0}).to_list(None)
+        responses_by_request = {}
+        for response in responses:
+            responses_by_request.setdefault(response['request_id'], []).append(response)
+
+        # Upserts keep a sweep that died mid-batch safe to repeat
+        await bulk_write_batched(db.requests_archive, [
+            UpdateOne(
+                {"id": r['id']},
+                {"$set": {**r, "responses": responses_by_request.get(r['id'], []), "archived_at": now}},
+                upsert=True
+            ) for r in batch
+        ], "requests_archive")
+        await db.responses.delete_many({"request_id": {"$in": request_ids}})
+        await db.requests.delete_many({"id": {"$in": request_ids}})
+        archived += len(batch)
+
+
+async def sweep_expired_data() -> Optional[dict]:
+    """Expire and archive past requests. Returns counts, or None if another worker is sweeping."""
+    sweep_id = str(uuid.uuid4())
+    if await acquire_sync_lease("expiry_sweep", sweep_id):
+        return None
+
+    try:
+        now_dt = datetime.now(timezone.utc)
+        now = now_dt.isoformat()
+
+        expired = await db.requests.update_many(
+            {"status": "open", "date_time_utc": {"$lt": now_dt}},
+            {"$set": {"status": "expired", "updated_at": now}}
+        )
+        archived = await _archive_requests(now_dt - REQUEST_ARCHIVE_AFTER, now)
+
+        result = {
+            "requests_expired": expired.modified_count,
+            "requests_archived": archived
+        }
+        if any(result.values()):
+            logger.info(f"Expiry sweep: {result}")
+        return result
+    finally:
+        await release_sync_lease("expiry_sweep", sweep_id)
+
+
+@api_router.post("/admin/sweep-expired")
+async def run_expiry_sweep(current_player: dict = Depends(get_current_player)):
+    """Run the expiry sweeper now (it also runs every 15 minutes)"""
+    result = await sweep_expired_data()
+    if result is None:
+        raise HTTPException(status_code=409, detail="A sweep is already running")
+    return result
+
 # ==================== PTI ROSTER ROUTES ====================
 
 def normalize_name(name: str) -> str:
@@ -1935,16 +3640,15 @@ async def get_pti_history(
     # Find history records for this player
     all_history = await db.pti_history.find(
         {"player_name": normalized_name},
-        {"_id": 0, "pti_value": 1, "recorded_at": 1}
-    ).sort("recorded_at", 1).to_list(500)
+        {"_id": 0, "pti_value": 1, "recorded_at": 1, "recorded_at_utc": 1}
+    ).sort("recorded_at_utc", 1).to_list(500)
 
     # Deduplicate by date (keep first entry per day)
     seen_dates = set()
     history = []
     for entry in all_history:
-        recorded_at = entry.get('recorded_at', '')
-        # Extract just the date part (YYYY-MM-DD)
-        date_only = recorded_at[:10] if recorded_at else ''
+        recorded_at_utc = entry.pop('recorded_at_utc', None)
+        date_only = recorded_at_utc.date() if recorded_at_utc else None
         if date_only and date_only not in seen_dates:
             seen_dates.add(date_only)
             history.append(entry)
@@ -1953,7 +3657,7 @@ async def get_pti_history(
 
     # Get current PTI from roster if available
     current_entry = await db.pti_roster.find_one(
-        {"player_name": {"$regex": f"^{player_name}$", "$options": "i"}},
+        {"normalized_name": normalized_name},
         {"_id": 0, "pti_value": 1, "scraped_at": 1}
     )
 
@@ -1971,6 +3675,8 @@ async def get_pti_history(
 @api_router.post("/admin/pti-roster/import")
 async def import_pti_roster(data: PTIImportRequest, current_player: dict = Depends(get_current_player)):
     """Import PTI roster data from scraped JSON, with deduplication"""
+    await ensure_sync_job_idle('gbpta_full_sync')
+
     if not data.players:
         raise HTTPException(status_code=400, detail="No players provided")
     
@@ -2009,6 +3715,7 @@ async def import_pti_roster(data: PTIImportRequest, current_player: dict = Depen
         doc = {
             "id": str(uuid.uuid4()),
             "player_name": p['player_name'],
+            "normalized_name": normalize_name(p['player_name']),
             "pti_value": p['pti_value'],
             "source_url": p.get('source_url'),
             "scraped_at": now
@@ -2017,6 +3724,8 @@ async def import_pti_roster(data: PTIImportRequest, current_player: dict = Depen
     
     if roster_docs:
         await db.pti_roster.insert_many(roster_docs)
+    await rebuild_player_identities()
+    await rebuild_club_summaries()
     
     return {
         "message": "PTI roster imported successfully",
@@ -2030,25 +3739,26 @@ async def scrape_pti_roster(current_player: dict = Depends(get_current_player)):
     """
     Scrape PTI roster data from GBPTA paddlescores.com.
     This triggers the full sync pipeline: scrape clubs, scrape rosters, deduplicate, record history.
+    Waits for the sync to finish; if one is already in flight, waits on that run.
     """
-    try:
-        result = await run_gbpta_full_sync()
+    job = await run_sync_job_inline('gbpta_full_sync', created_by=current_player['id'])
+    if not job or job['status'] != 'completed':
+        error = (job or {}).get('error') or (job or {}).get('status', 'unknown')
+        logger.error(f"GBPTA scraping error: {error}")
+        raise HTTPException(status_code=500, detail=f"Scraping failed: {error}")
 
-        # Get counts from database for response
-        clubs_count = await db.clubs.count_documents({})
-        players_count = await db.pti_roster.count_documents({})
-        unique_clubs = await db.pti_roster.distinct('clubs')
+    # Get counts from database for response
+    clubs_count = await db.clubs.count_documents({})
+    players_count = await db.pti_roster.count_documents({})
+    unique_clubs = await db.pti_roster.distinct('clubs')
 
-        return {
-            "message": "GBPTA roster scraped and imported successfully",
-            "clubs_scraped": clubs_count,
-            "players_after_dedup": players_count,
-            "unique_club_names": len(unique_clubs)
-        }
-
-    except Exception as e:
-        logger.error(f"GBPTA scraping error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Scraping failed: {str(e)}")
+    return {
+        "message": "GBPTA roster scraped and imported successfully",
+        "job_id": job['id'],
+        "clubs_scraped": clubs_count,
+        "players_after_dedup": players_count,
+        "unique_club_names": len(unique_clubs)
+    }
 
 @api_router.post("/admin/pti-roster/sync-players")
 async def sync_pti_to_players(current_player: dict = Depends(get_current_player)):
@@ -2070,6 +3780,7 @@ async def sync_pti_to_players(current_player: dict = Depends(get_current_player)
     
     updated_count = 0
     update_log = []
+    updated_ids = []
     
     for player in players:
         player_name = normalize_name(player.get('name', ''))
@@ -2086,8 +3797,9 @@ async def sync_pti_to_players(current_player: dict = Depends(get_current_player)
                     {"$set": {
                         "pti": new_pti_int,
                         "updated_at": datetime.now(timezone.utc).isoformat()
-                    }}
+                    }, "$inc": {"visibility_version": 1}}
                 )
+                updated_ids.append(player['id'])
                 updated_count += 1
                 update_log.append({
                     "player_name": player.get('name'),
@@ -2095,6 +3807,11 @@ async def sync_pti_to_players(current_player: dict = Depends(get_current_player)
                     "new_pti": new_pti_int
                 })
     
+    # PTI feeds skill windows (visibility contexts, inboxes) and the chemistry cache
+    if updated_ids:
+        await bump_generation("player_directory")
+        enqueue_inbox_refresh(updated_ids)
+    
     return {
         "message": f"Synced PTI values to {updated_count} players",
         "total_roster_entries": len(roster),
@@ -2106,9 +3823,154 @@ async def sync_pti_to_players(current_player: dict = Depends(get_current_player)
 @api_router.delete("/admin/pti-roster")
 async def clear_pti_roster(current_player: dict = Depends(get_current_player)):
     """Clear all PTI roster data"""
+    await ensure_sync_job_idle('gbpta_full_sync')
     result = await db.pti_roster.delete_many({})
+    await rebuild_club_summaries()
     return {"message": "PTI roster cleared", "deleted": result.deleted_count}
 
+# ==================== PLAYER IDENTITIES ====================
+#
+# One person shows up as an app player, a GBPTA roster entry, a Tenniscores
+# ranking row and a match_history / partner_stats document. player_identities
+# holds one document per person, keyed on the normalized name, linking those
+# records:
+#   {key, name, player_id, roster_id, tenniscores_uid, synced_at}
+# The sync jobs rebuild it; profile writes keep player_id current in between.
+# Every collection that joins on a person also stores the key as
+# `normalized_name`, so cross-collection joins are indexed exact lookups.
+
+async def link_player_identity(player_id: str, name: Optional[str]):
+    """Point the identity for `name` at an app player, unlinking any identity it previously held."""
+    key = normalize_name(name or '')
+    now = datetime.now(timezone.utc).isoformat()
+    await db.player_identities.update_many(
+        {"player_id": player_id, "key": {"$ne": key}},
+        {"$set": {"player_id": None, "updated_at": now}}
+    )
+    if not key:
+        return
+    await db.player_identities.update_one(
+        {"key": key},
+        {
+            "$set": {"player_id": player_id, "updated_at": now},
+            "$setOnInsert": {"id": str(uuid.uuid4()), "name": name.strip(), "roster_id": None, "tenniscores_uid": None, "created_at": now}
+        },
+        upsert=True
+    )
+
+
+async def get_player_identity_key(player: dict) -> str:
+    """Identity key (normalized name) for an app player."""
+    identity = await db.player_identities.find_one({"player_id": player['id']}, {"_id": 0, "key": 1})
+    if identity:
+        return identity['key']
+    return player.get('normalized_name') or normalize_name(player.get('name') or '')
+
+
+async def rebuild_player_identities() -> dict:
+    """
+    Rebuild player_identities from players, pti_roster and tenniscores_players.
+    Also backfills the stored normalized_name on players and roster entries that predate it.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    identities = {}
+
+    def identity_for(name: str) -> Optional[dict]:
+        key = normalize_name(name or '')
+        if not key:
+            return None
+        if key not in identities:
+            identities[key] = {"name": name.strip(), "player_id": None, "roster_id": None, "tenniscores_uid": None}
+        return identities[key]
+
+    roster = await db.pti_roster.find({}, {"_id": 0, "id": 1, "player_name": 1, "normalized_name": 1}).to_list(10000)
+    roster_backfill = []
+    for entry in roster:
+        identity = identity_for(entry.get('player_name'))
+        if not identity:
+            continue
+        identity['roster_id'] = entry['id']
+        if not entry.get('normalized_name'):
+            roster_backfill.append(UpdateOne({"id": entry['id']}, {"$set": {"normalized_name": normalize_name(entry['player_name'])}}))
+
+    ts_players = await db.tenniscores_players.find({}, {"_id": 0, "name": 1, "tenniscores_uid": 1}).to_list(10000)
+    for ts_player in ts_players:
+        identity = identity_for(ts_player.get('name'))
+        if identity:
+            identity['tenniscores_uid'] = ts_player.get('tenniscores_uid')
+
+    players = await db.players.find(
+        {"profile_complete": True, "name": {"$nin": [None, ""]}},
+        {"_id": 0, "id": 1, "name": 1, "normalized_name": 1}
+    ).to_list(10000)
+    player_backfill = []
+    for player in players:
+        identity = identity_for(player['name'])
+        if not identity:
+            continue
+        identity['player_id'] = player['id']
+        if player.get('normalized_name') != normalize_name(player['name']):
+            player_backfill.append(UpdateOne({"id": player['id']}, {"$set": {"normalized_name": normalize_name(player['name'])}}))
+
+    operations = [
+        UpdateOne(
+            {"key": key},
+            {
+                "$set": {**fields, "synced_at": now, "updated_at": now},
+                "$setOnInsert": {"id": str(uuid.uuid4()), "created_at": now}
+            },
+            upsert=True
+        )
+        for key, fields in identities.items()
+    ]
+    identity_write = await bulk_write_batched(db.player_identities, operations, "player_identities")
+    await bulk_write_batched(db.pti_roster, roster_backfill, "pti_roster normalized_name")
+    await bulk_write_batched(db.players, player_backfill, "players normalized_name")
+    if player_backfill:
+        await bump_generation("player_directory")
+
+    # People no longer present in any source
+    removed = await db.player_identities.delete_many({"synced_at": {"$ne": now}})
+
+    return {
+        "identities": len(identities),
+        "inserted": identity_write['upserted'],
+        "removed": removed.deleted_count,
+        "linked_players": sum(1 for i in identities.values() if i['player_id']),
+        "linked_roster": sum(1 for i in identities.values() if i['roster_id']),
+        "linked_tenniscores": sum(1 for i in identities.values() if i['tenniscores_uid'])
+    }
+
+
+@api_router.post("/admin/player-identities/rebuild")
+async def rebuild_player_identities_route(current_player: dict = Depends(get_current_player)):
+    """Rebuild the player identity index from players, pti_roster and tenniscores_players"""
+    stats = await rebuild_player_identities()
+    return {"message": "Player identities rebuilt", "stats": stats}
+
+
+@api_router.get("/admin/player-identities")
+async def lookup_player_identity(
+    name: Optional[str] = None,
+    player_id: Optional[str] = None,
+    tenniscores_uid: Optional[str] = None,
+    current_player: dict = Depends(get_current_player)
+):
+    """Look up one identity by normalized name, app player id or Tenniscores uid"""
+    if name:
+        query = {"key": normalize_name(name)}
+    elif player_id:
+        query = {"player_id": player_id}
+    elif tenniscores_uid:
+        query = {"tenniscores_uid": tenniscores_uid}
+    else:
+        raise HTTPException(status_code=400, detail="Provide name, player_id or tenniscores_uid")
+
+    identity = await db.player_identities.find_one(query, {"_id": 0})
+    if not identity:
+        raise HTTPException(status_code=404, detail="Identity not found")
+    return identity
+
 # ==================== GBPTA SCRAPING ====================
 
 GBPTA_STANDINGS_URL = "https://gbpta.paddlescores.com/print_all_standings.php"
@@ -2175,6 +4037,30 @@ def parse_gbpta_standings(html: str) -> List[dict]:
 
     return clubs
 
+async def upsert_gbpta_clubs(club_data: List[dict], now: str) -> dict:
+    """
+    Upsert scraped clubs (teams) keyed on (name, league) in bulk. Each team stores the
+    official club it belongs to as club_name. Returns bulk_write_batched counts.
+    """
+    lookup = await load_club_lookup()
+    operations = [
+        UpdateOne(
+            {"name": club['name'], "league": club['league']},
+            {
+                "$set": {
+                    "club_name": resolve_club_name_with(club['name'], lookup),
+                    "division": club['division'],
+                    "roster_url": club['roster_url'],
+                    "last_scraped": now
+                },
+                "$setOnInsert": {"id": str(uuid.uuid4()), "created_at": now}
+            },
+            upsert=True
+        )
+        for club in club_data
+    ]
+    return await bulk_write_batched(db.clubs, operations, "clubs")
+
 @api_router.post("/admin/gbpta/scrape-clubs")
 async def scrape_gbpta_clubs(current_player: dict = Depends(get_current_player)):
     """
@@ -2196,40 +4082,9 @@ async def scrape_gbpta_clubs(current_player: dict = Depends(get_current_player))
 
         # Upsert clubs into database
         now = datetime.now(timezone.utc).isoformat()
-        inserted = 0
-        updated = 0
-
-        for club in club_data:
-            # Check if club already exists (by name and league)
-            existing = await db.clubs.find_one({
-                "name": club['name'],
-                "league": club['league']
-            })
-
-            if existing:
-                # Update existing club
-                await db.clubs.update_one(
-                    {"id": existing['id']},
-                    {"$set": {
-                        "division": club['division'],
-                        "roster_url": club['roster_url'],
-                        "last_scraped": now
-                    }}
-                )
-                updated += 1
-            else:
-                # Insert new club
-                club_doc = {
-                    "id": str(uuid.uuid4()),
-                    "name": club['name'],
-                    "league": club['league'],
-                    "division": club['division'],
-                    "roster_url": club['roster_url'],
-                    "last_scraped": now,
-                    "created_at": now
-                }
-                await db.clubs.insert_one(club_doc)
-                inserted += 1
+        club_write = await upsert_gbpta_clubs(club_data, now)
+        # New teams need a summary before /clubs and /clubs/{id} know their club
+        club_summaries = await rebuild_club_summaries()
 
         # Get counts by league
         league_counts = {}
@@ -2240,9 +4095,11 @@ async def scrape_gbpta_clubs(current_player: dict = Depends(get_current_player))
         return {
             "message": "GBPTA clubs scraped successfully",
             "total_clubs": len(club_data),
-            "inserted": inserted,
-            "updated": updated,
-            "by_league": league_counts
+            "inserted": club_write['upserted'],
+            "updated": club_write['matched'],
+            "rows_per_second": club_write['rows_per_second'],
+            "by_league": league_counts,
+            "club_summaries": club_summaries
         }
 
     except httpx.HTTPError as e:
@@ -2339,6 +4196,8 @@ async def scrape_gbpta_rosters(
     Scrape all club roster pages to extract player information.
     Optionally filter by league. Updates the pti_roster collection.
     """
+    await ensure_sync_job_idle('gbpta_full_sync')
+
     try:
         # Get clubs to scrape
         query = {}
@@ -2418,6 +4277,8 @@ async def deduplicate_pti_roster(current_player: dict = Depends(get_current_play
     Players appearing on multiple clubs get their clubs merged into a list.
     Uses the most recent PTI value if there are differences.
     """
+    await ensure_sync_job_idle('gbpta_full_sync')
+
     try:
         # Get all raw roster entries
         raw_entries = await db.pti_roster_raw.find({}, {"_id": 0}).to_list(10000)
@@ -2464,6 +4325,7 @@ async def deduplicate_pti_roster(current_player: dict = Depends(get_current_play
             entry = {
                 'id': str(uuid.uuid4()),
                 'player_name': data['player_name'],
+                'normalized_name': normalized_name,
                 'pti_value': data['pti_value'],
                 'clubs': data['clubs'],
                 'profile_image_url': data['profile_image_url'],
@@ -2479,6 +4341,8 @@ async def deduplicate_pti_roster(current_player: dict = Depends(get_current_play
         await db.pti_roster.delete_many({})
         if deduped_entries:
             await db.pti_roster.insert_many(deduped_entries)
+        await rebuild_player_identities()
+        await rebuild_club_summaries()
 
         return {
             "message": "Deduplication complete",
@@ -2492,196 +4356,75 @@ async def deduplicate_pti_roster(current_player: dict = Depends(get_current_play
         logger.error(f"Error in deduplication: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Deduplication failed: {str(e)}")
 
-@api_router.post("/admin/gbpta/full-sync")
+@api_router.post("/admin/gbpta/full-sync", status_code=202)
 async def full_gbpta_sync(current_player: dict = Depends(get_current_player)):
     """
-    Run the complete GBPTA sync pipeline:
+    Queue the complete GBPTA sync pipeline as a background job:
     1. Scrape clubs from standings page
     2. Scrape rosters from all club pages
     3. Deduplicate players
     4. Record PTI history
-    5. Sync PTI values to registered app users
+    Returns the job id immediately; poll /admin/jobs/{job_id} for progress.
+    If a sync is already in flight, returns that job instead of starting another.
     """
-    results = {}
+    job, created = await trigger_sync_job('gbpta_full_sync', created_by=current_player['id'])
+
+    return {
+        "message": "GBPTA full sync queued" if created else "GBPTA full sync already running",
+        "job_id": job['id'],
+        "status": job['status'],
+        "attached": not created
+    }
 
+@api_router.post("/admin/gbpta/record-pti-history")
+async def record_pti_history(current_player: dict = Depends(get_current_player)):
+    """
+    Record current PTI values from pti_roster to pti_history.
+    This creates a snapshot of all player PTI values for historical tracking.
+    Should be run weekly (Tuesdays) after roster sync.
+    """
     try:
-        # Step 1: Scrape clubs
-        logger.info("Starting GBPTA full sync - Step 1: Scraping clubs")
-        html = await fetch_html(GBPTA_STANDINGS_URL)
-        club_data = parse_gbpta_standings(html)
+        # Get current roster
+        roster = await db.pti_roster.find({}, {"_id": 0}).to_list(10000)
+
+        if not roster:
+            return {
+                "message": "No roster data found. Run /admin/gbpta/full-sync first.",
+                "recorded": 0
+            }
 
         now = datetime.now(timezone.utc).isoformat()
-        clubs_inserted = 0
-        clubs_updated = 0
+        history_entries = []
 
-        for club in club_data:
-            existing = await db.clubs.find_one({
-                "name": club['name'],
-                "league": club['league']
-            })
-            if existing:
-                await db.clubs.update_one(
-                    {"id": existing['id']},
-                    {"$set": {"division": club['division'], "roster_url": club['roster_url'], "last_scraped": now}}
-                )
-                clubs_updated += 1
-            else:
-                club_doc = {
-                    "id": str(uuid.uuid4()),
-                    "name": club['name'],
-                    "league": club['league'],
-                    "division": club['division'],
-                    "roster_url": club['roster_url'],
-                    "last_scraped": now,
-                    "created_at": now
-                }
-                await db.clubs.insert_one(club_doc)
-                clubs_inserted += 1
+        for entry in roster:
+            if entry.get('pti_value') is not None:
+                history_entries.append({
+                    'id': str(uuid.uuid4()),
+                    'player_name': normalize_name(entry['player_name']),
+                    'pti_value': entry['pti_value'],
+                    'recorded_at': now,
+                    'recorded_at_utc': utc_datetime(now)
+                })
 
-        results['clubs'] = {"inserted": clubs_inserted, "updated": clubs_updated, "total": len(club_data)}
+        if history_entries:
+            await db.pti_history.insert_many(history_entries)
 
-        # Step 2: Scrape rosters
-        logger.info("GBPTA full sync - Step 2: Scraping rosters")
-        clubs = await db.clubs.find({}, {"_id": 0}).to_list(1000)
-        all_players = []
-        roster_errors = []
+        return {
+            "message": "PTI history recorded",
+            "records_added": len(history_entries),
+            "timestamp": now
+        }
 
-        async with httpx.AsyncClient(timeout=30.0, headers=SCRAPER_HEADERS, follow_redirects=True) as client:
-            for club in clubs:
-                try:
-                    response = await client.get(club['roster_url'])
-                    response.raise_for_status()
-                    players = parse_roster_page(response.text, club['name'])
-                    all_players.extend(players)
-                except Exception as e:
-                    roster_errors.append({"club": club['name'], "error": str(e)})
+    except Exception as e:
+        logger.error(f"Error recording PTI history: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to record PTI history: {str(e)}")
 
-        for player in all_players:
-            player['id'] = str(uuid.uuid4())
-            player['scraped_at'] = now
 
-        if all_players:
-            await db.pti_roster_raw.delete_many({})
-            await db.pti_roster_raw.insert_many(all_players)
+# ==================== TENNISCORES INTEGRATION ====================
 
-        results['rosters'] = {"players_found": len(all_players), "errors": len(roster_errors)}
-
-        # Step 3: Deduplicate
-        logger.info("GBPTA full sync - Step 3: Deduplicating")
-        raw_entries = await db.pti_roster_raw.find({}, {"_id": 0}).to_list(10000)
-        player_map = {}
-
-        for entry in raw_entries:
-            name = normalize_name(entry.get('player_name', ''))
-            if not name:
-                continue
-            if name not in player_map:
-                player_map[name] = {
-                    'player_name': entry['player_name'],
-                    'pti_value': entry.get('pti_value'),
-                    'clubs': [],
-                    'profile_source_url': entry.get('profile_source_url'),
-                    'profile_image_url': None
-                }
-            club = entry.get('club')
-            if club and club not in player_map[name]['clubs']:
-                player_map[name]['clubs'].append(club)
-            if entry.get('pti_value') is not None:
-                player_map[name]['pti_value'] = entry['pti_value']
-
-        deduped_entries = []
-        for normalized_name, data in player_map.items():
-            deduped_entries.append({
-                'id': str(uuid.uuid4()),
-                'player_name': data['player_name'],
-                'pti_value': data['pti_value'],
-                'clubs': data['clubs'],
-                'profile_image_url': data['profile_image_url'],
-                'profile_source_url': data['profile_source_url'],
-                'scraped_at': now
-            })
-
-        await db.pti_roster.delete_many({})
-        if deduped_entries:
-            await db.pti_roster.insert_many(deduped_entries)
-
-        results['deduplication'] = {"unique_players": len(deduped_entries)}
-
-        # Step 4: Record PTI history
-        logger.info("GBPTA full sync - Step 4: Recording PTI history")
-        history_entries = []
-        for entry in deduped_entries:
-            if entry.get('pti_value') is not None:
-                history_entries.append({
-                    'id': str(uuid.uuid4()),
-                    'player_name': normalize_name(entry['player_name']),
-                    'pti_value': entry['pti_value'],
-                    'recorded_at': now
-                })
-
-        if history_entries:
-            await db.pti_history.insert_many(history_entries)
-
-        results['pti_history'] = {"records_added": len(history_entries)}
-
-        logger.info("GBPTA full sync complete")
-        return {
-            "message": "Full GBPTA sync complete",
-            "results": results
-        }
-
-    except Exception as e:
-        logger.error(f"Error in full GBPTA sync: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Full sync failed: {str(e)}")
-
-@api_router.post("/admin/gbpta/record-pti-history")
-async def record_pti_history(current_player: dict = Depends(get_current_player)):
-    """
-    Record current PTI values from pti_roster to pti_history.
-    This creates a snapshot of all player PTI values for historical tracking.
-    Should be run weekly (Tuesdays) after roster sync.
-    """
-    try:
-        # Get current roster
-        roster = await db.pti_roster.find({}, {"_id": 0}).to_list(10000)
-
-        if not roster:
-            return {
-                "message": "No roster data found. Run /admin/gbpta/full-sync first.",
-                "recorded": 0
-            }
-
-        now = datetime.now(timezone.utc).isoformat()
-        history_entries = []
-
-        for entry in roster:
-            if entry.get('pti_value') is not None:
-                history_entries.append({
-                    'id': str(uuid.uuid4()),
-                    'player_name': normalize_name(entry['player_name']),
-                    'pti_value': entry['pti_value'],
-                    'recorded_at': now
-                })
-
-        if history_entries:
-            await db.pti_history.insert_many(history_entries)
-
-        return {
-            "message": "PTI history recorded",
-            "records_added": len(history_entries),
-            "timestamp": now
-        }
-
-    except Exception as e:
-        logger.error(f"Error recording PTI history: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to record PTI history: {str(e)}")
-
-
-# ==================== TENNISCORES INTEGRATION ====================
-
-TENNISCORES_BASE_URL = "https://gbptl.tenniscores.com"
-TENNISCORES_RANKINGS_URL = f"{TENNISCORES_BASE_URL}/?mod=nndz-SkhmOW1PQ3V4Zz09"
-TENNISCORES_SCRAPE_WORKERS = 6  # Concurrent workers for bulk player page scraping
+TENNISCORES_BASE_URL = "https://gbptl.tenniscores.com"
+TENNISCORES_RANKINGS_URL = f"{TENNISCORES_BASE_URL}/?mod=nndz-SkhmOW1PQ3V4Zz09"
+TENNISCORES_SCRAPE_WORKERS = 6  # Concurrent workers for bulk player page scraping
 
 
 def parse_tenniscores_rankings(html: str) -> List[dict]:
@@ -2896,6 +4639,8 @@ def _parse_single_match(shader, normalized_subject: str) -> dict | None:
         'line': line_num,
         'rating_before': subject_rating_before,
         'rating_after': subject_rating_after,
+        # All four names as printed (home pair, away pair); identical on every participant's page
+        'players': players,
     }
 
     # Partner
@@ -3108,68 +4853,397 @@ def calculate_partner_stats(matches: List[dict], player_name: str) -> List[dict]
     return partner_stats
 
 
-@api_router.post("/admin/tenniscores/scrape-rankings")
-async def scrape_tenniscores_rankings(current_player: dict = Depends(get_current_player)):
+# ==================== PARTNER STATS ====================
+#
+# Partner aggregates live in `partner_stat_rows`, one row per (player, partner)
+# pair with running matches/wins/losses/rating_sum/rating_count totals. Every
+# match is ingested once, keyed in `ingested_matches` by date, line and the four
+# players as printed in the match, no matter how many of those players' pages it
+# is scraped from. A new match $inc's the rows of all four participants, so a
+# player's chemistry reflects matches seen on their partners' and opponents' pages too.
+#
+# `partner_stats` keeps one header per player; its last_calculated stamp moves
+# whenever any of the player's rows change and versions the chemistry cache.
+# Headers from before the aggregates may still carry a `partners` array; it is
+# served as-is until the partner stats rebuild (queued at startup) retires it.
+#
+# The same ingestion maintains `match_pairs`, a head-to-head index with one
+# document per (player_a, player_b, relation), player_a < player_b by identity
+# key and relation "partner" or "opponent", counting matches and each side's wins.
+
+def _match_participants(subject_name: str, match: dict) -> Optional[dict]:
     """
-    Scrape the Tenniscores rankings page to get all players with current PTI.
-    Updates the tenniscores_players collection.
+    Both teams of a parsed match as [(name, rating_before), ...], subject's team first.
+    Opponents are [] when they were not parsed; the partner pairing still counts.
+    """
+    partner = match.get('partner')
+    if not isinstance(partner, dict) or not partner.get('name'):
+        return None
+
+    opponents = []
+    if match.get('opponent'):
+        player_1 = match['opponent'][0].get('player_1') or {}
+        player_2 = match['opponent'][0].get('player_2') or {}
+        if player_1.get('name') and player_2.get('name'):
+            opponents = [(player_1['name'], player_1.get('rating_before')), (player_2['name'], player_2.get('rating_before'))]
+
+    return {
+        'team': [(subject_name, match.get('rating_before')), (partner['name'], partner.get('rating_before'))],
+        'opponents': opponents,
+        'won': match.get('result') == 'W'
+    }
+
+
+def match_key(match: dict, participants: dict) -> str:
+    """
+    Identity of a match that is the same on all four participants' pages: date, line and
+    both sides' names as printed in the match. Pages stored before the printed names were
+    kept fall back to the page owner's name for the subject.
+    """
+    printed = match.get('players') or []
+    if len(printed) >= 2:
+        sides = (printed[:2], printed[2:4])
+    else:
+        sides = ([name for name, _ in participants['team']], [name for name, _ in participants['opponents']])
+    teams = sorted(sorted(normalize_name(name) for name in side) for side in sides)
+    raw = f"{match.get('date', '')}|{match.get('line', '')}|{teams}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _partner_row_ops(participants: dict, now: str) -> list:
+    """$inc upserts for the (player, partner) rows touched by one match: four, or two without opponents."""
+    ops = []
+    sides = [(participants['team'], participants['won'])]
+    if participants['opponents']:
+        sides.append((participants['opponents'], not participants['won']))
+    for (first, second), won in sides:
+        for player_name, (partner_name, partner_rating) in ((first[0], second), (second[0], first)):
+            inc = {'matches_played': 1, 'wins': int(won), 'losses': int(not won)}
+            if partner_rating is not None:
+                inc['rating_sum'] = partner_rating
+                inc['rating_count'] = 1
+            ops.append(UpdateOne(
+                {'normalized_name': normalize_name(player_name), 'partner_key': normalize_name(partner_name)},
+                {'$inc': inc, '$set': {'partner_name': partner_name, 'updated_at': now}},
+                upsert=True
+            ))
+    return ops
+
+
+def _match_pair_ops(participants: dict, now: str) -> list:
+    """$inc upserts for the two partner pairs and four opponent pairs of one match (one pair without opponents)."""
+    team = [(name, participants['won']) for name, _ in participants['team']]
+    opponents = [(name, not participants['won']) for name, _ in participants['opponents']]
+    pairs = [(team[0], team[1], 'partner')]
+    if opponents:
+        pairs.append((opponents[0], opponents[1], 'partner'))
+        pairs += [(player, opponent, 'opponent') for player in team for opponent in opponents]
+
+    ops = []
+    for first, second, relation in pairs:
+        (name_a, won_a), (name_b, won_b) = sorted((first, second), key=lambda p: normalize_name(p[0]))
+        ops.append(UpdateOne(
+            {'player_a': normalize_name(name_a), 'player_b': normalize_name(name_b), 'relation': relation},
+            {
+                '$inc': {'matches': 1, 'wins_a': int(won_a), 'wins_b': int(won_b)},
+                '$set': {'name_a': name_a, 'name_b': name_b, 'updated_at': now}
+            },
+            upsert=True
+        ))
+    return ops
+
+
+async def _claim_new_matches(docs: list) -> list:
+    """Insert match keys; returns the docs that were not already ingested (by this or a concurrent scrape)."""
+    try:
+        await db.ingested_matches.insert_many(docs, ordered=False)
+        return docs
+    except BulkWriteError as e:
+        errors = e.details.get('writeErrors', [])
+        if any(err.get('code') != 11000 for err in errors):
+            raise
+        duplicates = {err['index'] for err in errors}
+        return [doc for i, doc in enumerate(docs) if i not in duplicates]
+
+
+async def ingest_matches(subject_name: str, matches: List[dict]) -> dict:
+    """
+    Fold a scraped page's matches into the partner aggregates.
+    Only matches not ingested before are counted; all four participants' rows
+    are updated in one bulk write.
     """
+    now = datetime.now(timezone.utc).isoformat()
+    candidates = {}
+    for match in matches:
+        participants = _match_participants(subject_name, match)
+        if participants:
+            candidates[match_key(match, participants)] = participants
+
+    if not candidates:
+        return {"matches_seen": 0, "new_matches": 0, "rows_updated": 0}
+
+    docs = [{
+        'match_key': key,
+        'players': [normalize_name(name) for name, _ in participants['team'] + participants['opponents']],
+        'source': normalize_name(subject_name),
+        'ingested_at': now
+    } for key, participants in candidates.items()]
+    new_docs = await _claim_new_matches(docs)
+
+    ops = []
+    pair_ops = []
+    display_names = {}
+    for doc in new_docs:
+        participants = candidates[doc['match_key']]
+        ops.extend(_partner_row_ops(participants, now))
+        pair_ops.extend(_match_pair_ops(participants, now))
+        for name, _ in participants['team'] + participants['opponents']:
+            display_names.setdefault(normalize_name(name), name)
+    # Stamp every affected player's header so cached chemistry is rebuilt
+    header_ops = [UpdateOne(
+        {'normalized_name': key},
+        {'$set': {'last_calculated': now}, '$setOnInsert': {'player_name': name}},
+        upsert=True
+    ) for key, name in display_names.items()]
     try:
-        logger.info("Scraping Tenniscores rankings page...")
-        html = await fetch_html(TENNISCORES_RANKINGS_URL)
+        write = await bulk_write_batched(db.partner_stat_rows, ops, "partner_stat_rows")
+        await bulk_write_batched(db.match_pairs, pair_ops, "match_pairs")
+        await bulk_write_batched(db.partner_stats, header_ops, "partner_stats headers")
+    except Exception:
+        # Un-claim so the next scrape of any participant counts these matches again
+        await db.ingested_matches.delete_many({'match_key': {'$in': [doc['match_key'] for doc in new_docs]}})
+        raise
 
-        players = parse_tenniscores_rankings(html)
-        logger.info(f"Found {len(players)} players on Tenniscores")
+    return {"matches_seen": len(candidates), "new_matches": len(new_docs), "rows_updated": write['rows']}
 
-        if not players:
-            return {"message": "No players found", "count": 0}
 
-        # Update tenniscores_players collection
-        now = datetime.now(timezone.utc).isoformat()
-        inserted = 0
-        updated = 0
+def _partner_row_summary(row: dict) -> dict:
+    """Shape a partner_stat_rows document like calculate_partner_stats output."""
+    played = row.get('matches_played', 0)
+    rating_count = row.get('rating_count', 0)
+    return {
+        'partner_name': row['partner_name'],
+        'matches_played': played,
+        'wins': row.get('wins', 0),
+        'losses': row.get('losses', 0),
+        'win_rate': round(row.get('wins', 0) / played * 100, 1) if played > 0 else 0,
+        'avg_partner_rating': round(row.get('rating_sum', 0) / rating_count, 1) if rating_count else None
+    }
 
-        for player in players:
-            player['last_scraped'] = now
-            player['normalized_name'] = normalize_name(player['name'])
 
-            existing = await db.tenniscores_players.find_one({
-                'normalized_name': player['normalized_name']
-            })
+async def load_partner_stats(normalized: str) -> List[dict]:
+    """
+    A player's partners, most matches first. A legacy stored partners array is served
+    until the partner stats rebuild has folded every stored page into the aggregates.
+    """
+    legacy = await db.partner_stats.find_one({'normalized_name': normalized}, {'_id': 0, 'partners': 1})
+    if legacy and 'partners' in legacy:
+        return legacy['partners']
 
-            if existing:
-                await db.tenniscores_players.update_one(
-                    {'_id': existing['_id']},
-                    {'$set': player}
-                )
-                updated += 1
-            else:
-                player['id'] = str(uuid.uuid4())
-                player['created_at'] = now
-                await db.tenniscores_players.insert_one(player)
-                inserted += 1
+    rows = await db.partner_stat_rows.find(
+        {'normalized_name': normalized},
+        {'_id': 0}
+    ).sort('matches_played', -1).to_list(1000)
+    return [_partner_row_summary(row) for row in rows]
 
-        # Also update PTI values in pti_roster for matching players
-        pti_updated = 0
-        for player in players:
-            if player['pti_current'] is not None:
-                result = await db.pti_roster.update_many(
-                    {'normalized_name': player['normalized_name']},
-                    {'$set': {'pti_value': player['pti_current'], 'pti_updated': now}}
-                )
-                pti_updated += result.modified_count
 
-        return {
-            "message": "Tenniscores rankings scraped successfully",
-            "total_found": len(players),
-            "inserted": inserted,
-            "updated": updated,
-            "pti_roster_updated": pti_updated
-        }
+async def save_player_match_history(name: str, normalized: str, player_data: dict, now: str) -> dict:
+    """Store a scraped player page and ingest its matches into the partner aggregates."""
+    await db.match_history.update_one(
+        {'normalized_name': normalized},
+        {
+            '$set': {
+                'player_name': name,
+                'normalized_name': normalized,
+                'current_pti': player_data['current_pti'],
+                'matches': player_data['matches'],
+                'match_count': len(player_data['matches']),
+                'last_scraped': now
+            }
+        },
+        upsert=True
+    )
 
-    except Exception as e:
-        logger.error(f"Error scraping Tenniscores rankings: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    ingested = await ingest_matches(name, player_data['matches'])
+
+    await db.partner_stats.update_one(
+        {'normalized_name': normalized},
+        {
+            '$set': {'player_name': name, 'normalized_name': normalized},
+            '$setOnInsert': {'last_calculated': now}
+        },
+        upsert=True
+    )
+    return ingested
+
+
+async def _run_partner_stats_rebuild_job(job: dict) -> dict:
+    """
+    Recompute every partner aggregate and head-to-head pair from stored match_history pages.
+    Clears the aggregates on first start; resumes after the last player it finished.
+    """
+    job_id = job['id']
+    # The trigger endpoint checks too, but a players job can start while this one is queued
+    scrape_job_id = await active_sync_job_id('tenniscores_players')
+    if scrape_job_id:
+        raise RuntimeError(f"A tenniscores_players job is in progress ({scrape_job_id}); rebuild after it finishes")
+
+    checkpoint = job.get('checkpoint') or {}
+    after = checkpoint.get('after')
+    if 'after' not in checkpoint:
+        await db.ingested_matches.delete_many({})
+        await db.partner_stat_rows.delete_many({})
+        await db.match_pairs.delete_many({})
+        await sync_job_heartbeat(job_id, fields={"checkpoint.after": None})
+
+    query = {'normalized_name': {'$gt': after}} if after else {}
+    total = await db.match_history.count_documents({})
+    await sync_job_heartbeat(job_id, fields={
+        "progress.total": total,
+        "progress.completed": total - await db.match_history.count_documents(query),
+        "progress.errors": 0
+    })
+
+    new_matches = 0
+    cursor = db.match_history.find(query, {'_id': 0, 'player_name': 1, 'normalized_name': 1, 'matches': 1})
+    async for history in cursor.sort('normalized_name', 1):
+        result = await ingest_matches(history['player_name'], history.get('matches', []))
+        new_matches += result['new_matches']
+        await sync_job_heartbeat(job_id, inc={"completed": 1}, fields={"checkpoint.after": history['normalized_name']})
+
+    # Aggregates now cover every stored page: retire the legacy partners arrays
+    await db.partner_stats.update_many(
+        {'partners': {'$exists': True}},
+        {'$unset': {'partners': ""}, '$set': {'last_calculated': datetime.now(timezone.utc).isoformat()}}
+    )
+
+    return {"players": total, "new_matches": new_matches, "coplay_graph": await rebuild_coplay_graph()}
+
+
+@api_router.get("/admin/partner-stats/verify/{player_name}")
+async def verify_partner_stats(player_name: str, current_player: dict = Depends(get_current_player)):
+    """
+    Recompute a player's partner stats from their own scraped page and diff them
+    against the incremental aggregates. Aggregates may legitimately be ahead when
+    partners' or opponents' pages contain matches the player's page does not.
+    """
+    normalized = normalize_name(player_name)
+    history = await db.match_history.find_one({'normalized_name': normalized}, {'_id': 0, 'matches': 1})
+    if not history:
+        raise HTTPException(status_code=404, detail="No match history for this player")
+
+    recomputed = {
+        normalize_name(p['partner_name']): p
+        for p in calculate_partner_stats(history.get('matches', []), player_name)
+    }
+    rows = await db.partner_stat_rows.find({'normalized_name': normalized}, {'_id': 0}).to_list(1000)
+    incremental = {row['partner_key']: _partner_row_summary(row) for row in rows}
+
+    fields = ('matches_played', 'wins', 'losses', 'avg_partner_rating')
+    mismatches = []
+    for key in sorted(set(recomputed) | set(incremental)):
+        expected, actual = recomputed.get(key), incremental.get(key)
+        if expected and actual and all(expected[f] == actual[f] for f in fields):
+            continue
+        mismatches.append({
+            "partner_key": key,
+            "recomputed": expected,
+            "incremental": actual,
+            "incremental_ahead": bool(actual) and (not expected or actual['matches_played'] > expected['matches_played'])
+        })
+
+    return {
+        "player_name": player_name,
+        "partners_recomputed": len(recomputed),
+        "partners_incremental": len(incremental),
+        "consistent": all(m['incremental_ahead'] for m in mismatches),
+        "mismatches": mismatches
+    }
+
+
+@api_router.post("/admin/partner-stats/rebuild", status_code=202)
+async def rebuild_partner_stats(current_player: dict = Depends(get_current_player)):
+    """
+    Rebuild all partner aggregates from stored match history as a background job.
+    Use after a parser change or when verification reports drift.
+    """
+    await ensure_sync_job_idle('tenniscores_players')
+    job, created = await trigger_sync_job('partner_stats_rebuild', created_by=current_player['id'])
+    return {
+        "message": "Partner stats rebuild queued" if created else "Partner stats rebuild already running",
+        "job_id": job['id'],
+        "status": job['status'],
+        "attached": not created
+    }
+
+
+async def _run_tenniscores_rankings_job(job: dict) -> dict:
+    """Scrape the Tenniscores rankings page and upsert tenniscores_players / pti_roster PTI values."""
+    logger.info("Scraping Tenniscores rankings page...")
+    html = await fetch_html(TENNISCORES_RANKINGS_URL)
+
+    players = parse_tenniscores_rankings(html)
+    logger.info(f"Found {len(players)} players on Tenniscores")
+
+    # Upsert tenniscores_players keyed on normalized name
+    now = datetime.now(timezone.utc).isoformat()
+    player_ops = []
+    for player in players:
+        player['last_scraped'] = now
+        player['normalized_name'] = normalize_name(player['name'])
+        player_ops.append(UpdateOne(
+            {'normalized_name': player['normalized_name']},
+            {
+                '$set': player,
+                '$setOnInsert': {'id': str(uuid.uuid4()), 'created_at': now}
+            },
+            upsert=True
+        ))
+    player_write = await bulk_write_batched(db.tenniscores_players, player_ops, "tenniscores_players")
+
+    # Also update PTI values in pti_roster for matching players
+    roster_ops = [
+        UpdateMany(
+            {'normalized_name': player['normalized_name']},
+            {'$set': {'pti_value': player['pti_current'], 'pti_updated': now}}
+        )
+        for player in players if player['pti_current'] is not None
+    ]
+    roster_write = await bulk_write_batched(db.pti_roster, roster_ops, "pti_roster PTI")
+    await rebuild_player_identities()
+    if roster_write['modified']:
+        await rebuild_club_summaries()
+
+    return {
+        "total_found": len(players),
+        "inserted": player_write['upserted'],
+        "updated": player_write['matched'],
+        "pti_roster_updated": roster_write['modified'],
+        "rows_per_second": player_write['rows_per_second']
+    }
+
+
+@api_router.post("/admin/tenniscores/scrape-rankings")
+async def scrape_tenniscores_rankings(current_player: dict = Depends(get_current_player)):
+    """
+    Scrape the Tenniscores rankings page to get all players with current PTI.
+    Updates the tenniscores_players collection.
+    Concurrent calls share a single scrape.
+    """
+    job = await run_sync_job_inline('tenniscores_rankings', created_by=current_player['id'])
+    if not job or job['status'] != 'completed':
+        error = (job or {}).get('error') or (job or {}).get('status', 'unknown')
+        logger.error(f"Error scraping Tenniscores rankings: {error}")
+        raise HTTPException(status_code=500, detail=error)
+
+    result = job['result']
+    if not result['total_found']:
+        return {"message": "No players found", "count": 0}
+
+    return {
+        "message": "Tenniscores rankings scraped successfully",
+        **result
+    }
 
 
 @api_router.post("/admin/tenniscores/scrape-player/{player_name}")
@@ -3210,44 +5284,16 @@ async def scrape_tenniscores_player(
         html = await fetch_html(ts_player['profile_url'])
 
         player_data = parse_tenniscores_player_page(html, player_name)
-        partner_stats = calculate_partner_stats(player_data['matches'], player_name)
 
-        # Store match history
         now = datetime.now(timezone.utc).isoformat()
-
-        await db.match_history.update_one(
-            {'normalized_name': normalized},
-            {
-                '$set': {
-                    'player_name': player_name,
-                    'normalized_name': normalized,
-                    'current_pti': player_data['current_pti'],
-                    'matches': player_data['matches'],
-                    'match_count': len(player_data['matches']),
-                    'last_scraped': now
-                }
-            },
-            upsert=True
-        )
-
-        # Store partner stats
-        await db.partner_stats.update_one(
-            {'normalized_name': normalized},
-            {
-                '$set': {
-                    'player_name': player_name,
-                    'normalized_name': normalized,
-                    'partners': partner_stats,
-                    'last_calculated': now
-                }
-            },
-            upsert=True
-        )
+        ingested = await save_player_match_history(player_name, normalized, player_data, now)
+        partner_stats = await load_partner_stats(normalized)
 
         return {
             "message": f"Player data scraped for {player_name}",
             "matches_found": len(player_data['matches']),
             "partners_found": len(partner_stats),
+            "new_matches": ingested['new_matches'],
             "current_pti": player_data['current_pti']
         }
 
@@ -3258,102 +5304,46 @@ async def scrape_tenniscores_player(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def _scrape_single_tenniscores_player(ts_player: dict, now: str, semaphore: asyncio.Semaphore) -> bool:
-    """Scrape one Tenniscores player page under semaphore. Returns True on success."""
-    async with semaphore:
-        try:
-            name = ts_player.get('name', '')
-            normalized = ts_player.get('normalized_name', normalize_name(name))
-
-            html = await fetch_html(ts_player['profile_url'])
-            player_data = parse_tenniscores_player_page(html, name)
-            partner_stats = calculate_partner_stats(player_data['matches'], name)
-
-            await db.match_history.update_one(
-                {'normalized_name': normalized},
-                {
-                    '$set': {
-                        'player_name': name,
-                        'normalized_name': normalized,
-                        'current_pti': player_data['current_pti'],
-                        'matches': player_data['matches'],
-                        'match_count': len(player_data['matches']),
-                        'last_scraped': now
-                    }
-                },
-                upsert=True
-            )
+async def _scrape_single_tenniscores_player(ts_player: dict, now: str) -> bool:
+    """Scrape one Tenniscores player page. Callers bound concurrency. Returns True on success."""
+    try:
+        name = ts_player.get('name', '')
+        normalized = ts_player.get('normalized_name', normalize_name(name))
 
-            await db.partner_stats.update_one(
-                {'normalized_name': normalized},
-                {
-                    '$set': {
-                        'player_name': name,
-                        'normalized_name': normalized,
-                        'partners': partner_stats,
-                        'last_calculated': now
-                    }
-                },
-                upsert=True
-            )
+        html = await fetch_html(ts_player['profile_url'])
+        player_data = parse_tenniscores_player_page(html, name)
+        await save_player_match_history(name, normalized, player_data, now)
 
-            # Rate limiting per worker
-            await asyncio.sleep(1.5)
-            return True
+        # Rate limiting per worker
+        await asyncio.sleep(1.5)
+        return True
 
-        except Exception as e:
-            logger.error(f"Error scraping Tenniscores player {ts_player.get('name', '?')}: {e}")
-            await asyncio.sleep(1.0)
-            return False
+    except Exception as e:
+        logger.error(f"Error scraping Tenniscores player {ts_player.get('name', '?')}: {e}")
+        await asyncio.sleep(1.0)
+        return False
 
 
-@api_router.post("/admin/tenniscores/scrape-all-players")
+@api_router.post("/admin/tenniscores/scrape-all-players", status_code=202)
 async def scrape_all_tenniscores_players(current_player: dict = Depends(get_current_player)):
     """
     Bulk scrape all Tenniscores player pages for match history.
-    Uses concurrent workers for faster throughput.
+    Enqueues a background job and returns its id immediately; poll /admin/jobs/{job_id} for progress.
+    Concurrent triggers attach to the job already in flight.
     Prerequisite: tenniscores_players must be populated via /admin/tenniscores/scrape-rankings.
     """
-    try:
-        all_players = await db.tenniscores_players.find(
-            {'profile_url': {'$exists': True, '$ne': None}},
-            {'_id': 0}
-        ).to_list(10000)
-
-        if not all_players:
-            return {"message": "No players found. Run /admin/tenniscores/scrape-rankings first.", "total": 0}
-
-        logger.info(f"Starting bulk Tenniscores scrape for {len(all_players)} players with {TENNISCORES_SCRAPE_WORKERS} workers...")
-        now = datetime.now(timezone.utc).isoformat()
-        semaphore = asyncio.Semaphore(TENNISCORES_SCRAPE_WORKERS)
-
-        # Launch all tasks concurrently, semaphore limits active workers
-        tasks = [_scrape_single_tenniscores_player(p, now, semaphore) for p in all_players]
-
-        # Log progress as tasks complete
-        scraped = 0
-        errors = 0
-        for i, coro in enumerate(asyncio.as_completed(tasks)):
-            success = await coro
-            if success:
-                scraped += 1
-            else:
-                errors += 1
-            if (i + 1) % 50 == 0:
-                logger.info(f"Tenniscores bulk scrape progress: {i + 1}/{len(all_players)} ({scraped} scraped, {errors} errors)")
-
-        logger.info(f"Tenniscores bulk scrape complete: {scraped}/{len(all_players)} scraped, {errors} errors")
+    has_players = await db.tenniscores_players.find_one({'profile_url': {'$exists': True, '$ne': None}})
+    if not has_players:
+        return {"message": "No players found. Run /admin/tenniscores/scrape-rankings first.", "total": 0}
 
-        return {
-            "message": "Bulk Tenniscores scrape complete",
-            "total": len(all_players),
-            "scraped": scraped,
-            "errors": errors
-        }
+    job, created = await trigger_sync_job('tenniscores_players', created_by=current_player['id'])
 
-    except Exception as e:
-        logger.error(f"Error in bulk Tenniscores scrape: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "message": "Bulk Tenniscores scrape queued" if created else "Bulk Tenniscores scrape already running",
+        "job_id": job['id'],
+        "status": job['status'],
+        "attached": not created
+    }
 
 
 @api_router.post("/admin/migrate-club-names")
@@ -3388,6 +5378,7 @@ async def migrate_club_names(current_player: dict = Depends(get_current_player))
             stats["pti_roster_updated"] += 1
 
     # Migrate players.home_club
+    updated_ids = []
     players = await db.players.find(
         {"home_club": {"$exists": True, "$ne": None}},
         {"_id": 0, "id": 1, "home_club": 1, "other_clubs": 1}
@@ -3408,25 +5399,83 @@ async def migrate_club_names(current_player: dict = Depends(get_current_player))
                 stats["players_other_clubs_updated"] += 1
 
         if updates:
-            await db.players.update_one({"id": player["id"]}, {"$set": updates})
-
+            updates["updated_at"] = datetime.now(timezone.utc).isoformat()
+            await db.players.update_one({"id": player["id"]}, {"$set": updates, "$inc": {"visibility_version": 1}})
+            updated_ids.append(player["id"])
+
+    # Clubs decide who sees club games and feed the candidate index
+    if updated_ids:
+        await bump_generation("player_directory")
+        enqueue_inbox_refresh(updated_ids)
+    await rebuild_club_summaries()
     return {"message": "Club name migration complete", "stats": stats}
 
 
-@api_router.get("/players/{player_id}/match-history")
-async def get_player_match_history(
-    player_id: str,
-    current_player: dict = Depends(get_current_player)
-):
-    """
-    Get a player's match history and partner stats.
+# (collection, ISO string field) pairs that carry a <field>_utc BSON date companion
+DATE_COMPANION_FIELDS = [
+    ("requests", "date_time"),
+    ("requests_archive", "date_time"),
+    ("availability_posts", "expires_at"),
+    ("invites", "sent_at"),
+    ("pti_history", "recorded_at"),
+]
+
+
+async def backfill_date_companions() -> dict:
+    """Add the <field>_utc BSON date to documents that only have the ISO string. Safe to re-run."""
+    counts = {}
+    for collection_name, field in DATE_COMPANION_FIELDS:
+        collection = db[collection_name]
+        companion = f"{field}_utc"
+        docs = await collection.find(
+            {companion: {"$exists": False}, field: {"$type": "string"}},
+            {"_id": 1, field: 1}
+        ).to_list(None)
+
+        ops = []
+        for doc in docs:
+            try:
+                ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {companion: utc_datetime(doc[field])}}))
+            except ValueError:
+                logger.warning(f"Unparseable {collection_name}.{field}: {doc[field]!r}")
+        write = await bulk_write_batched(collection, ops, f"{collection_name}.{companion}")
+        counts[collection_name] = write['modified']
+    return counts
+
+
+async def refresh_team_club_names() -> int:
+    """Store the resolved official club as club_name on every team whose mapping is missing or stale."""
+    lookup = await load_club_lookup()
+    teams = await db.clubs.find({}, {"_id": 1, "name": 1, "club_name": 1}).to_list(None)
+    ops = []
+    for team in teams:
+        club_name = resolve_club_name_with(team.get("name", ""), lookup)
+        if team.get("club_name") != club_name:
+            ops.append(UpdateOne({"_id": team["_id"]}, {"$set": {"club_name": club_name}}))
+    write = await bulk_write_batched(db.clubs, ops, "clubs.club_name")
+    return write['modified']
+
+
+@api_router.post("/admin/migrate-date-fields")
+async def migrate_date_fields(current_player: dict = Depends(get_current_player)):
+    """Backfill BSON date companions (date_time_utc, expires_at_utc, ...) for older documents"""
+    return {"message": "Date field migration complete", "updated": await backfill_date_companions()}
+
+
+@api_router.get("/players/{player_id}/match-history")
+async def get_player_match_history(
+    player_id: str,
+    current_player: dict = Depends(get_current_player)
+):
+    """
+    Get a player's match history and partner stats.
     """
     # Get the player
     player = await db.players.find_one({'id': player_id}, {'_id': 0, 'password_hash': 0})
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
 
-    normalized = normalize_name(player.get('name', ''))
+    normalized = await get_player_identity_key(player)
 
     # Get match history
     match_history = await db.match_history.find_one(
@@ -3453,7 +5502,7 @@ async def get_player_match_history(
             "pti": player.get('pti')
         },
         "match_history": match_history,
-        "partner_stats": partner_stats.get('partners', []) if partner_stats else [],
+        "partner_stats": await load_partner_stats(normalized) if partner_stats else [],
         "pti_trend": {
             "start": ts_player.get('pti_start') if ts_player else None,
             "current": ts_player.get('pti_current') if ts_player else None,
@@ -3462,6 +5511,11 @@ async def get_player_match_history(
     }
 
 
+# Enriched partner chemistry per identity key, valid for one
+# (partner_stats.last_calculated, player_directory generation) pair
+_partner_chemistry_cache = VersionedCache(max_entries=2000)
+
+
 @api_router.get("/players/{player_id}/partner-chemistry")
 async def get_partner_chemistry(
     player_id: str,
@@ -3469,36 +5523,45 @@ async def get_partner_chemistry(
 ):
     """
     Get a player's partner chemistry stats - who they play well with.
+    Cached per player until their partner_stats are recalculated or the player directory changes.
     """
     player = await db.players.find_one({'id': player_id}, {'_id': 0})
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
 
-    normalized = normalize_name(player.get('name', ''))
+    normalized = await get_player_identity_key(player)
 
-    partner_stats = await db.partner_stats.find_one(
+    stats_version = await db.partner_stats.find_one(
         {'normalized_name': normalized},
-        {'_id': 0}
+        {'_id': 0, 'last_calculated': 1}
     )
 
-    if not partner_stats:
+    if not stats_version:
         return {
             "player_name": player.get('name'),
             "partners": [],
             "message": "No partner data available. Scrape player history first."
         }
 
-    # Enrich partner data with registered player info
-    enriched_partners = []
-    for partner in partner_stats.get('partners', []):
-        partner_normalized = normalize_name(partner['partner_name'])
+    version = (stats_version.get('last_calculated'), await get_generation("player_directory"))
+    cached = _partner_chemistry_cache.get(normalized, version)
+    if cached is not None:
+        return cached
 
-        # Check if partner is registered
-        registered_partner = await db.players.find_one(
-            {'name': {'$regex': f'^{partner["partner_name"]}$', '$options': 'i'}, 'profile_complete': True},
-            {'_id': 0, 'id': 1, 'name': 1, 'profile_image_url': 1, 'pti': 1}
-        )
+    partners = await load_partner_stats(normalized)
+
+    # Resolve every registered partner in one indexed query on the stored identity key
+    partner_keys = list({normalize_name(p['partner_name']) for p in partners})
+    registered = await db.players.find(
+        {'normalized_name': {'$in': partner_keys}, 'profile_complete': True},
+        {'_id': 0, 'id': 1, 'normalized_name': 1, 'profile_image_url': 1, 'pti': 1}
+    ).to_list(len(partner_keys) or 1)
+    registered_by_key = {p['normalized_name']: p for p in registered}
 
+    # Enrich partner data with registered player info
+    enriched_partners = []
+    for partner in partners:
+        registered_partner = registered_by_key.get(normalize_name(partner['partner_name']))
         enriched_partners.append({
             **partner,
             'is_registered': registered_partner is not None,
@@ -3507,46 +5570,1349 @@ async def get_partner_chemistry(
             'current_pti': registered_partner.get('pti') if registered_partner else None
         })
 
-    return {
+    payload = {
         "player_name": player.get('name'),
         "partners": enriched_partners,
-        "last_calculated": partner_stats.get('last_calculated')
+        "last_calculated": stats_version.get('last_calculated')
     }
+    _partner_chemistry_cache.set(normalized, version, payload)
+    return payload
 
 
-# ==================== UTILITY ROUTES ====================
+def _pair_record(pair: dict, key: str) -> dict:
+    """A match_pairs document from the point of view of the player with identity key `key`."""
+    is_a = pair['player_a'] == key
+    wins = pair['wins_a'] if is_a else pair['wins_b']
+    matches = pair['matches']
+    return {
+        'relation': pair['relation'],
+        'other_key': pair['player_b'] if is_a else pair['player_a'],
+        'other_name': pair['name_b'] if is_a else pair['name_a'],
+        'matches_played': matches,
+        'wins': wins,
+        'losses': matches - wins,
+        'win_rate': round(wins / matches * 100, 1) if matches else 0
+    }
 
-@api_router.get("/clubs")
-async def list_clubs(
-    league: Optional[str] = None,
+
+@api_router.get("/players/{player_id}/head-to-head")
+async def get_head_to_head(
+    player_id: str,
+    relation: str = "opponent",
+    limit: int = 50,
     current_player: dict = Depends(get_current_player)
 ):
     """
-    List all clubs from GBPTA scraping.
-    Optionally filter by league (Metrowest, North Shore, Metrowest Women's Day League).
-    Returns clubs with member counts.
+    A player's record against every opponent (or with every partner), most matches first.
+    Served from the match_pairs index maintained during match ingestion.
+    """
+    if relation not in ("opponent", "partner"):
+        raise HTTPException(status_code=400, detail="relation must be 'opponent' or 'partner'")
+
+    player = await db.players.find_one({'id': player_id}, {'_id': 0})
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    key = await get_player_identity_key(player)
+    pairs = await db.match_pairs.find(
+        {'relation': relation, '$or': [{'player_a': key}, {'player_b': key}]},
+        {'_id': 0}
+    ).sort('matches', -1).to_list(min(limit, 500))
+    records = [_pair_record(pair, key) for pair in pairs]
+
+    other_keys = [r['other_key'] for r in records]
+    registered = await db.players.find(
+        {'normalized_name': {'$in': other_keys}, 'profile_complete': True},
+        {'_id': 0, 'id': 1, 'normalized_name': 1}
+    ).to_list(len(other_keys) or 1)
+    ids_by_key = {p['normalized_name']: p['id'] for p in registered}
+    for record in records:
+        record['player_id'] = ids_by_key.get(record.pop('other_key'))
+
+    return {"player_name": player.get('name'), "relation": relation, "records": records}
+
+
+@api_router.get("/players/{player_id}/head-to-head/{other_player_id}")
+async def get_record_vs_player(
+    player_id: str,
+    other_player_id: str,
+    current_player: dict = Depends(get_current_player)
+):
+    """A player's record against and alongside one other player, in one indexed read."""
+    players = await db.players.find(
+        {'id': {'$in': [player_id, other_player_id]}},
+        {'_id': 0}
+    ).to_list(2)
+    players_by_id = {p['id']: p for p in players}
+    if player_id not in players_by_id or other_player_id not in players_by_id:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    key = await get_player_identity_key(players_by_id[player_id])
+    other_key = await get_player_identity_key(players_by_id[other_player_id])
+    if key == other_key:
+        raise HTTPException(status_code=400, detail="Pick two different players")
+
+    player_a, player_b = sorted((key, other_key))
+    pairs = await db.match_pairs.find(
+        {'player_a': player_a, 'player_b': player_b},
+        {'_id': 0}
+    ).to_list(2)
+    by_relation = {pair['relation']: _pair_record(pair, key) for pair in pairs}
+
+    empty = {'matches_played': 0, 'wins': 0, 'losses': 0, 'win_rate': 0}
+    result = {}
+    for relation in ("opponent", "partner"):
+        record = by_relation.get(relation)
+        result[relation] = {k: record[k] for k in empty} if record else dict(empty)
+
+    return {
+        "player_name": players_by_id[player_id].get('name'),
+        "other_player_name": players_by_id[other_player_id].get('name'),
+        "as_opponents": result['opponent'],
+        "as_partners": result['partner']
+    }
+
+
+# ==================== CO-PLAY GRAPH ====================
+#
+# Undirected graph over player identity keys, with an edge wherever two players
+# have partnered, faced each other (match_pairs) or share a crew. It is held in
+# memory in CSR form: the neighbours of node i are indices[indptr[i]:indptr[i + 1]],
+# pre-sorted by edge weight so degree-limited walks just take a prefix. Each
+# Tenniscores sync rebuilds it and persists the arrays to `coplay_graph`; other
+# workers reload on the "coplay_graph" generation bump.
+
+COPLAY_PARTNER = 1
+COPLAY_OPPONENT = 2
+COPLAY_CREW = 4
+
+
+class CoplayGraph:
+    """Array-backed co-play adjacency lists."""
+
+    def __init__(self, keys: list, names: list, indptr, indices, partner_counts, opponent_counts, flags, built_at: str):
+        self.keys = keys
+        self.names = names
+        self.indptr = indptr
+        self.indices = indices
+        self.partner_counts = partner_counts
+        self.opponent_counts = opponent_counts
+        self.flags = flags
+        self.built_at = built_at
+        self.node_index = {key: i for i, key in enumerate(keys)}
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices) // 2
+
+    def edges(self, node: int) -> slice:
+        return slice(self.indptr[node], self.indptr[node + 1])
+
+    def neighbourhood(self, start: int, hops: int, max_degree: int) -> dict:
+        """Breadth-first walk following at most max_degree strongest edges per node. Returns {node: (hop, via)}."""
+        reached = {start: (0, None)}
+        frontier = [start]
+        for hop in range(1, hops + 1):
+            next_frontier = []
+            for node in frontier:
+                span = self.edges(node)
+                for neighbour in self.indices[span][:max_degree].tolist():
+                    if neighbour not in reached:
+                        reached[neighbour] = (hop, node)
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        del reached[start]
+        return reached
+
+    def partners_of_partners(self, start: int, top_partners: int) -> tuple:
+        """
+        Score players by how often they partner with start's most frequent partners,
+        weighted by how often start partners with each of those. Start and start's
+        own partners score zero. Returns (scores, shared_partner_counts) arrays.
+        """
+        span = self.edges(start)
+        neighbours = self.indices[span]
+        counts = self.partner_counts[span]
+        partnered = counts > 0
+        partners, counts = neighbours[partnered], counts[partnered]
+        top = np.argsort(-counts, kind='stable')[:top_partners]
+
+        scores = np.zeros(len(self.keys), dtype=np.float64)
+        shared = np.zeros(len(self.keys), dtype=np.int32)
+        for partner, count in zip(partners[top], counts[top]):
+            partner_span = self.edges(partner)
+            second = self.indices[partner_span]
+            second_counts = self.partner_counts[partner_span]
+            # Neighbours are unique within a row, so fancy-index += is safe here
+            scores[second] += count * second_counts
+            shared[second] += second_counts > 0
+
+        scores[start] = 0
+        scores[partners] = 0
+        return scores, shared
+
+
+def build_coplay_graph(pairs: List[dict], crews: List[List[tuple]], built_at: str) -> CoplayGraph:
+    """
+    Build the CSR graph from match_pairs documents and crew member lists
+    (each a list of (identity key, display name) tuples).
+    """
+    node_index = {}
+    names = []
+
+    def node(key: str, name: str) -> int:
+        if key not in node_index:
+            node_index[key] = len(names)
+            names.append(name)
+        return node_index[key]
+
+    # Undirected edges keyed (low, high) so pair and crew links between two players merge
+    edges = {}
+    for pair in pairs:
+        a, b = node(pair['player_a'], pair['name_a']), node(pair['player_b'], pair['name_b'])
+        if a == b:
+            continue
+        edge = edges.setdefault((min(a, b), max(a, b)), [0, 0, 0])
+        edge[0 if pair['relation'] == 'partner' else 1] += pair['matches']
+
+    for members in crews:
+        nodes = sorted({node(key, name) for key, name in members})
+        for i, a in enumerate(nodes):
+            for b in nodes[i + 1:]:
+                edges.setdefault((a, b), [0, 0, 0])[2] = 1
+
+    n = len(names)
+    if edges:
+        pairs_array = np.array(list(edges.keys()), dtype=np.int32)
+        stats = np.array(list(edges.values()), dtype=np.int32)
+    else:
+        pairs_array = np.zeros((0, 2), dtype=np.int32)
+        stats = np.zeros((0, 3), dtype=np.int32)
+
+    # Both directions of every undirected edge
+    src = np.concatenate([pairs_array[:, 0], pairs_array[:, 1]])
+    dst = np.concatenate([pairs_array[:, 1], pairs_array[:, 0]])
+    stats = np.concatenate([stats, stats])
+    flags = ((stats[:, 0] > 0) * COPLAY_PARTNER + (stats[:, 1] > 0) * COPLAY_OPPONENT + stats[:, 2] * COPLAY_CREW).astype(np.int8)
+    weight = stats[:, 0] * 2 + stats[:, 1] + stats[:, 2]
+
+    # Group by source node, strongest edges first within each row
+    order = np.lexsort((-weight, src))
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+
+    keys = [None] * n
+    for key, i in node_index.items():
+        keys[i] = key
+
+    return CoplayGraph(
+        keys=keys,
+        names=names,
+        indptr=indptr,
+        indices=dst[order].astype(np.int32),
+        partner_counts=stats[order, 0].astype(np.int32),
+        opponent_counts=stats[order, 1].astype(np.int32),
+        flags=flags[order],
+        built_at=built_at
+    )
+
+
+async def _load_coplay_crews() -> List[List[tuple]]:
+    """Crew member lists as (identity key, display name) tuples."""
+    memberships = await db.crew_members.find({}, {"_id": 0, "crew_id": 1, "player_id": 1}).to_list(None)
+    player_ids = list({m['player_id'] for m in memberships})
+    players = await db.players.find(
+        {"id": {"$in": player_ids}},
+        {"_id": 0, "id": 1, "name": 1, "normalized_name": 1}
+    ).to_list(None)
+    identity_by_id = {
+        p['id']: (p.get('normalized_name') or normalize_name(p['name']), p['name'])
+        for p in players if p.get('name')
+    }
+
+    crews = {}
+    for membership in memberships:
+        identity = identity_by_id.get(membership['player_id'])
+        if identity:
+            crews.setdefault(membership['crew_id'], []).append(identity)
+    return list(crews.values())
+
+
+async def rebuild_coplay_graph() -> dict:
+    """Rebuild the co-play graph from match_pairs and crews, persist it, and invalidate loaded copies."""
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc).isoformat()
+    pairs = await db.match_pairs.find(
+        {},
+        {"_id": 0, "player_a": 1, "player_b": 1, "name_a": 1, "name_b": 1, "relation": 1, "matches": 1}
+    ).to_list(None)
+    graph = build_coplay_graph(pairs, await _load_coplay_crews(), now)
+
+    await db.coplay_graph.replace_one(
+        {"name": "current"},
+        {
+            "name": "current",
+            "built_at": now,
+            "node_count": len(graph.keys),
+            "edge_count": graph.edge_count,
+            "keys": graph.keys,
+            "names": graph.names,
+            "indptr": Binary(graph.indptr.tobytes()),
+            "indices": Binary(graph.indices.tobytes()),
+            "partner_counts": Binary(graph.partner_counts.tobytes()),
+            "opponent_counts": Binary(graph.opponent_counts.tobytes()),
+            "flags": Binary(graph.flags.tobytes())
+        },
+        upsert=True
+    )
+    generation = await bump_generation("coplay_graph")
+    _coplay_graph_cache.set("current", generation, graph)
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Co-play graph rebuilt: {len(graph.keys)} players, {graph.edge_count} edges in {elapsed:.2f}s")
+    return {"nodes": len(graph.keys), "edges": graph.edge_count, "built_at": now}
+
+
+# The loaded graph, valid for one "coplay_graph" generation
+_coplay_graph_cache = VersionedCache(max_entries=1)
+
+
+async def get_coplay_graph() -> CoplayGraph:
+    """The current co-play graph, loaded from its persisted arrays (or built if none exist yet)."""
+    generation = await get_generation("coplay_graph")
+    graph = _coplay_graph_cache.get("current", generation)
+    if graph is not None:
+        return graph
+
+    doc = await db.coplay_graph.find_one({"name": "current"}, {"_id": 0})
+    if not doc:
+        await rebuild_coplay_graph()
+        return _coplay_graph_cache.get("current", await get_generation("coplay_graph"))
+
+    graph = CoplayGraph(
+        keys=doc['keys'],
+        names=doc['names'],
+        indptr=np.frombuffer(doc['indptr'], dtype=np.int64),
+        indices=np.frombuffer(doc['indices'], dtype=np.int32),
+        partner_counts=np.frombuffer(doc['partner_counts'], dtype=np.int32),
+        opponent_counts=np.frombuffer(doc['opponent_counts'], dtype=np.int32),
+        flags=np.frombuffer(doc['flags'], dtype=np.int8),
+        built_at=doc['built_at']
+    )
+    _coplay_graph_cache.set("current", generation, graph)
+    return graph
+
+
+def _coplay_relations(flags: int) -> List[str]:
+    return [name for bit, name in ((COPLAY_PARTNER, "partner"), (COPLAY_OPPONENT, "opponent"), (COPLAY_CREW, "crew")) if flags & bit]
+
+
+async def _registered_ids_by_key(keys: List[str]) -> dict:
+    """Map identity keys to registered player ids in one indexed query."""
+    registered = await db.players.find(
+        {'normalized_name': {'$in': keys}, 'profile_complete': True},
+        {'_id': 0, 'id': 1, 'normalized_name': 1}
+    ).to_list(len(keys) or 1)
+    return {p['normalized_name']: p['id'] for p in registered}
+
+
+async def _coplay_start_node(player_id: str) -> tuple:
+    player = await db.players.find_one({'id': player_id}, {'_id': 0})
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+    graph = await get_coplay_graph()
+    return player, graph, graph.node_index.get(await get_player_identity_key(player))
+
+
+@api_router.get("/players/{player_id}/network")
+async def get_player_network(
+    player_id: str,
+    hops: int = 2,
+    max_degree: int = 15,
+    limit: int = 100,
+    current_player: dict = Depends(get_current_player)
+):
+    """
+    Players within `hops` of a player in the co-play graph (partners, opponents, crew-mates),
+    following only each player's `max_degree` strongest connections.
+    """
+    hops = max(1, min(hops, 3))
+    max_degree = max(1, min(max_degree, 50))
+    player, graph, start = await _coplay_start_node(player_id)
+    if start is None:
+        return {"player_name": player.get('name'), "players": [], "built_at": graph.built_at}
+
+    reached = graph.neighbourhood(start, hops, max_degree)
+    ranked = sorted(reached.items(), key=lambda item: item[1][0])[:min(limit, 500)]
+
+    direct = graph.edges(start)
+    direct_flags = dict(zip(graph.indices[direct].tolist(), graph.flags[direct].tolist()))
+    ids_by_key = await _registered_ids_by_key([graph.keys[node] for node, _ in ranked])
+
+    players = [{
+        "name": graph.names[node],
+        "player_id": ids_by_key.get(graph.keys[node]),
+        "hops": hop,
+        "via": graph.names[via] if hop > 1 else None,
+        "relations": _coplay_relations(direct_flags.get(node, 0))
+    } for node, (hop, via) in ranked]
+
+    return {"player_name": player.get('name'), "players": players, "built_at": graph.built_at}
+
+
+@api_router.get("/players/{player_id}/partners-of-partners")
+async def get_partners_of_partners(
+    player_id: str,
+    top_partners: int = 10,
+    limit: int = 20,
+    current_player: dict = Depends(get_current_player)
+):
+    """
+    Most frequent partners of a player's most frequent partners, excluding people
+    they already partner with. Good candidates for a new fourth.
+    """
+    player, graph, start = await _coplay_start_node(player_id)
+    if start is None:
+        return {"player_name": player.get('name'), "suggestions": [], "built_at": graph.built_at}
+
+    scores, shared = graph.partners_of_partners(start, max(1, min(top_partners, 50)))
+    limit = min(limit, 100)
+    candidates = np.flatnonzero(scores > 0)
+    best = candidates[np.argsort(-scores[candidates], kind='stable')[:limit]].tolist()
+    ids_by_key = await _registered_ids_by_key([graph.keys[node] for node in best])
+
+    suggestions = [{
+        "name": graph.names[node],
+        "player_id": ids_by_key.get(graph.keys[node]),
+        "score": float(scores[node]),
+        "shared_partners": int(shared[node])
+    } for node in best]
+
+    return {"player_name": player.get('name'), "suggestions": suggestions, "built_at": graph.built_at}
+
+
+@api_router.post("/admin/coplay-graph/rebuild")
+async def rebuild_coplay_graph_endpoint(current_player: dict = Depends(get_current_player)):
+    """Rebuild the co-play graph now (it is also rebuilt after every Tenniscores player sync)."""
+    return await rebuild_coplay_graph()
+
+
+# ==================== SYNC JOBS ====================
+#
+# Long-running crawls (GBPTA full sync, Tenniscores bulk player scrape) run as
+# background jobs persisted in `sync_jobs`. Each finished unit of work (a club
+# roster, a player page) is checkpointed in `sync_job_items`, so a cancelled,
+# failed or interrupted job resumes where it stopped instead of starting over.
+#
+# Job status lifecycle:
+#   queued -> running -> completed | failed | cancelled
+#   running -> cancelling -> cancelled   (cancel requested, runner stops at next item)
+#   running -> queued                    (heartbeat went stale, recovered by scheduler)
+#
+# Only one job of each type may be active at a time, across all workers and
+# replicas. The active job holds a lease in `sync_leases` (one document per job
+# type, renewed by every heartbeat, released when the job finishes). A trigger
+# that finds the lease held attaches to the in-flight job instead of starting
+# another crawl.
+
+SYNC_JOB_STALE_AFTER = timedelta(minutes=10)  # No heartbeat for this long = runner is dead
+SYNC_JOB_RESUMABLE_STATUSES = ["cancelled", "failed"]
+SYNC_JOB_FINAL_STATUSES = ["completed", "cancelled", "failed"]
+
+# In-process runner tasks, keyed by job id (keeps a reference so tasks aren't GC'd)
+_sync_job_tasks: dict = {}
+
+
+class SyncJobCancelled(Exception):
+    """Raised inside a job runner once a cancel has been requested for the job."""
+
+
+async def acquire_sync_lease(job_type: str, job_id: str) -> Optional[str]:
+    """
+    Take (or renew) the single-flight lease for a job type on behalf of job_id.
+    Returns None when job_id holds the lease, otherwise the id of the job that does.
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        await db.sync_leases.find_one_and_update(
+            {"name": job_type, "$or": [{"expires_at": {"$lt": now.isoformat()}}, {"job_id": job_id}]},
+            {"$set": {
+                "job_id": job_id,
+                "acquired_at": now.isoformat(),
+                "expires_at": (now + SYNC_JOB_STALE_AFTER).isoformat()
+            }},
+            upsert=True
+        )
+        return None
+    except DuplicateKeyError:
+        # Lease document exists, is unexpired and belongs to another job
+        lease = await db.sync_leases.find_one({"name": job_type}, {"_id": 0, "job_id": 1})
+        return lease['job_id'] if lease else None
+
+
+async def release_sync_lease(job_type: str, job_id: str):
+    await db.sync_leases.delete_one({"name": job_type, "job_id": job_id})
+
+
+async def active_sync_job_id(job_type: str) -> Optional[str]:
+    """Id of the in-flight job of this type (holding a live lease), or None."""
+    lease = await db.sync_leases.find_one(
+        {"name": job_type, "expires_at": {"$gt": datetime.now(timezone.utc).isoformat()}},
+        {"_id": 0, "job_id": 1}
+    )
+    return lease['job_id'] if lease else None
+
+
+async def ensure_sync_job_idle(job_type: str):
+    """Reject manual pipeline steps that would race an in-flight job over the same collections."""
+    job_id = await active_sync_job_id(job_type)
+    if job_id:
+        raise HTTPException(
+            status_code=409,
+            detail=f"A {job_type} job is in progress ({job_id}). Try again when it finishes."
+        )
+
+
+async def enqueue_sync_job(job_type: str, created_by: Optional[str] = None) -> tuple:
     """
+    Create a queued sync job, unless one of this type is already in flight.
+    Returns (job, created): created is False when the caller was attached to the active job.
+    Does not start the job.
+    """
+    if job_type not in SYNC_JOB_RUNNERS:
+        raise ValueError(f"Unknown sync job type: {job_type}")
+
+    job_id = str(uuid.uuid4())
+    holder_id = await acquire_sync_lease(job_type, job_id)
+    if holder_id:
+        active = await db.sync_jobs.find_one({"id": holder_id}, {"_id": 0})
+        if active and active['status'] not in SYNC_JOB_FINAL_STATUSES:
+            logger.info(f"Sync job {job_type} already in flight ({holder_id}); attaching")
+            return active, False
+        # Lease left behind by a job that already finished; take it over
+        await release_sync_lease(job_type, holder_id)
+        return await enqueue_sync_job(job_type, created_by)
+
+    now = datetime.now(timezone.utc).isoformat()
+    job = {
+        "id": job_id,
+        "type": job_type,
+        "status": "queued",
+        "progress": {"total": 0, "completed": 0, "errors": 0},
+        "checkpoint": {},
+        "result": None,
+        "error": None,
+        "created_by": created_by,
+        "created_at": now,
+        "updated_at": now,
+        "heartbeat_at": now,
+        "started_at": None,
+        "finished_at": None
+    }
+    await db.sync_jobs.insert_one(job)
+    job.pop('_id', None)
+    return job, True
+
+
+async def trigger_sync_job(job_type: str, created_by: Optional[str] = None) -> tuple:
+    """Enqueue-or-attach a job and start it in the background. Returns (job, created)."""
+    job, created = await enqueue_sync_job(job_type, created_by)
+    if created:
+        start_sync_job(job['id'])
+    return job, created
+
+
+async def run_sync_job_inline(job_type: str, created_by: Optional[str] = None) -> Optional[dict]:
+    """Enqueue-or-attach a job and wait for it to finish. Returns the final job document."""
+    job, created = await enqueue_sync_job(job_type, created_by)
+    if created:
+        return await run_sync_job(job['id'])
+    return await wait_for_sync_job(job['id'])
+
+
+async def wait_for_sync_job(job_id: str, poll_seconds: float = 2.0) -> Optional[dict]:
+    """Wait until a job (run by this or any other process) reaches a final status."""
+    task = _sync_job_tasks.get(job_id)
+    if task:
+        await asyncio.shield(task)
+    while True:
+        job = await db.sync_jobs.find_one({"id": job_id}, {"_id": 0})
+        if not job or job['status'] in SYNC_JOB_FINAL_STATUSES:
+            return job
+        await asyncio.sleep(poll_seconds)
+
+
+def start_sync_job(job_id: str):
+    """Run a queued job in the background of this process."""
+    task = asyncio.create_task(run_sync_job(job_id))
+    _sync_job_tasks[job_id] = task
+    task.add_done_callback(lambda _: _sync_job_tasks.pop(job_id, None))
+
+
+async def run_sync_job(job_id: str) -> Optional[dict]:
+    """
+    Claim a queued job and run it to completion.
+    Returns the final job document, or None if another runner already claimed it.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    job = await db.sync_jobs.find_one_and_update(
+        {"id": job_id, "status": "queued"},
+        {"$set": {"status": "running", "started_at": now, "heartbeat_at": now, "updated_at": now, "error": None}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not job:
+        return None
+
+    job_type = job['type']
+    runner = SYNC_JOB_RUNNERS[job_type]
+    logger.info(f"Sync job {job_id} ({job_type}) started")
+
+    final = {"status": "completed"}
+    try:
+        final["result"] = await runner(job)
+    except SyncJobCancelled:
+        final = {"status": "cancelled"}
+        logger.info(f"Sync job {job_id} ({job_type}) cancelled")
+    except Exception as e:
+        final = {"status": "failed", "error": str(e)}
+        logger.error(f"Sync job {job_id} ({job_type}) failed: {e}")
+
+    now = datetime.now(timezone.utc).isoformat()
+    final.update({"finished_at": now, "updated_at": now, "heartbeat_at": now})
+    job = await db.sync_jobs.find_one_and_update(
+        {"id": job_id},
+        {"$set": final},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    # The job document may have been removed mid-run; the lease is still ours to release
+    await release_sync_lease(job_type, job_id)
+    logger.info(f"Sync job {job_id} finished: {final['status']} {job.get('progress') if job else ''}")
+    return job
+
+
+async def sync_job_heartbeat(job_id: str, inc: Optional[dict] = None, fields: Optional[dict] = None):
+    """
+    Persist job progress and refresh its heartbeat.
+    Raises SyncJobCancelled if a cancel was requested, so runners stop at the next item.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    update = {"$set": {"heartbeat_at": now, "updated_at": now, **(fields or {})}}
+    if inc:
+        update["$inc"] = {f"progress.{k}": v for k, v in inc.items()}
+
+    job = await db.sync_jobs.find_one_and_update(
+        {"id": job_id},
+        update,
+        projection={"_id": 0, "status": 1, "type": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if not job:
+        return
+    if job.get('status') == 'cancelling':
+        raise SyncJobCancelled()
+
+    # Renew the single-flight lease; losing it means another runner took over
+    if await acquire_sync_lease(job['type'], job_id):
+        raise RuntimeError("Sync lease lost to another job")
+
+
+async def mark_sync_job_item(job_id: str, key: str, item_status: str, error: Optional[str] = None):
+    """Checkpoint one unit of work (done or error) for a job."""
+    await db.sync_job_items.update_one(
+        {"job_id": job_id, "key": key},
+        {"$set": {"status": item_status, "error": error, "updated_at": datetime.now(timezone.utc).isoformat()}},
+        upsert=True
+    )
+
+
+async def get_completed_sync_job_items(job_id: str) -> set:
+    """Keys of items a job has already finished successfully (skipped on resume)."""
+    items = await db.sync_job_items.find(
+        {"job_id": job_id, "status": "done"},
+        {"_id": 0, "key": 1}
+    ).to_list(10000)
+    return {item['key'] for item in items}
+
+
+async def recover_stale_sync_jobs():
+    """
+    Re-queue and resume running jobs whose heartbeat went stale (process restarted or crashed).
+    The status flip is atomic, so only one worker/replica resumes each job.
+    Runs on a scheduler interval.
+    """
+    cutoff = (datetime.now(timezone.utc) - SYNC_JOB_STALE_AFTER).isoformat()
+    while True:
+        job = await db.sync_jobs.find_one_and_update(
+            {"status": {"$in": ["running", "cancelling"]}, "heartbeat_at": {"$lt": cutoff}},
+            [{"$set": {
+                "status": {"$cond": [{"$eq": ["$status", "cancelling"]}, "cancelled", "queued"]},
+                "updated_at": datetime.now(timezone.utc).isoformat()
+            }}],
+            projection={"_id": 0, "id": 1, "type": 1, "status": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if not job:
+            break
+        if job['status'] != 'queued':
+            await release_sync_lease(job['type'], job['id'])
+            continue
+        if await acquire_sync_lease(job['type'], job['id']):
+            await db.sync_jobs.update_one(
+                {"id": job['id']},
+                {"$set": {"status": "failed", "error": "Superseded by a newer job"}}
+            )
+            continue
+        logger.warning(f"Resuming stale sync job {job['id']} ({job['type']})")
+        start_sync_job(job['id'])
+
+
+async def _run_tenniscores_players_job(job: dict) -> dict:
+    """
+    Scrape every Tenniscores player page with concurrent workers.
+    Each player is checkpointed by normalized name; resumed runs skip finished players.
+    """
+    job_id = job['id']
+    checkpoint = job.get('checkpoint') or {}
+    now = checkpoint.get('scraped_at') or datetime.now(timezone.utc).isoformat()
+
+    all_players = await db.tenniscores_players.find(
+        {'profile_url': {'$exists': True, '$ne': None}},
+        {'_id': 0}
+    ).to_list(10000)
+
+    done = await get_completed_sync_job_items(job_id)
+    pending = [p for p in all_players if _tenniscores_job_key(p) not in done]
+
+    await sync_job_heartbeat(job_id, fields={
+        "checkpoint.scraped_at": now,
+        "progress.total": len(all_players),
+        "progress.completed": len(all_players) - len(pending),
+        "progress.errors": 0
+    })
+    logger.info(f"Tenniscores bulk scrape: {len(pending)}/{len(all_players)} players pending, {TENNISCORES_SCRAPE_WORKERS} workers")
+
+    semaphore = asyncio.Semaphore(TENNISCORES_SCRAPE_WORKERS)
+    stop = asyncio.Event()
+
+    async def scrape(ts_player: dict):
+        async with semaphore:
+            if stop.is_set():
+                return
+            key = _tenniscores_job_key(ts_player)
+            success = await _scrape_single_tenniscores_player(ts_player, now)
+            await mark_sync_job_item(job_id, key, "done" if success else "error")
+            try:
+                await sync_job_heartbeat(job_id, inc={"completed" if success else "errors": 1})
+            except SyncJobCancelled:
+                stop.set()
+
+    await asyncio.gather(*(scrape(p) for p in pending))
+    if stop.is_set():
+        raise SyncJobCancelled()
+
+    job = await db.sync_jobs.find_one({"id": job_id}, {"_id": 0, "progress": 1})
+    progress = job['progress']
+    return {
+        "total": progress['total'],
+        "scraped": progress['completed'],
+        "errors": progress['errors'],
+        "coplay_graph": await rebuild_coplay_graph()
+    }
+
+
+def _tenniscores_job_key(ts_player: dict) -> str:
+    return ts_player.get('normalized_name') or normalize_name(ts_player.get('name', ''))
+
+
+async def _save_gbpta_checkpoint(job_id: str, step: str, results: dict):
+    await sync_job_heartbeat(job_id, fields={"checkpoint.step": step, "checkpoint.results": results})
+
+
+async def _run_gbpta_sync_job(job: dict) -> dict:
+    """
+    GBPTA full sync pipeline, checkpointed per step and per club roster:
+    1. Scrape clubs from standings page
+    2. Scrape rosters from all club pages (one checkpoint per club)
+    3. Deduplicate players into pti_roster
+    4. Record PTI history
+    5. Rebuild player identities (roster ids)
+    """
+    job_id = job['id']
+    checkpoint = job.get('checkpoint') or {}
+    step = checkpoint.get('step', 'clubs')
+    results = checkpoint.get('results', {})
+    now = checkpoint.get('started_at')
+    if not now:
+        now = datetime.now(timezone.utc).isoformat()
+        await sync_job_heartbeat(job_id, fields={"checkpoint.started_at": now})
+
+    if step == 'clubs':
+        logger.info("GBPTA sync - Step 1: Scraping clubs")
+        html = await fetch_html(GBPTA_STANDINGS_URL)
+        club_data = parse_gbpta_standings(html)
+
+        club_write = await upsert_gbpta_clubs(club_data, now)
+        results['clubs'] = {
+            "inserted": club_write['upserted'],
+            "updated": club_write['matched'],
+            "total": len(club_data),
+            "rows_per_second": club_write['rows_per_second']
+        }
+
+        # Raw roster entries from previous runs are replaced by this run's per-club inserts
+        await db.pti_roster_raw.delete_many({})
+        step = 'rosters'
+        await _save_gbpta_checkpoint(job_id, step, results)
+
+    if step == 'rosters':
+        logger.info("GBPTA sync - Step 2: Scraping rosters")
+        clubs = await db.clubs.find({}, {"_id": 0}).to_list(1000)
+        done = await get_completed_sync_job_items(job_id)
+        await sync_job_heartbeat(job_id, fields={
+            "progress.total": len(clubs),
+            "progress.completed": len([c for c in clubs if c['id'] in done]),
+            "progress.errors": 0
+        })
+
+        async with httpx.AsyncClient(timeout=30.0, headers=SCRAPER_HEADERS, follow_redirects=True) as client:
+            for club in clubs:
+                if club['id'] in done:
+                    continue
+                try:
+                    resolved_club = await resolve_club_name(club['name'])
+                    response = await client.get(club['roster_url'])
+                    response.raise_for_status()
+                    players = parse_roster_page(response.text, resolved_club)
+                    for player in players:
+                        player['id'] = str(uuid.uuid4())
+                        player['job_id'] = job_id
+                        player['club_id'] = club['id']
+                        player['scraped_at'] = now
+
+                    # Replace any partial insert from an interrupted attempt at this club
+                    await db.pti_roster_raw.delete_many({"job_id": job_id, "club_id": club['id']})
+                    if players:
+                        await db.pti_roster_raw.insert_many(players)
+                    await mark_sync_job_item(job_id, club['id'], "done")
+                    await sync_job_heartbeat(job_id, inc={"completed": 1})
+                except SyncJobCancelled:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error scraping roster for {club['name']}: {e}")
+                    await mark_sync_job_item(job_id, club['id'], "error", str(e))
+                    await sync_job_heartbeat(job_id, inc={"errors": 1})
+
+        job = await db.sync_jobs.find_one({"id": job_id}, {"_id": 0, "progress": 1})
+        players_found = await db.pti_roster_raw.count_documents({"job_id": job_id})
+        results['rosters'] = {"players_found": players_found, "errors": job['progress']['errors']}
+        step = 'dedupe'
+        await _save_gbpta_checkpoint(job_id, step, results)
+
+    if step == 'dedupe':
+        logger.info("GBPTA sync - Step 3: Deduplicating")
+        raw_entries = await db.pti_roster_raw.find({"job_id": job_id}, {"_id": 0}).to_list(10000)
+        player_map = {}
+
+        for entry in raw_entries:
+            name = normalize_name(entry.get('player_name', ''))
+            if not name:
+                continue
+            if name not in player_map:
+                player_map[name] = {
+                    'player_name': entry['player_name'],
+                    'pti_value': entry.get('pti_value'),
+                    'clubs': [],
+                    'profile_source_url': entry.get('profile_source_url'),
+                    'profile_image_url': None
+                }
+            club = entry.get('club')
+            if club and club not in player_map[name]['clubs']:
+                player_map[name]['clubs'].append(club)
+            if entry.get('pti_value') is not None:
+                player_map[name]['pti_value'] = entry['pti_value']
+
+        deduped_entries = []
+        for normalized_name, data in player_map.items():
+            deduped_entries.append({
+                'id': str(uuid.uuid4()),
+                'player_name': data['player_name'],
+                'normalized_name': normalized_name,
+                'pti_value': data['pti_value'],
+                'clubs': data['clubs'],
+                'profile_image_url': data['profile_image_url'],
+                'profile_source_url': data['profile_source_url'],
+                'scraped_at': now
+            })
+
+        # Never wipe the live roster because every roster fetch failed
+        if deduped_entries:
+            await db.pti_roster.delete_many({})
+            await db.pti_roster.insert_many(deduped_entries)
+
+        results['deduplication'] = {"unique_players": len(deduped_entries)}
+        step = 'history'
+        await _save_gbpta_checkpoint(job_id, step, results)
+
+    if step == 'history':
+        logger.info("GBPTA sync - Step 4: Recording PTI history")
+        roster = await db.pti_roster.find(
+            {"scraped_at": now, "pti_value": {"$ne": None}},
+            {"_id": 0, "player_name": 1, "pti_value": 1}
+        ).to_list(10000)
+        history_entries = [{
+            'id': str(uuid.uuid4()),
+            'player_name': normalize_name(entry['player_name']),
+            'pti_value': entry['pti_value'],
+            'recorded_at': now,
+            'recorded_at_utc': utc_datetime(now)
+        } for entry in roster]
+
+        # Idempotent on resume: this run's snapshot is keyed by its start timestamp
+        await db.pti_history.delete_many({"recorded_at": now})
+        if history_entries:
+            await db.pti_history.insert_many(history_entries)
+
+        results['pti_history'] = {"records_added": len(history_entries)}
+        step = 'identities'
+        await _save_gbpta_checkpoint(job_id, step, results)
+
+    if step == 'identities':
+        logger.info("GBPTA sync - Step 5: Rebuilding player identities")
+        results['identities'] = await rebuild_player_identities()
+        results['club_summaries'] = await rebuild_club_summaries()
+        await _save_gbpta_checkpoint(job_id, 'done', results)
+
+    logger.info(f"GBPTA full sync complete: {results}")
+    return results
+
+
+SYNC_JOB_RUNNERS = {
+    "gbpta_full_sync": _run_gbpta_sync_job,
+    "tenniscores_rankings": _run_tenniscores_rankings_job,
+    "tenniscores_players": _run_tenniscores_players_job,
+    "partner_stats_rebuild": _run_partner_stats_rebuild_job,
+}
+
+
+@api_router.get("/admin/jobs")
+async def list_sync_jobs(
+    job_type: Optional[str] = None,
+    limit: int = 20,
+    current_player: dict = Depends(get_current_player)
+):
+    """List recent sync jobs, newest first, optionally filtered by type"""
     query = {}
-    if league:
-        query["league"] = league
+    if job_type:
+        query["type"] = job_type
+
+    jobs = await db.sync_jobs.find(query, {"_id": 0}).sort("created_at", -1).to_list(min(limit, 100))
+    return {"jobs": jobs, "total": len(jobs)}
+
+
+@api_router.get("/admin/jobs/{job_id}")
+async def get_sync_job(job_id: str, current_player: dict = Depends(get_current_player)):
+    """Get a sync job's status, progress counts and (when finished) result"""
+    job = await db.sync_jobs.find_one({"id": job_id}, {"_id": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@api_router.post("/admin/jobs/{job_id}/cancel")
+async def cancel_sync_job(job_id: str, current_player: dict = Depends(get_current_player)):
+    """
+    Request cancellation of a sync job.
+    A running job stops after its in-flight items finish; checkpoints are kept so it can be resumed.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    job = await db.sync_jobs.find_one_and_update(
+        {"id": job_id, "status": {"$in": ["queued", "running"]}},
+        [{"$set": {
+            "status": {"$cond": [{"$eq": ["$status", "queued"]}, "cancelled", "cancelling"]},
+            "updated_at": now
+        }}],
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not job:
+        existing = await db.sync_jobs.find_one({"id": job_id}, {"_id": 0, "status": 1})
+        if not existing:
+            raise HTTPException(status_code=404, detail="Job not found")
+        raise HTTPException(status_code=400, detail=f"Job is already {existing['status']}")
+
+    if job['status'] == 'cancelled':
+        await release_sync_lease(job['type'], job_id)
+
+    return {"message": "Cancellation requested", "job_id": job_id, "status": job['status']}
+
+
+@api_router.post("/admin/jobs/{job_id}/resume", status_code=202)
+async def resume_sync_job(job_id: str, current_player: dict = Depends(get_current_player)):
+    """Resume a cancelled or failed sync job from its last checkpoint"""
+    existing = await db.sync_jobs.find_one({"id": job_id}, {"_id": 0, "type": 1, "status": 1})
+    if not existing:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if existing['status'] not in SYNC_JOB_RESUMABLE_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Cannot resume a job that is {existing['status']}")
+
+    holder_id = await acquire_sync_lease(existing['type'], job_id)
+    if holder_id:
+        raise HTTPException(status_code=409, detail=f"Another {existing['type']} job is in flight: {holder_id}")
+
+    job = await db.sync_jobs.find_one_and_update(
+        {"id": job_id, "status": {"$in": SYNC_JOB_RESUMABLE_STATUSES}},
+        {"$set": {"status": "queued", "finished_at": None, "updated_at": datetime.now(timezone.utc).isoformat()}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not job:
+        await release_sync_lease(existing['type'], job_id)
+        raise HTTPException(status_code=409, detail="Job status changed; try again")
+
+    start_sync_job(job_id)
+    return {"message": "Job resumed", "job_id": job_id, "status": job['status'], "progress": job['progress']}
 
-    clubs = await db.clubs.find(query, {"_id": 0}).to_list(1000)
 
-    # Add member counts from pti_roster
+# ==================== CLUB SUMMARIES ====================
+
+PTI_BUCKET_WIDTH = 5  # club PTI distribution histogram bucket size
+
+
+def profile_clubs(player: Optional[dict]) -> set:
+    """Clubs named on a player's profile, complete or not (profile_count, club listings)."""
+    if not player:
+        return set()
+    clubs = {player.get('home_club'), *(player.get('other_clubs') or [])}
+    clubs.discard(None)
+    clubs.discard("")
+    return clubs
+
+
+def registered_clubs(player: Optional[dict]) -> set:
+    """Clubs a player counts toward in registered_count (completed profiles only)."""
+    if not player or not player.get('profile_complete'):
+        return set()
+    return profile_clubs(player)
+
+
+async def _club_roster_stats() -> dict:
+    """Per-club pti_roster member_count and PTI distribution in one $group aggregation."""
+    # pti_value is a number or null; null and missing both sort below numbers
+    numeric_pti = {"$gt": ["$pti_value", None]}
+    pipeline = [
+        {"$unwind": "$clubs"},
+        {"$match": {"clubs": {"$nin": [None, ""]}}},
+        {"$group": {
+            "_id": {
+                "club": "$clubs",
+                "bucket": {"$cond": [
+                    numeric_pti,
+                    {"$multiply": [{"$floor": {"$divide": ["$pti_value", PTI_BUCKET_WIDTH]}}, PTI_BUCKET_WIDTH]},
+                    None
+                ]}
+            },
+            "count": {"$sum": 1},
+            "pti_min": {"$min": "$pti_value"},
+            "pti_max": {"$max": "$pti_value"},
+            "pti_sum": {"$sum": "$pti_value"},
+        }},
+    ]
+    stats = {}
+    async for row in db.pti_roster.aggregate(pipeline):
+        club, bucket = row["_id"]["club"], row["_id"]["bucket"]
+        entry = stats.setdefault(club, {"member_count": 0, "pti_count": 0, "pti_sum": 0.0, "min": None, "max": None, "buckets": []})
+        entry["member_count"] += row["count"]
+        if bucket is None:
+            continue
+        entry["pti_count"] += row["count"]
+        entry["pti_sum"] += row["pti_sum"]
+        entry["min"] = row["pti_min"] if entry["min"] is None else min(entry["min"], row["pti_min"])
+        entry["max"] = row["pti_max"] if entry["max"] is None else max(entry["max"], row["pti_max"])
+        entry["buckets"].append({"from": bucket, "count": row["count"]})
+    return stats
+
+
+async def _club_player_counts() -> tuple:
+    """
+    Per-club (profile, registered) counts in one $group aggregation: every profile with it
+    as home or other club, and the completed ones among them.
+    """
+    pipeline = [
+        {"$project": {
+            "profile_complete": 1,
+            # $setUnion dedupes a home club that is also listed in other_clubs
+            "clubs": {"$setUnion": [
+                ["$home_club"],
+                {"$cond": [{"$isArray": "$other_clubs"}, "$other_clubs", []]}
+            ]}
+        }},
+        {"$unwind": "$clubs"},
+        {"$match": {"clubs": {"$nin": [None, ""]}}},
+        {"$group": {
+            "_id": "$clubs",
+            "profiles": {"$sum": 1},
+            "registered": {"$sum": {"$cond": [{"$eq": ["$profile_complete", True]}, 1, 0]}},
+        }},
+    ]
+    profiles, registered = {}, {}
+    async for row in db.players.aggregate(pipeline):
+        profiles[row["_id"]] = row["profiles"]
+        if row["registered"]:
+            registered[row["_id"]] = row["registered"]
+    return profiles, registered
+
+
+async def rebuild_club_summaries() -> dict:
+    """
+    Recompute club_summaries: one document per club with its teams, league, divisions,
+    roster/profile/registered counts and PTI distribution. Run after the GBPTA sync;
+    profile edits keep the player counts current in between via adjust_club_summaries.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    roster = await _club_roster_stats()
+    profiles, registered = await _club_player_counts()
+    teams = await db.clubs.find({}, {"_id": 0}).sort("name", 1).to_list(1000)
+
+    teams_by_club = {}
+    for team in teams:
+        teams_by_club.setdefault(team.get('club_name') or team['name'], []).append(team)
+
+    ops = []
+    names = set(roster) | set(profiles) | set(teams_by_club)
+    for name in names:
+        club_teams = teams_by_club.get(name, [])
+        stats = roster.get(name, {})
+        pti = None
+        if stats.get("pti_count"):
+            pti = {
+                "min": stats["min"],
+                "max": stats["max"],
+                "avg": round(stats["pti_sum"] / stats["pti_count"], 1),
+                "buckets": sorted(stats["buckets"], key=lambda b: b["from"])
+            }
+        # $set rather than replace so membership_version keeps counting up across rebuilds
+        ops.append(UpdateOne({"name": name}, {"$set": {
+            "league": next((t['league'] for t in club_teams if t.get('league')), ""),
+            "divisions": sorted({t['division'] for t in club_teams if t.get('division')}),
+            "teams": club_teams,
+            "member_count": stats.get("member_count", 0),
+            "profile_count": profiles.get(name, 0),
+            "registered_count": registered.get(name, 0),
+            "pti": pti,
+            "updated_at": now
+        }}, upsert=True))
+
+    write = await bulk_write_batched(db.club_summaries, ops, "club_summaries")
+    removed = await db.club_summaries.delete_many({"name": {"$nin": list(names)}})
+    # Roster or team data changed: invalidates every cached club roster
+    await bump_generation("club_roster")
+    await rebuild_club_vocabulary(
+        {name: stats["member_count"] for name, stats in roster.items()},
+        profiles
+    )
+    return {"clubs": len(names), "upserted": write['upserted'], "removed": removed.deleted_count}
+
+
+async def adjust_club_summaries(before: Optional[dict], after: Optional[dict]):
+    """
+    Move a player's profile_count and registered_count contributions from the clubs on
+    the `before` profile to those on the `after` one. Every club involved gets its
+    membership_version bumped, since cached club rosters show the member's name, PTI and image.
+    """
+    profile_before, profile_after = profile_clubs(before), profile_clubs(after)
+    registered_before, registered_after = registered_clubs(before), registered_clubs(after)
+    clubs = profile_before | profile_after
+    if not clubs:
+        return
+
+    now = datetime.now(timezone.utc).isoformat()
+    ops = []
     for club in clubs:
-        # Count players who have this club in their clubs array
-        member_count = await db.pti_roster.count_documents({"clubs": club['name']})
-        club['member_count'] = member_count
+        inc = {"membership_version": 1}
+        profile_delta = (club in profile_after) - (club in profile_before)
+        registered_delta = (club in registered_after) - (club in registered_before)
+        if profile_delta:
+            inc["profile_count"] = profile_delta
+        if registered_delta:
+            inc["registered_count"] = registered_delta
+        if club in profile_after - profile_before:
+            defaults = {"league": "", "divisions": [], "teams": [], "member_count": 0, "pti": None}
+            if "registered_count" not in inc:
+                defaults["registered_count"] = 0
+            ops.append(UpdateOne(
+                {"name": club},
+                {"$inc": inc, "$set": {"updated_at": now}, "$setOnInsert": defaults},
+                upsert=True
+            ))
+        else:
+            ops.append(UpdateOne({"name": club}, {"$inc": inc, "$set": {"updated_at": now}}))
+    await db.club_summaries.bulk_write(ops, ordered=False)
+
+    # Player-entered clubs with no roster, teams or profiles left drop out of listings
+    removed = profile_before - profile_after
+    if removed:
+        await db.club_summaries.delete_many({
+            "name": {"$in": list(removed)},
+            "profile_count": {"$lte": 0},
+            "registered_count": {"$lte": 0},
+            "member_count": 0,
+            "teams": {"$size": 0}
+        })
+    await adjust_club_vocabulary(profile_after - profile_before, removed)
 
-        # Count registered app users with this as home_club
-        registered_count = await db.players.count_documents({
-            "profile_complete": True,
-            "$or": [
-                {"home_club": club['name']},
-                {"other_clubs": club['name']}
-            ]
+
+# club_vocabulary: one document per known club name with reference counts
+#   {name, official, player_refs, roster_refs, updated_at}
+# player_refs counts profiles naming the club (complete or not), roster_refs pti_roster entries.
+# It is rebuilt with the club summaries and adjusted on profile writes; each change bumps
+# the "club_vocabulary" generation, which reloads the in-process copy and changes the ETag.
+
+class ClubVocabulary:
+    """In-process copy of club_vocabulary with the sorted lists the autocomplete endpoints serve."""
+
+    def __init__(self, generation: int, entries: List[dict]):
+        self.generation = generation
+        self.refs = {e['name']: e for e in entries}
+        # Names seen on the roster or on profiles (/clubs/names)
+        self.names = sorted(n for n, e in self.refs.items() if e.get('roster_refs') or e.get('player_refs'))
+        # Official GBPTA names plus player-entered clubs (/clubs/suggestions)
+        self.suggestions = sorted(n for n, e in self.refs.items() if e.get('official') or e.get('player_refs'))
+        self.etag = f'"club-vocabulary-{generation}"'
+
+
+_club_vocabulary_cache = VersionedCache(max_entries=1)
+
+
+async def get_club_vocabulary() -> ClubVocabulary:
+    """The current club vocabulary, reloaded only when its generation has moved."""
+    generation = await get_generation("club_vocabulary")
+    vocabulary = _club_vocabulary_cache.get("current", generation)
+    if vocabulary is None:
+        entries = await db.club_vocabulary.find({}, {"_id": 0}).to_list(None)
+        vocabulary = ClubVocabulary(generation, entries)
+        _club_vocabulary_cache.set("current", generation, vocabulary)
+    return vocabulary
+
+
+async def rebuild_club_vocabulary(roster_refs: dict, player_refs: dict) -> int:
+    """Replace club_vocabulary from per-club roster and player counts plus the club directory."""
+    now = datetime.now(timezone.utc).isoformat()
+    official = {e['name'] for e in await db.club_directory.find({}, {"_id": 0, "name": 1}).to_list(100)}
+    names = set(roster_refs) | set(player_refs) | official
+    ops = [
+        UpdateOne({"name": name}, {"$set": {
+            "official": name in official,
+            "player_refs": player_refs.get(name, 0),
+            "roster_refs": roster_refs.get(name, 0),
+            "updated_at": now
+        }}, upsert=True)
+        for name in names
+    ]
+    await bulk_write_batched(db.club_vocabulary, ops, "club_vocabulary")
+    await db.club_vocabulary.delete_many({"name": {"$nin": list(names)}})
+    await bump_generation("club_vocabulary")
+    return len(names)
+
+
+async def adjust_club_vocabulary(added: set, removed: set):
+    """Apply one profile's club changes to the player_refs counts."""
+    if not added and not removed:
+        return
+
+    now = datetime.now(timezone.utc).isoformat()
+    ops = [
+        UpdateOne(
+            {"name": club},
+            {
+                "$inc": {"player_refs": 1},
+                "$set": {"updated_at": now},
+                "$setOnInsert": {"official": False, "roster_refs": 0}
+            },
+            upsert=True
+        )
+        for club in added
+    ]
+    ops += [
+        UpdateOne({"name": club}, {"$inc": {"player_refs": -1}, "$set": {"updated_at": now}})
+        for club in removed
+    ]
+    await db.club_vocabulary.bulk_write(ops, ordered=False)
+    if removed:
+        await db.club_vocabulary.delete_many({
+            "name": {"$in": list(removed)},
+            "player_refs": {"$lte": 0},
+            "roster_refs": 0,
+            "official": False
+        })
+    await bump_generation("club_vocabulary")
+
+
+def club_vocabulary_response(request: Request, vocabulary: ClubVocabulary, body: List[str]):
+    """Serve a vocabulary list with its ETag, or 304 when the client already has it."""
+    headers = {"ETag": vocabulary.etag, "Cache-Control": "private, max-age=60"}
+    if if_none_match(request, vocabulary.etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(body, headers=headers)
+
+
+@api_router.post("/admin/club-summaries/rebuild")
+async def rebuild_club_summaries_endpoint(current_player: dict = Depends(get_current_player)):
+    """Recompute the club_summaries view from pti_roster, players and teams."""
+    return await rebuild_club_summaries()
+
+
+@api_router.get("/admin/clubs/unresolved")
+async def unresolved_clubs_report(current_player: dict = Depends(get_current_player)):
+    """
+    Player-entered clubs that are not official GBPTA names, with the closest official
+    club and its confidence. would_resolve marks names the resolver now maps on save.
+    """
+    _, _, name_index = await load_club_lookup()
+    vocabulary = await get_club_vocabulary()
+
+    report = []
+    for name, entry in vocabulary.refs.items():
+        if entry.get('official') or not entry.get('player_refs'):
+            continue
+        suggestion = name_index.suggest(name)
+        report.append({
+            "name": name,
+            "player_refs": entry['player_refs'],
+            "suggested_name": suggestion[0] if suggestion else None,
+            "confidence": suggestion[1] if suggestion else None,
+            "would_resolve": bool(suggestion and suggestion[1] >= CLUB_MATCH_THRESHOLD)
         })
-        club['registered_count'] = registered_count
+
+    report.sort(key=lambda r: (-r['player_refs'], r['name']))
+    return {"threshold": CLUB_MATCH_THRESHOLD, "total": len(report), "clubs": report}
+
+
+# ==================== UTILITY ROUTES ====================
+
+@api_router.get("/clubs")
+async def list_clubs(
+    league: Optional[str] = None,
+    current_player: dict = Depends(get_current_player)
+):
+    """
+    List all clubs (teams) from GBPTA scraping.
+    Optionally filter by league (Metrowest, North Shore, Metrowest Women's Day League).
+    Returns teams with the member counts of the club they belong to (club_name).
+    """
+    query = {"teams.league": league} if league else {"teams.0": {"$exists": True}}
+    summaries = await db.club_summaries.find(
+        query, {"_id": 0, "teams": 1, "member_count": 1, "registered_count": 1}
+    ).to_list(1000)
+
+    clubs = [
+        {**team, "member_count": summary['member_count'], "registered_count": summary['registered_count']}
+        for summary in summaries
+        for team in summary['teams']
+        if not league or team.get('league') == league
+    ]
+    clubs.sort(key=lambda c: c['name'])
 
     return {
         "clubs": clubs,
@@ -3554,189 +6920,87 @@ async def list_clubs(
     }
 
 @api_router.get("/clubs/names")
-async def get_club_names(current_player: dict = Depends(get_current_player)):
-    """Get unique normalized club names from pti_roster"""
-    # Get distinct clubs from pti_roster (these are normalized)
-    pti_clubs = await db.pti_roster.distinct("clubs")
-
-    # Also get clubs from registered players
-    home_clubs = await db.players.distinct("home_club")
-    other_clubs_nested = await db.players.distinct("other_clubs")
-
-    # Combine all clubs
-    all_clubs = set()
-    for club in pti_clubs:
-        if club:
-            all_clubs.add(club)
-    for club in home_clubs:
-        if club:
-            all_clubs.add(club)
-    for clubs in other_clubs_nested:
-        if isinstance(clubs, list):
-            for club in clubs:
-                if club:
-                    all_clubs.add(club)
-        elif clubs:
-            all_clubs.add(clubs)
-
-    return sorted(list(all_clubs))
+async def get_club_names(request: Request, current_player: dict = Depends(get_current_player)):
+    """Get unique normalized club names from pti_roster and player profiles"""
+    vocabulary = await get_club_vocabulary()
+    return club_vocabulary_response(request, vocabulary, vocabulary.names)
 
 
 @api_router.get("/clubs/with-details")
 async def get_clubs_with_details(current_player: dict = Depends(get_current_player)):
     """
-    Get unique normalized club names with league/division info.
-    Maps normalized club names to their league/division from the clubs collection.
-    """
-    # Get distinct clubs from pti_roster (these are normalized)
-    pti_clubs = await db.pti_roster.distinct("clubs")
-
-    # Also get clubs from registered players
-    home_clubs = await db.players.distinct("home_club")
-    other_clubs_nested = await db.players.distinct("other_clubs")
-
-    # Combine all clubs
-    all_club_names = set()
-    for club in pti_clubs:
-        if club:
-            all_club_names.add(club)
-    for club in home_clubs:
-        if club:
-            all_club_names.add(club)
-    for clubs in other_clubs_nested:
-        if isinstance(clubs, list):
-            for club in clubs:
-                if club:
-                    all_club_names.add(club)
-        elif clubs:
-            all_club_names.add(clubs)
-
-    # Get all team entries from clubs collection to map league/division
-    team_entries = await db.clubs.find({}, {"_id": 0, "name": 1, "league": 1, "division": 1}).to_list(1000)
-
-    # Build a mapping from club name prefix to league/division
-    # Team names like "Cape Ann 1" map to club "Cape Ann"
-    club_to_league = {}
-    club_to_divisions = {}
-    for team in team_entries:
-        team_name = team.get('name', '')
-        league = team.get('league', '')
-        division = team.get('division', '')
-
-        # For each normalized club name, check if team name starts with it
-        for club_name in all_club_names:
-            if team_name.startswith(club_name):
-                # Store league (should be same for all teams of a club)
-                if club_name not in club_to_league and league:
-                    club_to_league[club_name] = league
-                # Collect all divisions for this club
-                if division:
-                    if club_name not in club_to_divisions:
-                        club_to_divisions[club_name] = set()
-                    club_to_divisions[club_name].add(division)
-
-    # Build result list with member counts
-    result = []
-    for club_name in sorted(all_club_names):
-        # Count players in pti_roster with this club
-        member_count = await db.pti_roster.count_documents({"clubs": club_name})
-
-        # Count registered app users with this club
-        registered_count = await db.players.count_documents({
-            "profile_complete": True,
-            "$or": [
-                {"home_club": club_name},
-                {"other_clubs": club_name}
-            ]
-        })
-
-        club_obj = {
-            "name": club_name,
-            "league": club_to_league.get(club_name, ""),
-            "divisions": sorted(list(club_to_divisions.get(club_name, set()))),
-            "member_count": member_count,
-            "registered_count": registered_count
-        }
-        result.append(club_obj)
-
-    return result
+    Get unique normalized club names with league/division info and member counts.
+    League/divisions come from the teams whose resolved club_name is that club.
+    """
+    return await db.club_summaries.find(
+        {"$or": [{"member_count": {"$gt": 0}}, {"profile_count": {"$gt": 0}}, {"registered_count": {"$gt": 0}}]},
+        {"_id": 0, "name": 1, "league": 1, "divisions": 1, "member_count": 1, "registered_count": 1, "pti": 1}
+    ).sort("name", 1).to_list(None)
 
 @api_router.get("/clubs/suggestions")
-async def get_club_suggestions(current_player: dict = Depends(get_current_player)):
+async def get_club_suggestions(request: Request, current_player: dict = Depends(get_current_player)):
     """Get known clubs for autocomplete — official GBPTA names plus any non-GBPTA player-entered clubs"""
-    # Official names from club directory
-    entries = await db.club_directory.find({}, {"_id": 0, "name": 1}).to_list(100)
-    official_names = {e["name"] for e in entries}
-    all_clubs = set(official_names)
-
-    # Add non-GBPTA player-entered clubs
-    home_clubs = await db.players.distinct("home_club")
-    other_clubs = await db.players.distinct("other_clubs")
-
-    for club in home_clubs:
-        if club:
-            all_clubs.add(club)
-    for clubs in other_clubs:
-        if isinstance(clubs, list):
-            for club in clubs:
-                if club:
-                    all_clubs.add(club)
-        elif clubs:
-            all_clubs.add(clubs)
+    vocabulary = await get_club_vocabulary()
+    return club_vocabulary_response(request, vocabulary, vocabulary.suggestions)
 
-    all_clubs.discard("")
+_club_roster_cache = VersionedCache(max_entries=200)
 
-    return sorted(list(all_clubs))
 
 @api_router.get("/clubs/{club_id}")
-async def get_club(club_id: str, current_player: dict = Depends(get_current_player)):
+async def get_club(
+    club_id: str,
+    request: Request,
+    response: Response,
+    current_player: dict = Depends(get_current_player)
+):
     """
     Get club details with full roster.
     Returns both scraped players and registered app users.
-    Supports both team names (e.g., "Cape Ann 1") and normalized club names (e.g., "Cape Ann").
+    Supports both team names (e.g., "Cape Ann 1") and normalized club names (e.g., "Cape Ann");
+    a team shows the roster of the club it resolves to.
+    Responses are cached per club_id and versioned by the club_roster generation plus the
+    club's membership_version; the strong ETag lets repeat views return 304.
     """
     decoded_id = club_id  # Already decoded by FastAPI
 
-    # First, try to find by team name in clubs collection
+    summary = await db.club_summaries.find_one(
+        {"$or": [{"name": decoded_id}, {"teams.id": decoded_id}, {"teams.name": decoded_id}]},
+        {"_id": 0, "name": 1, "membership_version": 1}
+    )
+    if not summary:
+        raise HTTPException(status_code=404, detail="Club not found")
+
+    version = (await get_generation("club_roster"), summary.get('membership_version', 0))
+    etag = '"' + hashlib.sha1(f"{decoded_id}|{version[0]}|{version[1]}".encode()).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    result = _club_roster_cache.get(decoded_id, version)
+    if result is None:
+        result = await build_club_roster(decoded_id, summary['name'])
+        _club_roster_cache.set(decoded_id, version, result)
+
+    response.headers.update(headers)
+    return result
+
+
+async def build_club_roster(decoded_id: str, club_name: str) -> dict:
+    """Club header plus the pti_roster members joined with registered app users, best PTI first."""
+    # A team entry is shown with its own header; otherwise build one from the club summary
     club = await db.clubs.find_one(
         {"$or": [{"id": decoded_id}, {"name": decoded_id}]},
         {"_id": 0}
     )
-
-    # If found in clubs collection (team entry), use that
-    if club:
-        club_name = club['name']
-    else:
-        # Try to find as a normalized club name in pti_roster
-        # Check if any player has this club in their clubs array
-        player_with_club = await db.pti_roster.find_one({"clubs": decoded_id})
-        if player_with_club:
-            # This is a normalized club name
-            club_name = decoded_id
-
-            # Find league/division from teams that start with this club name
-            team_entries = await db.clubs.find(
-                {},
-                {"_id": 0, "name": 1, "league": 1, "division": 1}
-            ).to_list(1000)
-
-            league = ""
-            divisions = set()
-            for team in team_entries:
-                if team.get('name', '').startswith(club_name):
-                    if not league and team.get('league'):
-                        league = team['league']
-                    if team.get('division'):
-                        divisions.add(team['division'])
-
-            # Construct a club object for normalized name
-            club = {
-                "name": club_name,
-                "league": league,
-                "division": ", ".join(sorted(divisions)) if divisions else ""
-            }
-        else:
-            raise HTTPException(status_code=404, detail="Club not found")
+    if not club:
+        summary = await db.club_summaries.find_one(
+            {"name": club_name}, {"_id": 0, "league": 1, "divisions": 1}
+        ) or {}
+        club = {
+            "name": club_name,
+            "league": summary.get('league', ""),
+            "division": ", ".join(summary.get('divisions', []))
+        }
 
     # Get all players from pti_roster who belong to this club
     roster_players = await db.pti_roster.find(
@@ -3753,7 +7017,7 @@ async def get_club(club_id: str, current_player: dict = Depends(get_current_play
                 {"other_clubs": club_name}
             ]
         },
-        {"_id": 0, "password_hash": 0}
+        {"_id": 0, "id": 1, "name": 1, "profile_image_url": 1}
     ).to_list(1000)
 
     # Create a lookup of registered users by normalized name
@@ -3811,6 +7075,7 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 @app.on_event("shutdown")
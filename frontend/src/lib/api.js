@@ -57,6 +57,10 @@ export const playerAPI = {
   deleteProfileImage: (id) => api.delete(`/players/${id}/profile-image`),
   getMatchHistory: (id) => api.get(`/players/${id}/match-history`),
   getPartnerChemistry: (id) => api.get(`/players/${id}/partner-chemistry`),
+  getHeadToHead: (id, relation = 'opponent') => api.get(`/players/${id}/head-to-head`, { params: { relation } }),
+  getRecordVsPlayer: (id, otherId) => api.get(`/players/${id}/head-to-head/${otherId}`),
+  getNetwork: (id, params) => api.get(`/players/${id}/network`, { params }),
+  getPartnersOfPartners: (id, params) => api.get(`/players/${id}/partners-of-partners`, { params }),
 };
 
 // Tenniscores Admin APIs
@@ -66,18 +70,34 @@ export const tenniscoresAPI = {
   scrapeAllPlayers: () => api.post('/admin/tenniscores/scrape-all-players'),
 };
 
+// Background sync job APIs (GBPTA full sync, Tenniscores bulk scrape)
+export const syncJobAPI = {
+  list: (params) => api.get('/admin/jobs', { params }),
+  get: (id) => api.get(`/admin/jobs/${id}`),
+  cancel: (id) => api.post(`/admin/jobs/${id}/cancel`),
+  resume: (id) => api.post(`/admin/jobs/${id}/resume`),
+};
+
 // Request APIs
 export const requestAPI = {
-  list: () => api.get('/requests'),
+  list: (params) => api.get('/requests', { params }),
   create: (data) => api.post('/requests', data),
   get: (id) => api.get(`/requests/${id}`),
   update: (id, data) => api.put(`/requests/${id}`, data),
   cancel: (id) => api.delete(`/requests/${id}`),
   respond: (id) => api.post(`/requests/${id}/respond`),
+  getCandidates: (id, limit = 10) => api.get(`/requests/${id}/candidates`, { params: { limit } }),
   updateResponse: (requestId, responseId, status) =>
     api.put(`/requests/${requestId}/responses/${responseId}`, { status }),
 };
 
+// Mixer APIs
+export const mixerAPI = {
+  plan: (data) => api.post('/mixers/plan', data),
+  create: (data) => api.post('/mixers', data),
+  get: (id) => api.get(`/mixers/${id}`),
+};
+
 // Crew APIs
 export const crewAPI = {
   list: () => api.get('/crews'),
@@ -86,6 +106,7 @@ export const crewAPI = {
   update: (id, data) => api.put(`/crews/${id}`, data),
   delete: (id) => api.delete(`/crews/${id}`),
   addMember: (crewId, playerId) => api.post(`/crews/${crewId}/members?player_id=${playerId}`),
+  addMembers: (crewId, playerIds) => api.post(`/crews/${crewId}/members/bulk`, { player_ids: playerIds }),
   removeMember: (crewId, playerId) => api.delete(`/crews/${crewId}/members/${playerId}`),
 };
 
@@ -100,6 +121,7 @@ export const favoriteAPI = {
 export const availabilityAPI = {
   list: () => api.get('/availability'),
   create: (data) => api.post('/availability', data),
+  matches: () => api.get('/availability/matches'),
   delete: (id) => api.delete(`/availability/${id}`),
 };
 
@@ -124,6 +146,26 @@ export const inviteAPI = {
   send: (data) => api.post('/invites/send', data),
 };
 
+// Sync APIs. Deletions arrive as tombstones, except for data that ages out: the
+// client must itself drop requests past date_time (and their responses) and
+// availability posts past expires_at, which the server removes without a tombstone.
+export const syncAPI = {
+  changes: (since) => api.get('/sync', { params: since ? { since } : {} }),
+};
+
+// Live updates (Server-Sent Events). EventSource cannot send the auth header, so it
+// opens with a short-lived stream ticket instead of the session token. Tickets expire
+// after a minute: on error, close the EventSource and connect again for a fresh one.
+export const liveAPI = {
+  connect: async ({ requestIds = [], feed = false } = {}) => {
+    const { data } = await api.post('/events/ticket');
+    const params = new URLSearchParams({ ticket: data.ticket });
+    if (requestIds.length) params.set('request_ids', requestIds.join(','));
+    if (feed) params.set('feed', 'true');
+    return new EventSource(`${API_BASE}/events?${params}`);
+  },
+};
+
 // Utility APIs (deprecated - use clubAPI.getSuggestions instead)
 export const utilityAPI = {
   getClubSuggestions: () => api.get('/clubs/suggestions'),
@@ -0,0 +1,62 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def index():
+    return server.ClubNameIndex(server.CLUB_DIRECTORY)
+
+
+@pytest.fixture(scope="module")
+def lookup(index):
+    official = {e["name"].lower(): e["name"] for e in server.CLUB_DIRECTORY}
+    aliases = {a.lower(): e["name"] for e in server.CLUB_DIRECTORY for a in e["aliases"]}
+    return official, aliases, index
+
+
+@pytest.mark.parametrize("name, official", [
+    ("Wellsley CC", "Wellesley Country Club"),
+    ("Welesley Country Club", "Wellesley Country Club"),
+    ("Nahant PTC", "Nahant Platform Tennis Club"),
+    ("Cohaset Golf Club", "Cohasset Golf Club"),
+])
+def test_misspellings_resolve(index, lookup, name, official):
+    assert index.resolve(name) == official
+    assert server.resolve_club_name_with(name, lookup) == official
+
+
+@pytest.mark.parametrize("name", [
+    "Weston Racquet Club",
+    "Essex Tennis Club",
+    "Brookline Tennis Club",
+    "Concord Tennis Club",
+    "Needham Golf Club",
+    "Manchester CC",
+])
+def test_different_club_types_do_not_resolve(index, lookup, name):
+    assert index.resolve(name) is None
+    assert server.resolve_club_name_with(name, lookup) == name
+
+
+@pytest.mark.parametrize("name, official", [
+    ("Myopia Gold", "Myopia Hunt Club"),
+    ("Cape Ann Cage Fighters 2", "Cape Ann Platform Tennis"),
+    ("Wellesley Country Club Blue", "Wellesley Country Club"),
+])
+def test_team_suffixes_are_stripped(lookup, name, official):
+    assert server.resolve_club_name_with(name, lookup) == official
+
+
+def test_bare_place_name_needs_a_declared_alias():
+    # "Weston" is a directory alias of Weston Golf Club; without it the name is left alone
+    entries = [{"name": "Weston Golf Club", "aliases": []}]
+    assert server.ClubNameIndex(entries).resolve("Weston") is None
+    assert server.ClubNameIndex(server.CLUB_DIRECTORY).resolve("Weston") == "Weston Golf Club"
@@ -0,0 +1,30 @@
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+
+def pair(a, b, relation, matches=1):
+    return {"player_a": a, "name_a": a.upper(), "player_b": b, "name_b": b.upper(), "relation": relation, "matches": matches}
+
+
+def neighbours(graph, key):
+    i = graph.keys.index(key)
+    row = slice(graph.indptr[i], graph.indptr[i + 1])
+    return dict(zip((graph.keys[j] for j in graph.indices[row]), graph.flags[row].tolist()))
+
+
+def test_pair_and_crew_links_merge_into_one_edge():
+    pairs = [pair("y", "x", "partner", 2), pair("x", "a", "opponent"), pair("a", "x", "partner")]
+    graph = server.build_coplay_graph(pairs, [[("x", "X"), ("a", "A")]], "now")
+
+    assert neighbours(graph, "x") == {
+        "a": server.COPLAY_PARTNER | server.COPLAY_OPPONENT | server.COPLAY_CREW,
+        "y": server.COPLAY_PARTNER,
+    }
+    assert neighbours(graph, "a") == {"x": server.COPLAY_PARTNER | server.COPLAY_OPPONENT | server.COPLAY_CREW}
+    assert len(graph.indices) == 4